@@ -0,0 +1,58 @@
+"""Compare the "etree" and "expat" reply parsers of the Client.
+
+Run with: python benchmarks/bench_parsers.py [number of rules]
+"""
+
+import gc
+import sys
+import timeit
+import tracemalloc
+
+from bench_xml_to_json import FIREWALL_RULE
+
+from sophosapi.client import Client
+
+
+def peak_memory(fn):
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def main(count: int) -> None:
+    rules = "".join(FIREWALL_RULE.format(i=i) for i in range(count))
+    body = f"<Response>{rules}</Response>".encode()
+
+    clients = {
+        name: Client(username="u", password="p", server="x", parser=name)
+        for name in ("etree", "expat")
+    }
+    parse = {
+        name: (lambda c=client: c._parse_response_body(body))
+        for name, client in clients.items()
+    }
+
+    def data(name):
+        return [r.data for r in parse[name]()]
+
+    assert data("etree") == data("expat")
+
+    gc.disable()
+    times: dict = {name: [] for name in parse}
+    for _ in range(5):  # interleaved, to even out noise
+        for name, fn in parse.items():
+            times[name].append(timeit.timeit(fn, number=1))
+    gc.enable()
+
+    print(f"{count} FirewallRules ({len(body) / 2**20:.1f} MiB), best of 5")
+    for name, fn in parse.items():
+        peak = peak_memory(fn) / 2**20
+        print(f"{name:6} {min(times[name]):.3f}s  peak {peak:.1f} MiB")
+    speed_up = min(times["etree"]) / min(times["expat"])
+    print(f"speed-up: {speed_up:.2f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20_000)
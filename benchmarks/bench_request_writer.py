@@ -0,0 +1,98 @@
+"""Compare building a bulk Request from Elements with the XML writer.
+
+Run with: python benchmarks/bench_request_writer.py [number of entities]
+"""
+
+import gc
+import sys
+import timeit
+import tracemalloc
+
+from defusedxml import ElementTree as ET
+
+from sophosapi.api_factory import _create_element
+from sophosapi.api_factory import json_to_xml
+from sophosapi.request import Request
+
+
+def make_data(count):
+    return [
+        (
+            "FirewallRule",
+            {
+                "Name": f"rule{i}",
+                "Description": f"rule {i} & co",
+                "Status": "Enable",
+                "PolicyType": "Network",
+                "NetworkPolicy": {
+                    "Action": "Accept",
+                    "SourceZones": ["LAN", "DMZ"],
+                    "DestinationZones": ["WAN"],
+                    "Services": ["HTTP", "HTTPS"],
+                    "Identity": [f"user{i}"],
+                },
+                "HTTPBasedPolicy": {
+                    "AccessPaths": [
+                        {"path": "/", "backends": ["b1", "b2"]},
+                    ],
+                },
+            },
+        )
+        for i in range(count)
+    ]
+
+
+def with_elements(entities):
+    """Request as it was built before the writer."""
+    root = _create_element("Request")
+    root.set("APIVersion", "1905.1")
+    container = _create_element("Set")
+    root.append(container)
+    for i, (entity, data) in enumerate(entities):
+        elem = json_to_xml(entity, data)
+        elem.set("transactionid", f"set_{entity}_{i + 1}")
+        container.append(elem)
+    return ET.tostring(root)
+
+
+def with_writer(entities):
+    request = Request(apiversion="1905.1")
+    for entity, data in entities:
+        request.set(entity, data)
+    return request.to_bytes()
+
+
+def peak_memory(fn):
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def main(count: int) -> None:
+    entities = make_data(count)
+    # the writer also writes the empty containers
+    assert len(with_writer(entities)) > len(with_elements(entities))
+
+    runs = {
+        "elements": lambda: with_elements(entities),
+        "writer": lambda: with_writer(entities),
+    }
+    gc.disable()
+    times: dict = {name: [] for name in runs}
+    for _ in range(5):  # interleaved, to even out noise
+        for name, fn in runs.items():
+            times[name].append(timeit.timeit(fn, number=1))
+    gc.enable()
+
+    print(f"{count} FirewallRules, best of 5")
+    for name, fn in runs.items():
+        peak = peak_memory(fn) / 2**20
+        print(f"{name:9} {min(times[name]):.3f}s  peak {peak:.1f} MiB")
+    speed_up = min(times["elements"]) / min(times["writer"])
+    print(f"speed-up: {speed_up:.2f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20_000)
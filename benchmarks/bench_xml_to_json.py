@@ -0,0 +1,82 @@
+"""Compare api_factory.xml_to_json with the compiled XmlToJsonConverter.
+
+Run with: python benchmarks/bench_xml_to_json.py [number of rules]
+"""
+
+import gc
+import sys
+import timeit
+
+from defusedxml import ElementTree as ET
+
+from sophosapi.api_factory import xml_to_json
+from sophosapi.xml_converter import XmlToJsonConverter
+
+FIREWALL_RULE = """
+<FirewallRule transactionid="get_FirewallRules_1">
+    <Name>rule{i}</Name>
+    <Description>rule {i}</Description>
+    <IPFamily>IPv4</IPFamily>
+    <Status>Enable</Status>
+    <Position>After</Position>
+    <PolicyType>Network</PolicyType>
+    <NetworkPolicy>
+        <Action>Accept</Action>
+        <LogTraffic>Disable</LogTraffic>
+        <SourceZones><Zone>LAN</Zone><Zone>DMZ</Zone></SourceZones>
+        <DestinationZones><Zone>WAN</Zone></DestinationZones>
+        <Schedule>All The Time</Schedule>
+        <SourceNetworks><Network>net{i}</Network></SourceNetworks>
+        <Services><Service>HTTP</Service><Service>HTTPS</Service></Services>
+        <Identity><Member>user{i}</Member></Identity>
+        <WebFilter>None</WebFilter>
+        <ScanVirus>Disable</ScanVirus>
+    </NetworkPolicy>
+    <HTTPBasedPolicy>
+        <HostedAddress>address{i}</HostedAddress>
+        <AccessPaths>
+            <AccessPath>
+                <path>/</path>
+                <backend>backend1</backend>
+                <backend>backend2</backend>
+                <allowed_networks>net{i}</allowed_networks>
+            </AccessPath>
+        </AccessPaths>
+        <Exceptions>
+            <Exception>
+                <path>/static</path>
+                <source>net{i}</source>
+                <skipav>1</skipav>
+            </Exception>
+        </Exceptions>
+    </HTTPBasedPolicy>
+</FirewallRule>
+"""
+
+
+def main(count: int) -> None:
+    rules = "".join(FIREWALL_RULE.format(i=i) for i in range(count))
+    root = ET.fromstring(f"<Response>{rules}</Response>")
+    converter = XmlToJsonConverter()
+
+    assert [converter(e) for e in root] == [xml_to_json(e) for e in root]
+
+    gc.disable()
+    baseline = []
+    compiled = []
+    for _ in range(10):  # interleaved, to even out noise
+        baseline.append(
+            timeit.timeit(lambda: [xml_to_json(e) for e in root], number=1)
+        )
+        compiled.append(
+            timeit.timeit(lambda: [converter(e) for e in root], number=1)
+        )
+
+    print(f"{count} FirewallRules, best of 10")
+    print(f"xml_to_json:         {min(baseline):.3f}s")
+    print(f"XmlToJsonConverter:  {min(compiled):.3f}s")
+    print(f"speed-up:            {min(baseline) / min(compiled):.2f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20_000)
@@ -0,0 +1,37 @@
+"""A self-signed certificate for the mock server, shared by load.py and the
+tests.
+"""
+
+import os
+import subprocess
+
+
+def self_signed_cert(directory):
+    """Write a self-signed certificate for 127.0.0.1 and its key into
+    `directory`, with the openssl command, and return their paths.
+    """
+    certfile = os.path.join(directory, "cert.pem")
+    keyfile = os.path.join(directory, "key.pem")
+    subprocess.run(
+        [
+            "openssl",
+            "req",
+            "-x509",
+            "-newkey",
+            "rsa:2048",
+            "-nodes",
+            "-days",
+            "1",
+            "-subj",
+            "/CN=127.0.0.1",
+            "-addext",
+            "subjectAltName=IP:127.0.0.1",
+            "-keyout",
+            keyfile,
+            "-out",
+            certfile,
+        ],
+        check=True,
+        capture_output=True,
+    )
+    return certfile, keyfile
@@ -0,0 +1,204 @@
+"""Drive a Client against the mock firewall and report its throughput and
+latency percentiles.
+
+Run with: python benchmarks/load.py [--workers 8] [--requests 2000]
+
+The mock is started on a free port with the certificate and key given by
+--certfile and --keyfile. Without them a self-signed certificate is made
+with the openssl command. Its store is filled with --entities IPHosts from
+payloads.py. Each worker thread then sends its share of --requests through
+one shared Client, picking calls by the weights of --mix.
+"""
+
+import argparse
+import random
+import ssl
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+from certs import self_signed_cert
+from payloads import make_entities
+
+from sophosapi.api_factory import Filter
+from sophosapi.client import Client
+from sophosapi.mock_server import MockFirewall
+from sophosapi.mock_server import MockServer
+
+
+def calls(count):
+    """The calls the workers pick from, by name."""
+    return {
+        "get": lambda client, i: client.get("IPHost"),
+        "filter": lambda client, i: client.get_filter(
+            "IPHost", Filter.EQUAL, f"host{i % count}"
+        ),
+        "set": lambda client, i: [
+            client.update(
+                "IPHost",
+                {"Name": f"host{i % count}", "Description": f"update {i}"},
+            )
+        ],
+    }
+
+
+def is_error(response):
+    if response.status_code >= 500:
+        return True
+    # get replies hold the error Status in place of the entity's data
+    data = response.data
+    return isinstance(data, dict) and data.keys() == {"Status"}
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def run_workers(client, mix, workers, requests, count, seed):
+    """Send `requests` calls from `workers` threads and return the
+    (call name, seconds, failed) of each.
+    """
+    available = calls(count)
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    results = []
+    lock = threading.Lock()
+
+    def worker(n):
+        rng = random.Random(seed + n)
+        local = []
+        for i in range(n, requests, workers):
+            name = rng.choices(names, weights)[0]
+            start = time.perf_counter()
+            try:
+                responses = available[name](client, i)
+                failed = any(map(is_error, responses))
+            except Exception:
+                failed = True
+            local.append((name, time.perf_counter() - start, failed))
+        with lock:
+            results.extend(local)
+
+    threads = [
+        threading.Thread(target=worker, args=(n,)) for n in range(workers)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def report(results, elapsed):
+    print(
+        f"{len(results)} calls in {elapsed:.2f}s: "
+        f"{len(results) / elapsed:.1f} calls/s"
+    )
+    print(
+        f"{'call':8} {'count':>6} {'failed':>6} {'mean':>8} {'p50':>8} "
+        f"{'p90':>8} {'p99':>8} {'max':>8}   (ms)"
+    )
+    by_name = {}
+    for name, seconds, failed in results:
+        by_name.setdefault(name, []).append((seconds, failed))
+    by_name["all"] = [(seconds, failed) for _, seconds, failed in results]
+
+    for name, rows in by_name.items():
+        times = [seconds * 1000 for seconds, _ in rows]
+        failed = sum(failed for _, failed in rows)
+        print(
+            f"{name:8} {len(rows):6} {failed:6} "
+            f"{statistics.mean(times):8.2f} "
+            f"{percentile(times, 0.5):8.2f} {percentile(times, 0.9):8.2f} "
+            f"{percentile(times, 0.99):8.2f} {max(times):8.2f}"
+        )
+
+
+def parse_mix(text):
+    mix = {}
+    for item in text.split(","):
+        name, _, weight = item.partition("=")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--entities", type=int, default=1000)
+    parser.add_argument(
+        "--mix",
+        default="get=1,filter=6,set=3",
+        help="weights of the calls: get, filter and set",
+    )
+    parser.add_argument("--pool-size", type=int, default=8)
+    parser.add_argument("--parser", default="etree")
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="seconds per request"
+    )
+    parser.add_argument(
+        "--latency-per-entity",
+        type=float,
+        default=0.0,
+        help="seconds per entity returned or written",
+    )
+    parser.add_argument(
+        "--error-rate",
+        type=float,
+        default=0.0,
+        help="fraction of transactions which fail",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--certfile", help="the mock server's certificate")
+    parser.add_argument("--keyfile", help="the key of --certfile")
+    args = parser.parse_args(argv)
+
+    mix = parse_mix(args.mix)
+    firewall = MockFirewall(
+        username="load",
+        password="load",
+        latency=args.latency,
+        latency_per_entity=args.latency_per_entity,
+        error_rate=args.error_rate,
+        seed=args.seed,
+    )
+    firewall.populate("IPHost", make_entities("IPHost", args.entities))
+
+    with tempfile.TemporaryDirectory() as directory:
+        certfile, keyfile = args.certfile, args.keyfile
+        if certfile is None:
+            certfile, keyfile = self_signed_cert(directory)
+        server = MockServer(firewall, certfile=certfile, keyfile=keyfile)
+        with server:
+            client = Client(
+                username="load",
+                password="load",
+                server="127.0.0.1",
+                port=server.port,
+                pool_size=args.pool_size,
+                ssl_context=ssl.create_default_context(cafile=certfile),
+                parser=args.parser,
+            )
+            start = time.perf_counter()
+            results = run_workers(
+                client,
+                mix,
+                args.workers,
+                args.requests,
+                args.entities,
+                args.seed,
+            )
+            elapsed = time.perf_counter() - start
+            client.close()
+
+    report(results, elapsed)
+    print(f"pool: {client.pool.stats}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+"""Synthetic payloads for the benchmarks, shaped like a real firewall's:
+make_entities gives the data of N entities of a type, and response_body the
+reply to a get of them.
+"""
+
+from sophosapi.xml_writer import entity_xml
+
+ZONES = ("LAN", "WAN", "DMZ", "VPN", "WiFi")
+SERVICES = ("HTTP", "HTTPS", "SSH", "DNS", "SMTP", "NTP")
+
+
+def make_zone(i):
+    return {
+        "Name": f"zone{i}",
+        "Type": "LAN",
+        "Description": f"zone {i}",
+        "ApplianceAccess": {
+            "AdminServices": {"HTTPS": "Enable", "SSH": "Enable"},
+            "AuthenticationServices": {"ClientAuthentication": "Enable"},
+            "NetworkServices": {"Ping": "Enable", "DNS": "Enable"},
+        },
+    }
+
+
+def make_iphost(i):
+    data = {
+        "Name": f"host{i}",
+        "IPFamily": "IPv4",
+        "HostType": "IP",
+        "IPAddress": f"10.{i // 65536 % 256}.{i // 256 % 256}.{i % 256}",
+        "Description": f"host {i} & co",
+    }
+    if i % 3 == 0:
+        data["HostGroupList"] = [f"group{i % 50}", f"group{i % 7}"]
+    return data
+
+
+def make_local_service_acl(i):
+    return {
+        "RuleName": f"acl{i}",
+        "Description": f"acl {i}",
+        "IPFamily": "IPv4",
+        "SourceZone": ZONES[i % len(ZONES)],
+        "Hosts": [f"host{i}", f"host{i + 1}"],
+        "DstHosts": [f"host{i + 2}"],
+        "Services": ["Ping", "HTTPS", "SSH"],
+        "Action": "accept",
+    }
+
+
+def make_firewall_rule(i):
+    return {
+        "Name": f"rule{i}",
+        "Description": f"rule {i}",
+        "IPFamily": "IPv4",
+        "Status": "Enable",
+        "Position": "After",
+        "PolicyType": "Network",
+        "After": {"Name": f"rule{i - 1}"},
+        "NetworkPolicy": {
+            "Action": "Accept",
+            "LogTraffic": "Disable",
+            "SourceZones": [ZONES[i % 5], ZONES[(i + 1) % 5]],
+            "DestinationZones": ["WAN"],
+            "Schedule": "All The Time",
+            "SourceNetworks": [f"host{i}", f"group{i % 50}"],
+            "Services": list(SERVICES[: 1 + i % len(SERVICES)]),
+            "Identity": [f"user{i}"],
+            "WebFilter": "None",
+            "ScanVirus": "Disable",
+        },
+        "HTTPBasedPolicy": {
+            "HostedAddress": f"address{i}",
+            "ListenPort": "443",
+            "AccessPaths": [
+                {
+                    "path": "/",
+                    "backends": [f"backend{i}", f"backend{i + 1}"],
+                    "allowed_networks": [f"host{i}"],
+                    "denied_networks": [f"host{i + 1}"],
+                    "stickysession_status": "1",
+                },
+            ],
+            "Exceptions": [
+                {
+                    "paths": ["/static", "/images"],
+                    "sources": [f"host{i}"],
+                    "skipav": "1",
+                },
+            ],
+        },
+    }
+
+
+MAKERS = {
+    "Zone": make_zone,
+    "IPHost": make_iphost,
+    "LocalServiceACL": make_local_service_acl,
+    "FirewallRule": make_firewall_rule,
+}
+
+
+def make_entities(entity, count):
+    """The data of `count` entities of the type `entity`."""
+    make = MAKERS[entity]
+    return [make(i) for i in range(count)]
+
+
+def response_body(entity, entities, transactionid=None):
+    """The firewall's reply to a get of `entities`."""
+    if transactionid is None:
+        transactionid = f"get_{entity}s_1"
+    xml = "".join(entity_xml(entity, data, transactionid) for data in entities)
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        f'<Response APIVersion="1905.1">{xml}</Response>'
+    ).encode("ascii", "xmlcharrefreplace")
@@ -0,0 +1,170 @@
+"""Time and memory of the conversion and request-building hot paths, against
+stored baselines.
+
+Run with: python benchmarks/suite.py [--sizes 10,100,100000] [--save]
+
+Each case is one operation on N entities of one type, from payloads.py:
+
+    xml_to_json     api_factory.xml_to_json on each entity's Element
+    json_to_xml     api_factory.json_to_xml on each entity's data
+    request_str     building a Request which sets each entity, and str() of it
+    response        Response(element) for each entity
+    parse_response  Client._parse_response on the whole reply
+
+Results are compared with benchmarks/baselines.json, and the run fails if a
+case is more than --threshold slower, or uses that much more memory. The
+baselines are specific to the machine they were saved on, so they are not
+committed: save them (--save) from the base branch, then compare with them
+from yours.
+"""
+
+import argparse
+import gc
+import json
+import pathlib
+import sys
+import timeit
+import tracemalloc
+
+from defusedxml import ElementTree as ET
+from payloads import make_entities
+from payloads import MAKERS
+from payloads import response_body
+
+from sophosapi.api_factory import json_to_xml
+from sophosapi.api_factory import xml_to_json
+from sophosapi.client import Client
+from sophosapi.request import Request
+from sophosapi.response import Response
+
+BASELINES = pathlib.Path(__file__).with_name("baselines.json")
+SIZES = (10, 100, 1000, 10_000)
+# differences smaller than these are not counted as regressions
+NOISE = {"seconds": 0.0005, "peak_mib": 0.1}
+
+
+def cases(entity, count):
+    """The (name, function) of each case, for `count` entities."""
+    entities = make_entities(entity, count)
+    root = ET.fromstring(response_body(entity, entities))
+    elements = list(root)
+
+    request = Request(apiversion="1905.1")
+    request.get(entity)
+    client = Client(username="u", password="p", server="127.0.0.1")
+
+    def request_str():
+        request = Request(apiversion="1905.1")
+        for data in entities:
+            request.set(entity, data)
+        return str(request)
+
+    return [
+        ("xml_to_json", lambda: [xml_to_json(e) for e in elements]),
+        ("json_to_xml", lambda: [json_to_xml(entity, d) for d in entities]),
+        ("request_str", request_str),
+        ("response", lambda: [Response(e) for e in elements]),
+        ("parse_response", lambda: client._parse_response(root, request)),
+    ]
+
+
+def best_time(fn, repeat=5):
+    """The best time of one call, in seconds."""
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()  # calls taking 0.2s in total
+    gc.disable()
+    try:
+        return min(timer.repeat(repeat, number)) / number
+    finally:
+        gc.enable()
+
+
+def peak_memory(fn):
+    """The peak memory allocated during one call, in MiB."""
+    gc.collect()
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 2**20
+
+
+def run(sizes):
+    results = {}
+    for entity in MAKERS:
+        for count in sizes:
+            for name, fn in cases(entity, count):
+                key = f"{name}/{entity}/{count}"
+                results[key] = {
+                    "seconds": round(best_time(fn), 7),
+                    "peak_mib": round(peak_memory(fn), 3),
+                }
+                print(
+                    f"{key:40} {results[key]['seconds'] * 1000:10.3f} ms"
+                    f"  peak {results[key]['peak_mib']:8.2f} MiB",
+                    flush=True,
+                )
+    return results
+
+
+def regressions(results, baselines, threshold):
+    """Describe each case which is more than `threshold` worse than its
+    baseline.
+    """
+    found = []
+    for key, result in results.items():
+        baseline = baselines.get(key)
+        if baseline is None:
+            continue
+        for measure, noise in NOISE.items():
+            if result[measure] - baseline[measure] < noise:
+                continue
+            ratio = result[measure] / baseline[measure]
+            if ratio > 1 + threshold:
+                found.append(f"{key} {measure}: {ratio:.2f}x the baseline")
+    return found
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes",
+        default=",".join(map(str, SIZES)),
+        help="comma separated entity counts, up to 100000",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.25,
+        help="fraction worse than the baseline which fails the run",
+    )
+    parser.add_argument(
+        "--save", action="store_true", help="store the results as baselines"
+    )
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    results = run(sizes)
+
+    baselines = {}
+    if BASELINES.exists():
+        baselines = json.loads(BASELINES.read_text())
+
+    if args.save:
+        baselines.update(results)
+        BASELINES.write_text(json.dumps(baselines, indent=2, sort_keys=True))
+        print(f"saved {len(results)} baselines to {BASELINES}")
+        return 0
+
+    if not baselines:
+        print(f"no baselines in {BASELINES}, save them first with --save")
+    found = regressions(results, baselines, args.threshold)
+    for line in found:
+        print(f"REGRESSION {line}")
+    compared = sum(key in baselines for key in results)
+    print(f"{compared} of {len(results)} cases compared with baselines")
+    return 1 if found else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
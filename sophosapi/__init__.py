@@ -1,11 +1,35 @@
+from .api_factory import Criterion
 from .api_factory import Filter
+from .async_client import AsyncClient
+from .cache import ResponseCache
 from .client import Client
+from .fleet import FleetClient
+from .instrumentation import CallStats
+from .prepared import Param
+from .prepared import PreparedRequest
 from .request import Request
+from .response import LazyResponse
 from .response import Response
+from .resultset import ResultSet
+from .throttle import RetryPolicy
+from .throttle import TokenBucket
+from .watcher import Watcher
 
 __all__ = (
+    "AsyncClient",
+    "CallStats",
     "Client",
+    "Criterion",
     "Filter",
+    "FleetClient",
+    "LazyResponse",
+    "Param",
+    "PreparedRequest",
     "Request",
     "Response",
+    "ResponseCache",
+    "ResultSet",
+    "RetryPolicy",
+    "TokenBucket",
+    "Watcher",
 )
@@ -2,7 +2,9 @@ from __future__ import annotations
 
 from enum import Enum
 from typing import Dict
+from typing import Iterable
 from typing import List
+from typing import NamedTuple
 from typing import Union
 from xml.etree.ElementTree import Element
 
@@ -14,6 +16,18 @@ class Filter(Enum):
     LIKE = "like"
     EXCEPT = "!="
 
+    def on(self, key: str, value: str) -> Criterion:
+        """A criterion on any key, eg. Filter.LIKE.on("IPAddress", "10.0.")"""
+        return Criterion(key, self, value)
+
+
+class Criterion(NamedTuple):
+    """One <key> of a <Filter>, matching entities whose `key` compares to `value`."""
+
+    key: str
+    type: Filter
+    value: str
+
 
 def _create_element(
     elem_name: str,
@@ -32,20 +46,25 @@ def _create_element(
     return new_element
 
 
-def _make_filter(type: Filter, name: str) -> Element:
+def _make_filter(type: Filter, name: str, key: str = "Name") -> Element:
     """Create the Element:
     <Filter>
-        <key "name"="Name" "criteria"="type.value">name</key>
+        <key "name"="key" "criteria"="type.value">name</key>
     </Filter>
     """
-    # TODO: sometimes we can filter with something else which is not a name
-    # Eg. for IPHost, we cna filter by IPAddress
-    filter_elem = _create_element("Filter")
-    key_elem = _create_element("key", text=name)
-    key_elem.set("name", "Name")
-    key_elem.set("criteria", type.value)
+    return _make_filter_keys([Criterion(key, type, name)])
+
 
-    filter_elem.append(key_elem)
+def _make_filter_keys(criteria: Iterable[Criterion]) -> Element:
+    """Create a <Filter> with a <key> per criterion, which the firewall combines so that
+    only entities matching all of them are returned.
+    """
+    filter_elem = _create_element("Filter")
+    for key, type, value in criteria:
+        key_elem = _create_element("key", text=value)
+        key_elem.set("name", key)
+        key_elem.set("criteria", type.value)
+        filter_elem.append(key_elem)
     return filter_elem
 
 
@@ -0,0 +1,381 @@
+from __future__ import annotations
+
+import asyncio
+import ssl
+import time
+from typing import Callable
+from typing import Iterable
+from typing import List
+from typing import Tuple
+from urllib.error import HTTPError
+from xml.etree.ElementTree import Element
+
+from defusedxml import ElementTree as ET  # type: ignore
+
+from .client import BaseClient
+from .instrumentation import CallStats
+from .prepared import Sendable
+from .request import Request
+from .response import Response
+from .throttle import only_reads
+
+_Connection = Tuple[asyncio.StreamReader, asyncio.StreamWriter]
+
+
+class AsyncClient(BaseClient):
+    """
+    asyncio version of Client. The same methods are available, as coroutines.
+
+    At most `max_concurrency` calls are sent to the firewall at once, the rest
+    wait their turn. Responses are parsed in the default executor so that
+    large replies do not block the event loop.
+    """
+
+    def __init__(
+        self,
+        *,
+        username: str | None = None,
+        password: str | None = None,
+        is_encrypted: bool = True,
+        server: str | None = None,
+        port: int = 4444,
+        apiversion: str = "1805.2",
+        max_concurrency: int = 4,
+        idle_timeout: float = 60.0,
+        timeout: float | None = None,
+        ssl_context: ssl.SSLContext | None = None,
+        post_threshold: int | None = 2048,
+        parser: str = "etree",
+        lazy_responses: bool = False,
+        result_sets: bool = False,
+        on_call: Callable[[CallStats], None] | None = None,
+    ) -> None:
+        super().__init__(
+            username=username,
+            password=password,
+            is_encrypted=is_encrypted,
+            server=server,
+            port=port,
+            apiversion=apiversion,
+            post_threshold=post_threshold,
+            parser=parser,
+            lazy_responses=lazy_responses,
+            result_sets=result_sets,
+            on_call=on_call,
+        )
+        self.max_concurrency = max_concurrency
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self.ssl_context = ssl_context or ssl.create_default_context()
+
+        # created lazily, as they must belong to the running event loop
+        self._semaphore: asyncio.Semaphore | None = None
+        # (reader, writer, time it was returned)
+        self._idle: List[
+            Tuple[asyncio.StreamReader, asyncio.StreamWriter, float]
+        ] = []
+
+    async def close(self) -> None:
+        """Close the connections kept open to the firewall."""
+        while self._idle:
+            _, writer, _ = self._idle.pop()
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except OSError:  # eg the firewall already dropped it
+                pass
+
+    async def __aenter__(self) -> AsyncClient:
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def send(self, request: Sendable) -> list[Response]:
+        if self.on_call is not None:
+            return await self._send_instrumented(request, self.on_call)
+        response_body = await self._make_api_call(request)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None, self._parse_response_body, response_body, request
+        )
+
+    async def _send_instrumented(
+        self, request: Sendable, on_call: Callable[[CallStats], None]
+    ) -> list[Response]:
+        """send, timing each phase of the call for `on_call`. The network
+        time includes waiting for a free slot under max_concurrency.
+        """
+        stats = CallStats(len(request.transactions))
+        try:
+            http_request = self._timed_serialize(request, stats)
+            start = time.perf_counter()
+            try:
+                response_body = await self._send_http_request(
+                    *http_request, resend=only_reads(request)
+                )
+            finally:
+                stats.network_seconds = time.perf_counter() - start
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                None, self._timed_parse, response_body, request, stats
+            )
+        except BaseException as e:
+            stats.error = e
+            raise
+        finally:
+            on_call(stats)
+
+    async def _make_api_call(self, request: Sendable) -> bytes:
+        reqxml = self._serialize_request(request)
+        return await self._send_http_request(
+            *self._build_http_request(reqxml), resend=only_reads(request)
+        )
+
+    async def _send_http_request(
+        self,
+        method: str,
+        url: str,
+        body: Iterable[bytes] | None,
+        headers: dict[str, str],
+        *,
+        resend: bool = False,
+    ) -> bytes:
+        """Send the request, sending it again on a new connection if a
+        kept-alive one was reset while sending it, or at any point when
+        `resend` is set.
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async with self._semaphore:
+            return await asyncio.wait_for(
+                self._http_request(method, url, body, headers, resend),
+                self.timeout,
+            )
+
+    # TRANSPORT
+    async def _get_connection(self) -> tuple[_Connection, bool]:
+        now = time.monotonic()
+        while self._idle:
+            reader, writer, last_used = self._idle.pop()
+            if now - last_used > self.idle_timeout or reader.at_eof():
+                writer.close()
+                continue
+            return (reader, writer), True
+
+        connection = await asyncio.open_connection(
+            self.server, self.port, ssl=self.ssl_context
+        )
+        return connection, False
+
+    async def _http_request(
+        self,
+        method: str,
+        url: str,
+        body: Iterable[bytes] | None,
+        headers: dict[str, str],
+        resend: bool,
+    ) -> bytes:
+        (reader, writer), reused = await self._get_connection()
+        sent = False
+        try:
+            try:
+                await self._write_request(writer, method, url, body, headers)
+                sent = True
+                status, response_headers, keep_alive, response_body = (
+                    await self._read_response(reader)
+                )
+            except (ConnectionError, asyncio.IncompleteReadError):
+                writer.close()
+                # a request which was sent in full may have been processed
+                if not reused or (sent and not resend):
+                    raise
+                # kept-alive connection was closed by the firewall: retry
+                reader, writer = await asyncio.open_connection(
+                    self.server, self.port, ssl=self.ssl_context
+                )
+                await self._write_request(writer, method, url, body, headers)
+                status, response_headers, keep_alive, response_body = (
+                    await self._read_response(reader)
+                )
+        except BaseException:
+            writer.close()
+            raise
+
+        if keep_alive:
+            self._idle.append((reader, writer, time.monotonic()))
+        else:
+            writer.close()
+
+        if status >= 400:  # same behaviour as urllib's urlopen
+            raise HTTPError(
+                url, status, "", response_headers, None  # type: ignore
+            )
+
+        return response_body
+
+    async def _write_request(
+        self,
+        writer: asyncio.StreamWriter,
+        method: str,
+        url: str,
+        body: Iterable[bytes] | None,
+        headers: dict[str, str],
+    ) -> None:
+        """Write one HTTP/1.1 request."""
+        head = f"{method} {url} HTTP/1.1\r\n"
+        head += f"Host: {self.server}:{self.port}\r\n"
+        if body is None:
+            headers = {"Content-Length": "0", **headers}
+        for name, value in headers.items():
+            head += f"{name}: {value}\r\n"
+        writer.write(head.encode("latin-1") + b"\r\n")
+        for chunk in body or ():
+            writer.write(chunk)
+        await writer.drain()
+
+    async def _read_response(
+        self, reader: asyncio.StreamReader
+    ) -> tuple[int, dict[str, str], bool, bytes]:
+        """Read the response to a request.
+
+        Returns the status, headers, whether the connection can be reused and
+        the body.
+        """
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionResetError("Connection closed by the server")
+        version, status, *_ = status_line.decode("latin-1").split(" ", 2)
+
+        response_headers: dict[str, str] = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            response_headers[name.strip().lower()] = value.strip()
+
+        keep_alive = (
+            version != "HTTP/1.0"
+            and response_headers.get("connection", "").lower() != "close"
+        )
+
+        if response_headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int((await reader.readline()).split(b";")[0], 16)
+                if size == 0:
+                    await reader.readline()  # no trailers are expected
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readline()
+            response_body = b"".join(chunks)
+
+        elif "content-length" in response_headers:
+            length = int(response_headers["content-length"])
+            response_body = await reader.readexactly(length)
+
+        else:  # body ends when the connection is closed
+            response_body = await reader.read()
+            keep_alive = False
+
+        return int(status), response_headers, keep_alive, response_body
+
+    async def get_many(
+        self, entity_types: Iterable[str], strategy: str = "auto"
+    ) -> dict[str, list[Response]]:
+        """As Client.get_many, with the parallel requests sent up to
+        `max_concurrency` at once.
+        """
+        types = list(dict.fromkeys(entity_types))
+        workers = min(len(types), self.max_concurrency)
+        batches = self._get_many_batches(types, strategy, workers)
+
+        if not batches:
+            return {}
+        if len(batches) == 1:
+            responses = await self.send(self._get_many_request(batches[0]))
+        else:
+            results = await asyncio.gather(
+                *(self.send(self._get_many_request(b)) for b in batches)
+            )
+            responses = [r for result in results for r in result]
+        return self._group_by_entity(types, responses)
+
+    async def test_login(self) -> dict:
+        """Run a login-only request to test client-server access and
+        authentication.
+
+        Returns the Sophos API status code and message
+        """
+        request = Request(apiversion=self.apiversion)
+        response_body = await self._make_api_call(request)
+        response_element: Element = ET.fromstring(response_body)
+        return self._parse_login(response_element)
+
+    # PROXIES FOR REQUEST
+    async def _request_proxy_call(
+        self, fn_name: str, *args, **kwargs
+    ) -> list[Response]:
+        """Proxy to run one-off Request methods.
+
+        Call Request.fn_name(*args, **kwargs)
+        """
+        request = Request(apiversion=self.apiversion)
+        getattr(request, fn_name)(*args, **kwargs)
+
+        responses = await self.send(request)
+        return self._get_result(fn_name, responses)
+
+    # GENERIC METHODS
+    async def get(self, *args, **kwargs) -> list[Response]:
+        return await self._request_proxy_call("get", *args, **kwargs)
+
+    async def get_filter(self, *args, **kwargs) -> list[Response]:
+        return await self._request_proxy_call("get_filter", *args, **kwargs)
+
+    async def set(self, *args, **kwargs) -> Response:
+        return (await self._request_proxy_call("set", *args, **kwargs))[0]
+
+    async def add(self, *args, **kwargs) -> Response:
+        return (await self._request_proxy_call("add", *args, **kwargs))[0]
+
+    async def update(self, *args, **kwargs) -> Response:
+        return (await self._request_proxy_call("update", *args, **kwargs))[0]
+
+    async def remove(self, *args, **kwargs) -> Response:
+        return (await self._request_proxy_call("remove", *args, **kwargs))[0]
+
+    # ZONES
+    async def get_zones(self, *args, **kwargs) -> list[Response]:
+        return await self._request_proxy_call("get_zones", *args, **kwargs)
+
+    async def get_zone(self, *args, **kwargs) -> Response:
+        return (await self._request_proxy_call("get_zone", *args, **kwargs))[0]
+
+    async def get_zones_like(self, *args, **kwargs) -> list[Response]:
+        return await self._request_proxy_call(
+            "get_zones_like", *args, **kwargs
+        )
+
+    async def get_zones_except(self, *args, **kwargs) -> list[Response]:
+        return await self._request_proxy_call(
+            "get_zones_except", *args, **kwargs
+        )
+
+    async def set_zone(self, *args, **kwargs) -> Response:
+        return (await self._request_proxy_call("set_zone", *args, **kwargs))[0]
+
+    async def add_zone(self, *args, **kwargs) -> Response:
+        return (await self._request_proxy_call("add_zone", *args, **kwargs))[0]
+
+    async def update_zone(self, *args, **kwargs) -> Response:
+        return (
+            await self._request_proxy_call("update_zone", *args, **kwargs)
+        )[0]
+
+    async def remove_zone(self, *args, **kwargs) -> Response:
+        return (
+            await self._request_proxy_call("remove_zone", *args, **kwargs)
+        )[0]
@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable
+from typing import Hashable
+from typing import Mapping
+
+from .response import Response
+
+Loader = Callable[[], "list[Response]"]
+
+
+class CacheStats:
+    """Counters describing how well the cache is doing."""
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.invalidations = 0
+        self.evictions = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        if lookups == 0:
+            return 0.0
+        return self.hits / lookups
+
+    def as_dict(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "refreshes": self.refreshes,
+            "invalidations": self.invalidations,
+            "evictions": self.evictions,
+            "hit_rate": self.hit_rate,
+        }
+
+    def __repr__(self) -> str:
+        return f"CacheStats({self.as_dict()})"
+
+
+class _Entry:
+    __slots__ = ("responses", "entity", "loaded_at", "hits", "refreshing")
+
+    def __init__(self, responses: list[Response], entity: str) -> None:
+        self.responses = responses
+        self.entity = entity
+        self.loaded_at = time.monotonic()
+        self.hits = 0
+        self.refreshing = False
+
+
+class ResponseCache:
+    """
+    Caches the responses of get calls made through a Client.
+
+    Entries expire after `ttl` seconds, or the per-entity value in `ttls`.
+    At most `maxsize` entries are kept, dropping the least recently used.
+
+    An entry which was hit at least `hot_threshold` times and is older than
+    `refresh_ahead` of its ttl is reloaded in the background, so that hot
+    entities are rarely fetched while a caller waits.
+
+    Any write to an entity through the same Client drops its cached entries.
+    Entity names are case-insensitive, as "zone" and "Zone" are both used.
+
+    Each hit returns a new list, but of the same Response objects, which are
+    not copied: do not change their data, or later hits see the change.
+    """
+
+    def __init__(
+        self,
+        *,
+        ttl: float = 60.0,
+        ttls: Mapping[str, float] | None = None,
+        maxsize: int = 256,
+        refresh_ahead: float = 0.8,
+        hot_threshold: int = 3,
+    ) -> None:
+        self.ttl = ttl
+        self.ttls = {k.lower(): v for k, v in (ttls or {}).items()}
+        self.maxsize = maxsize
+        self.refresh_ahead = refresh_ahead
+        self.hot_threshold = hot_threshold
+        self.stats = CacheStats()
+
+        self._entries: OrderedDict[Hashable, _Entry] = OrderedDict()
+        # bumped on invalidation, so loads started before it are not stored
+        self._versions: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _ttl(self, entity: str) -> float:
+        return self.ttls.get(entity, self.ttl)
+
+    def get(
+        self, key: Hashable, entity: str, loader: Loader
+    ) -> list[Response]:
+        """Return the cached responses for `key`, calling `loader` to fetch
+        them when missing or expired.
+        """
+        entity = entity.lower()
+        now = time.monotonic()
+        refresh = False
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                age = now - entry.loaded_at
+                ttl = self._ttl(entity)
+                if age <= ttl:
+                    self.stats.hits += 1
+                    entry.hits += 1
+                    self._entries.move_to_end(key)
+                    if (
+                        not entry.refreshing
+                        and entry.hits >= self.hot_threshold
+                        and age >= ttl * self.refresh_ahead
+                    ):
+                        entry.refreshing = refresh = True
+                    responses = entry.responses
+                else:
+                    del self._entries[key]
+                    entry = None
+
+            if entry is None:
+                self.stats.misses += 1
+            version = self._versions.get(entity, 0)
+
+        if entry is None:
+            responses = loader()
+            self._store(key, entity, responses, version)
+
+        elif refresh:
+            thread = threading.Thread(
+                target=self._refresh,
+                args=(key, entity, loader, version),
+                daemon=True,
+            )
+            thread.start()
+
+        # a copy, so callers do not change the cached list. A ResultSet's
+        # copy shares its indexes, which point to the same Responses.
+        return responses.copy()
+
+    def _refresh(
+        self, key: Hashable, entity: str, loader: Loader, version: int
+    ) -> None:
+        try:
+            responses = loader()
+        except Exception:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    entry.refreshing = False
+            return
+
+        with self._lock:
+            self.stats.refreshes += 1
+        self._store(key, entity, responses, version)
+
+    def _store(
+        self,
+        key: Hashable,
+        entity: str,
+        responses: list[Response],
+        version: int,
+    ) -> None:
+        with self._lock:
+            if self._versions.get(entity, 0) != version:
+                return  # invalidated while loading
+
+            old = self._entries.get(key)
+            entry = _Entry(responses, entity)
+            if old is not None:
+                entry.hits = old.hits
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.stats.evictions += 1
+
+    def invalidate(self, entity: str) -> None:
+        """Drop all cached entries of `entity`."""
+        entity = entity.lower()
+        with self._lock:
+            self._versions[entity] = self._versions.get(entity, 0) + 1
+            keys = [k for k, e in self._entries.items() if e.entity == entity]
+            for key in keys:
+                del self._entries[key]
+            self.stats.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            for entity in {e.entity for e in self._entries.values()}:
+                self._versions[entity] = self._versions.get(entity, 0) + 1
+            self._entries.clear()
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import threading
+from typing import Iterator
+from typing import Sequence
+
+from .request import Operation
+
+
+class ChunkSizer:
+    """
+    Picks how many transactions to put in the next chunk so that each chunk
+    takes about `target_latency` seconds on the firewall.
+
+    The time per transaction is a moving average of the observed chunks, so
+    the chunk size follows the firewall's load as it changes.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_entities: int,
+        target_latency: float,
+        initial_entities: int = 50,
+        smoothing: float = 0.3,
+    ) -> None:
+        self.max_entities = max_entities
+        self.target_latency = target_latency
+        self.smoothing = smoothing
+        self.size = max(1, min(initial_entities, max_entities))
+
+        self._per_entity: float | None = None  # seconds
+        self._lock = threading.Lock()
+
+    def observe(self, entities: int, elapsed: float) -> None:
+        """Record that a chunk of `entities` transactions took `elapsed`
+        seconds, and update the next chunk size.
+        """
+        if entities <= 0:
+            return
+
+        with self._lock:
+            per_entity = elapsed / entities
+            if self._per_entity is None:
+                self._per_entity = per_entity
+            else:
+                self._per_entity += self.smoothing * (
+                    per_entity - self._per_entity
+                )
+
+            if self._per_entity <= 0:
+                size = self.max_entities
+            else:
+                size = int(self.target_latency / self._per_entity)
+            self.size = max(1, min(size, self.max_entities))
+
+
+def iter_chunks(
+    operations: Sequence[Operation],
+    sizer: ChunkSizer,
+    max_bytes: int,
+) -> Iterator[list[Operation]]:
+    """Split `operations` (from Request.operations()) into consecutive chunks
+    of at most `sizer.size` transactions and roughly `max_bytes` of XML.
+
+    A transaction larger than `max_bytes` is sent in a chunk of its own.
+    The chunk size is read as each chunk is started, so that it follows the
+    sizer's latest estimate.
+    """
+    chunk: list[Operation] = []
+    chunk_bytes = 0
+    for operation in operations:
+        size = len(operation.xml)
+        if chunk and (
+            len(chunk) >= sizer.size or chunk_bytes + size > max_bytes
+        ):
+            yield chunk
+            chunk = []
+            chunk_bytes = 0
+
+        chunk.append(operation)
+        chunk_bytes += size
+
+    if chunk:
+        yield chunk
@@ -1,23 +1,125 @@
 from __future__ import annotations
 
 import os
+import ssl
+import threading
+import time
 import urllib.parse
+import uuid
 import warnings
+from collections import deque
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from getpass import getpass
-from urllib.request import urlopen
+from typing import BinaryIO
+from typing import Callable
+from typing import Iterable
+from typing import Iterator
+from typing import cast
 from xml.etree.ElementTree import Element
 
 import dotenv
 from defusedxml import ElementTree as ET  # type: ignore
 
 from .api_factory import _create_element
+from .cache import ResponseCache
+from .chunking import ChunkSizer
+from .chunking import iter_chunks
+from .connection_pool import ConnectionPool
+from .expat_parser import parse_responses
+from .instrumentation import CallStats
+from .prepared import Sendable
 from .request import Request
 from .response import Response
+from .resultset import ResultSet
+from .throttle import RetryPolicy
+from .throttle import TokenBucket
+from .throttle import only_reads
+
+API_PATH = "/webconsole/APIController"
+
+# how replies are parsed, see BaseClient
+PARSERS = ("etree", "expat")
+_READ_SIZE = 64 * 1024
+
+# strategies of get_many, see BaseClient._get_many_batches
+GET_MANY_STRATEGIES = ("auto", "batch", "parallel")
+# with "auto", fetch a type on its own once it held this many entities
+_PARALLEL_MIN_ENTITIES = 1000
+
+# Request methods whose results can be kept in a ResponseCache
+_CACHEABLE_CALLS = {
+    "get",
+    "get_filter",
+    "get_zones",
+    "get_zone",
+    "get_zones_like",
+    "get_zones_except",
+}
+
+
+def _encode_multipart(
+    field: str, value: bytes
+) -> tuple[str, tuple[bytes, ...], int]:
+    """Encode `value` as the only field of a multipart/form-data body.
+
+    The body is returned as chunks so that `value` is not copied, along with
+    the content type and total length.
+    """
+    boundary = uuid.uuid4().hex
+    head = (
+        f"--{boundary}\r\n"
+        f'Content-Disposition: form-data; name="{field}"\r\n'
+        "Content-Type: application/xml\r\n"
+        "\r\n"
+    ).encode("ascii")
+    tail = f"\r\n--{boundary}--\r\n".encode("ascii")
+
+    body = (head, value, tail)
+    length = len(head) + len(value) + len(tail)
+    return f"multipart/form-data; boundary={boundary}", body, length
+
+
+def _iterparse_responses(stream: BinaryIO) -> Iterator[tuple[str, Response]]:
+    """Yield a (tag, Response) pair for each direct child of the reply's root
+    as soon as it is complete, then discard it.
+    """
+    depth = 0
+    root = None
+    for event, elem in ET.iterparse(stream, events=("start", "end")):
+        if event == "start":
+            if root is None:
+                root = elem
+            depth += 1
+            continue
+
+        depth -= 1
+        if depth != 1:  # not a direct child of the root <Response>
+            continue
+
+        response = Response(elem)
+        root.clear()
+        yield elem.tag, response
+
+
+class _CountingReader:
+    """Reads from a binary stream, counting the bytes read."""
+
+    def __init__(self, stream: BinaryIO) -> None:
+        self._stream = stream
+        self.bytes_read = 0
+
+    def read(self, size: int = -1) -> bytes:
+        data = self._stream.read(size)
+        self.bytes_read += len(data)
+        return data
 
 
-class Client:
+class BaseClient:
     """
-    Interfaces with the Sophos XG API server.
+    Credentials and request/response handling shared by Client and
+    AsyncClient. The transport is left to the subclasses.
     """
 
     def __init__(
@@ -29,7 +131,18 @@ class Client:
         server: str | None = None,
         port: int = 4444,
         apiversion: str = "1805.2",
+        post_threshold: int | None = 2048,
+        parser: str = "etree",
+        lazy_responses: bool = False,
+        result_sets: bool = False,
+        on_call: Callable[[CallStats], None] | None = None,
     ) -> None:
+        if parser not in PARSERS:
+            raise ValueError(
+                f"Unknown parser {parser!r}, expected one of {PARSERS}"
+            )
+        if lazy_responses and parser != "expat":
+            raise ValueError("lazy_responses needs the expat parser")
 
         self.username = username
         self.password = password
@@ -37,6 +150,28 @@ class Client:
         self.server = server
         self.port = port
         self.apiversion = apiversion
+        # requests larger than this many bytes are sent as a POST body
+        # rather than in the URL. None always uses the URL.
+        self.post_threshold = post_threshold
+        # "etree" builds an ElementTree of the reply and converts it, "expat"
+        # converts the reply to Responses as it is parsed, which is faster
+        # and uses less memory for large replies
+        self.parser = parser
+        # get results as LazyResponses, which keep the XML of the entity and
+        # only convert it when read
+        self.lazy_responses = lazy_responses
+        # return the results of gets and get_many as ResultSets, which index
+        # them for lookups by field
+        self.result_sets = result_sets
+        # called with the CallStats of each call, see _timed_serialize
+        self.on_call = on_call
+
+        # see _login_xml
+        self._login = ""
+        self._login_key: tuple | None = None
+
+        # number of entities last returned for each type by get_many
+        self._entity_counts: dict[str, int] = {}
 
         dotenv.load_dotenv()
 
@@ -64,47 +199,206 @@ class Client:
             warnings.warn(  # type: ignore
                 "Password is not encrypted - Check the Sophos Docs for "
                 "instructions how to encrypt your password.",
-                stacklevel=2,
+                stacklevel=3,
             )
 
-    def send(self, request: Request) -> list[Response]:
-        response_element = self._make_api_call(request)
-        responses = self._parse_response(response_element)
-        return responses
+    def _build_http_request(
+        self, reqxml: bytes
+    ) -> tuple[str, str, Iterable[bytes] | None, dict[str, str]]:
+        """Return the method, url, body and headers to send `reqxml` with.
 
-    def _make_api_call(self, request: Request) -> Element:
-        request.set_login(self.get_login_tag())
-        req_str = urllib.parse.quote(str(request))
-        # TODO: exception handling
-        # try
-        response_http = urlopen(
-            f"https://{self.server}:{self.port}/webconsole/APIController?reqxml={req_str}"  # noqa: E501
-        )
+        Small requests go in the query string. Large ones are sent as a
+        multipart/form-data POST so they do not hit URL length limits and
+        skip the percent-encoding.
+        """
+        if self.post_threshold is None or len(reqxml) <= self.post_threshold:
+            req_str = urllib.parse.quote(reqxml)
+            return "GET", f"{API_PATH}?reqxml={req_str}", None, {}
+
+        content_type, body, length = _encode_multipart("reqxml", reqxml)
+        headers = {
+            "Content-Type": content_type,
+            "Content-Length": str(length),
+        }
+        return "POST", API_PATH, body, headers
 
-        response_element = ET.fromstring(response_http.read())
-        return response_element
+    def _serialize_request(self, request: Sendable) -> bytes:
+        return request.to_bytes(login=self._login_xml())
 
-    def _parse_response(self, response_element: Element) -> list[Response]:
-        responses = [Response(e) for e in response_element]
+    def _login_xml(self) -> str:
+        """The XML of the login tag, written once for each set of
+        credentials.
+        """
+        key = (self.username, self.password, self.is_encrypted)
+        if self._login_key != key:
+            self._login = ET.tostring(self.get_login_tag(), encoding="unicode")
+            self._login_key = key
+        return self._login
+
+    def _parse_response(
+        self, response_element: Element, request: Sendable | None = None
+    ) -> list[Response]:
+        pairs = ((e.tag, Response(e)) for e in response_element)
+        return list(self._keep_responses(pairs, request))
 
-        # don't need to store the Successful Authentication response:
-        login_response = next(
-            (
-                r
-                for r in responses
-                if r.data["message"] == "Authentication Successful"
-            ),
-            None,
-        )
-        if login_response is not None:
-            responses.remove(login_response)
+    def _parse_response_body(
+        self, response_body: bytes, request: Sendable | None = None
+    ) -> list[Response]:
+        if self.parser == "expat":
+            pairs = parse_responses((response_body,), self.lazy_responses)
+            return list(self._keep_responses(pairs, request))
+        return self._parse_response(ET.fromstring(response_body), request)
+
+    # INSTRUMENTATION, only used when on_call is set
+    def _timed_serialize(
+        self, request: Sendable, stats: CallStats
+    ) -> tuple[str, str, Iterable[bytes] | None, dict[str, str]]:
+        """_build_http_request(_serialize_request(request)), timed into
+        `stats`.
+        """
+        start = time.perf_counter()
+        reqxml = self._serialize_request(request)
+        serialized = time.perf_counter()
+        http_request = self._build_http_request(reqxml)
+        stats.serialize_seconds = serialized - start
+        stats.encode_seconds = time.perf_counter() - serialized
+        stats.request_bytes = len(reqxml)
+        stats.method = http_request[0]
+        return http_request
+
+    def _timed_parse(
+        self, response_body: bytes, request: Sendable, stats: CallStats
+    ) -> list[Response]:
+        """_parse_response_body, timed into `stats`."""
+        stats.response_bytes = len(response_body)
+        start = time.perf_counter()
+        if self.parser == "expat":
+            responses = self._parse_response_body(response_body, request)
+            stats.parse_seconds = time.perf_counter() - start
+        else:
+            element = ET.fromstring(response_body)
+            parsed = time.perf_counter()
+            responses = self._parse_response(element, request)
+            stats.parse_seconds = parsed - start
+            stats.convert_seconds = time.perf_counter() - parsed
+        stats.count(responses)
+        return responses
 
-        # TODO
-        # for each response:
-        #     find corresponding request using transactionid
-        #     set a reference to the request in the response
+    def _iter_parse_response(
+        self, stream: BinaryIO, request: Sendable | None = None
+    ) -> Iterator[Response]:
+        """Incrementally parse a response body, yielding each Response as soon
+        as its element is complete. Elements are discarded once converted, so
+        memory use does not grow with the number of entities returned.
+        """
+        if self.parser == "expat":
+            chunks = iter(lambda: stream.read(_READ_SIZE), b"")
+            pairs = parse_responses(chunks, self.lazy_responses)
+        else:
+            pairs = _iterparse_responses(stream)
+        return self._keep_responses(pairs, request)
+
+    def _keep_responses(
+        self,
+        pairs: Iterable[tuple[str, Response]],
+        request: Sendable | None,
+    ) -> Iterator[Response]:
+        """Link (tag, Response) pairs to the transactions of `request`,
+        leaving out the successful login.
+        """
+        for tag, response in pairs:
+            # don't need to store the Successful Authentication response:
+            if tag == "Login" and response.status_code == 200:
+                continue
+            if request is not None:
+                response.transaction = request.transactions.get(
+                    response.transactionid
+                )
+            yield response
+
+    def _get_many_batches(
+        self, entity_types: list[str], strategy: str, workers: int
+    ) -> list[list[str]]:
+        """Split the types of get_many into the batches to send, one request
+        each, at the same time.
+
+        The firewall processes the transactions of a request one after the
+        other, so a batch saves round-trips but not processing time. With
+        "auto", types which returned many entities before each get their own
+        request, and the other types share one.
+        """
+        if strategy not in GET_MANY_STRATEGIES:
+            raise ValueError(
+                f"Unknown strategy {strategy!r}, "
+                f"expected one of {GET_MANY_STRATEGIES}"
+            )
+        if not entity_types:
+            return []
+        if strategy == "parallel":
+            return [[t] for t in entity_types]
+        if strategy == "batch" or workers < 2 or len(entity_types) < 2:
+            return [entity_types]
+
+        large = [
+            t
+            for t in entity_types
+            if self._entity_counts.get(t, 0) >= _PARALLEL_MIN_ENTITIES
+        ]
+        small = [t for t in entity_types if t not in large]
+        return [[t] for t in large] + ([small] if small else [])
+
+    def _get_many_request(self, entity_types: Iterable[str]) -> Request:
+        request = Request(apiversion=self.apiversion)
+        for entity in entity_types:
+            request.get(entity)
+        return request
+
+    def _group_by_entity(
+        self, entity_types: list[str], responses: Iterable[Response]
+    ) -> dict[str, list[Response]]:
+        """Group the responses of get_many by the entity type of their
+        transaction. Those without one, such as an error status for the
+        whole request, are given to every type.
+        """
+        grouped: dict[str, list[Response]] = {t: [] for t in entity_types}
+        for response in responses:
+            transaction = response.transaction
+            if transaction is not None:
+                grouped[transaction.entity].append(response)
+            else:
+                for entity_responses in grouped.values():
+                    entity_responses.append(response)
+        for entity, entity_responses in grouped.items():
+            self._entity_counts[entity] = len(entity_responses)
+            if self.result_sets:
+                grouped[entity] = ResultSet(entity_responses)
+        return grouped
+
+    def _get_result(
+        self, fn_name: str, responses: list[Response]
+    ) -> list[Response]:
+        """The responses of a proxy call, as a ResultSet for the gets when
+        result_sets is set.
+        """
+        if self.result_sets and fn_name in _CACHEABLE_CALLS:
+            return ResultSet(responses)
         return responses
 
+    def _parse_login(self, response_element: Element) -> dict:
+        """Build the test_login result from a login-only response."""
+        status_code = -1
+        message = "No response"
+        if len(response_element) == 1:
+
+            response = Response(response_element[0])
+            status_code = response.status_code
+            message = response.data["message"]  # type: ignore
+
+        return {
+            "status_code": status_code,
+            "message": message,
+        }
+
     def get_login_tag(self) -> Element:
         login = _create_element("Login")
         login_username = _create_element("Username", text=self.username)
@@ -117,6 +411,393 @@ class Client:
 
         return login
 
+
+class Client(BaseClient):
+    """
+    Interfaces with the Sophos XG API server.
+    """
+
+    def __init__(
+        self,
+        *,
+        username: str | None = None,
+        password: str | None = None,
+        is_encrypted: bool = True,
+        server: str | None = None,
+        port: int = 4444,
+        apiversion: str = "1805.2",
+        pool_size: int = 4,
+        idle_timeout: float = 60.0,
+        timeout: float | None = None,
+        ssl_context: ssl.SSLContext | None = None,
+        post_threshold: int | None = 2048,
+        parser: str = "etree",
+        lazy_responses: bool = False,
+        result_sets: bool = False,
+        cache: ResponseCache | None = None,
+        on_call: Callable[[CallStats], None] | None = None,
+        rate_limiter: TokenBucket | None = None,
+        max_concurrency: int | None = None,
+        retry: RetryPolicy | None = None,
+    ) -> None:
+        super().__init__(
+            username=username,
+            password=password,
+            is_encrypted=is_encrypted,
+            server=server,
+            port=port,
+            apiversion=apiversion,
+            post_threshold=post_threshold,
+            parser=parser,
+            lazy_responses=lazy_responses,
+            result_sets=result_sets,
+            on_call=on_call,
+        )
+        # optional cache of get results, see ResponseCache
+        self.cache = cache
+
+        # calls are limited to the rate of rate_limiter, and to at most
+        # max_concurrency at once, see _throttled
+        self.rate_limiter = rate_limiter
+        self._slots: threading.BoundedSemaphore | None = None
+        if max_concurrency is not None:
+            self._slots = threading.BoundedSemaphore(max_concurrency)
+        # how failed calls are retried, see RetryPolicy. None never retries.
+        self.retry = retry
+
+        # connections are kept alive and reused between calls
+        self.pool = ConnectionPool(
+            self.server,
+            self.port,
+            maxsize=pool_size,
+            idle_timeout=idle_timeout,
+            timeout=timeout,
+            ssl_context=ssl_context,
+        )
+
+    def close(self) -> None:
+        """Close the connections kept open to the firewall."""
+        self.pool.close()
+
+    def __enter__(self) -> Client:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def send(self, request: Sendable) -> list[Response]:
+        responses = self._send_once(request)
+        if self.retry is not None and isinstance(request, Request):
+            responses = self._retry_busy(request, responses, self.retry)
+        return responses
+
+    def _send_once(self, request: Sendable) -> list[Response]:
+        if self.on_call is not None:
+            return self._send_instrumented(request)
+        try:
+            response_body = self._make_api_call(request)
+        finally:
+            self._invalidate_cache(request)
+        return self._parse_response_body(response_body, request)
+
+    def _retry_busy(
+        self, request: Request, responses: list[Response], retry: RetryPolicy
+    ) -> list[Response]:
+        """Send the transactions answered with a busy status again, on their
+        own and with the same transactionids, and put their new responses in
+        place of the busy ones. A busy response is kept when the retry has no
+        answer for its transaction.
+        """
+        for attempt in range(retry.attempts - 1):
+            busy = {
+                r.transactionid
+                for r in responses
+                if r.status_code in retry.statuses and r.transaction
+            }
+            if not busy:
+                break
+            time.sleep(retry.delay(attempt))
+
+            subrequest = request.subrequest(
+                op for op in request.operations() if op.transactionid in busy
+            )
+            retried: dict[str | None, list[Response]] = {}
+            for response in self._send_once(subrequest):
+                retried.setdefault(response.transactionid, []).append(response)
+
+            merged: list[Response] = []
+            for response in responses:
+                if response.transactionid not in busy:
+                    merged.append(response)
+                elif response.transactionid in retried:
+                    merged.extend(retried.pop(response.transactionid))
+                else:  # not answered, eg the whole retry was refused
+                    merged.append(response)
+            responses = merged
+        return responses
+
+    @contextmanager
+    def _throttled(self) -> Iterator[None]:
+        """Wait for a free slot under max_concurrency, then for the rate
+        limiter, and hold the slot until the block ends.
+        """
+        if self._slots is None:
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+            yield
+            return
+        with self._slots:
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+            yield
+
+    def _request_bytes(
+        self,
+        request: Sendable,
+        http_request: tuple[str, str, Iterable[bytes] | None, dict[str, str]],
+    ) -> bytes:
+        """Send `http_request`, made from `request`, and return the reply.
+        Throttled, and retried following the RetryPolicy.
+        """
+        attempt = 0
+        while True:
+            try:
+                with self._throttled():
+                    return self.pool.request(
+                        *http_request, resend=only_reads(request)
+                    )
+            except Exception as e:
+                retry = self.retry
+                if retry is None or not retry.should_retry(
+                    request, e, attempt
+                ):
+                    raise
+            time.sleep(retry.delay(attempt))
+            attempt += 1
+
+    def _send_instrumented(self, request: Sendable) -> list[Response]:
+        """send, timing each phase of the call for `on_call`."""
+        stats = CallStats(len(request.transactions))
+        with self._reported(stats):
+            http_request = self._timed_serialize(request, stats)
+            try:
+                return self._timed_call(request, http_request, stats)
+            finally:
+                self._invalidate_cache(request)
+
+    def _timed_call(
+        self,
+        request: Sendable,
+        http_request: tuple[str, str, Iterable[bytes] | None, dict[str, str]],
+        stats: CallStats,
+    ) -> list[Response]:
+        """_request_bytes and _parse_response_body, timed into `stats`."""
+        start = time.perf_counter()
+        try:
+            response_body = self._request_bytes(request, http_request)
+        finally:
+            stats.network_seconds = time.perf_counter() - start
+        return self._timed_parse(response_body, request, stats)
+
+    @contextmanager
+    def _reported(self, stats: CallStats) -> Iterator[None]:
+        """Give `stats` to on_call once the block ends, with the error that
+        it raised, if any.
+        """
+        try:
+            yield
+        except GeneratorExit:  # iter_send was not read to the end
+            raise
+        except BaseException as e:
+            stats.error = e
+            raise
+        finally:
+            if self.on_call is not None:
+                self.on_call(stats)
+
+    def _invalidate_cache(self, request: Sendable) -> None:
+        """Drop cached results of the entities that `request` writes to.
+        Done even if the call failed, as some writes may have been applied.
+        """
+        if self.cache is None:
+            return
+        entities = {
+            t.entity
+            for t in request.transactions.values()
+            if t.operation != "get"
+        }
+        for entity in entities:
+            self.cache.invalidate(entity)
+
+    def send_chunked(
+        self,
+        request: Request,
+        *,
+        max_entities: int = 500,
+        max_bytes: int = 512 * 1024,
+        target_latency: float = 5.0,
+        max_in_flight: int = 1,
+    ) -> list[Response]:
+        """Send a large request as a series of smaller ones and return all
+        of the responses, in order.
+
+        Each chunk holds at most `max_entities` transactions and about
+        `max_bytes` of XML. Within those limits, the chunk size is adapted so
+        that each chunk takes about `target_latency` seconds to process.
+
+        The next chunk is serialised while the previous one is in flight.
+        With `max_in_flight` above 1, several chunks are sent at once over
+        separate connections: only do this when the transactions do not
+        depend on each other, as the order they are applied is then lost.
+
+        Each chunk is a call of its own to the `on_call` hook. With a
+        RetryPolicy, the transactions of a chunk answered with a busy status
+        are sent again as with `send`, before the chunk counts as done.
+        """
+        operations = request.operations()
+        if not operations:
+            return self.send(request)
+
+        sizer = ChunkSizer(
+            max_entities=max_entities, target_latency=target_latency
+        )
+
+        def send_chunk(
+            subrequest: Request,
+            http_request: tuple[
+                str, str, Iterable[bytes] | None, dict[str, str]
+            ],
+            entities: int,
+            stats: CallStats | None,
+        ) -> list[Response]:
+            if stats is not None:
+                with self._reported(stats):
+                    responses = self._timed_call(request, http_request, stats)
+                sizer.observe(entities, stats.network_seconds)
+            else:
+                start = time.perf_counter()
+                response_body = self._request_bytes(request, http_request)
+                sizer.observe(entities, time.perf_counter() - start)
+                responses = self._parse_response_body(response_body, request)
+
+            if self.retry is not None:
+                responses = self._retry_busy(subrequest, responses, self.retry)
+            return responses
+
+        futures: list[Future] = []
+        in_flight: deque[Future] = deque()
+        try:
+            with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+                for chunk in iter_chunks(operations, sizer, max_bytes):
+                    subrequest = request.subrequest(chunk)
+                    stats = None
+                    if self.on_call is None:
+                        http_request = self._build_http_request(
+                            self._serialize_request(subrequest)
+                        )
+                    else:
+                        stats = CallStats(len(chunk))
+                        http_request = self._timed_serialize(subrequest, stats)
+
+                    while len(in_flight) >= max_in_flight:
+                        in_flight.popleft().result()  # raises on error
+
+                    future = executor.submit(
+                        send_chunk, subrequest, http_request, len(chunk), stats
+                    )
+                    futures.append(future)
+                    in_flight.append(future)
+        finally:
+            self._invalidate_cache(request)
+
+        responses = []
+        for future in futures:
+            responses.extend(future.result())
+        return responses
+
+    def get_many(
+        self, entity_types: Iterable[str], strategy: str = "auto"
+    ) -> dict[str, list[Response]]:
+        """Get all the entities of several types, as a dict of their
+        responses by type.
+
+        With strategy "batch" all the gets are sent in one request. With
+        "parallel" each type is sent in its own request, up to `pool_size` at
+        once. "auto" sends each type which returned many entities before in
+        its own request, in parallel, and batches the others together.
+        Results are not taken from the cache.
+        """
+        types = list(dict.fromkeys(entity_types))
+        workers = min(len(types), self.pool.maxsize)
+        batches = self._get_many_batches(types, strategy, workers)
+
+        if not batches:
+            return {}
+        if len(batches) == 1:
+            responses = self.send(self._get_many_request(batches[0]))
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                results = executor.map(
+                    lambda b: self.send(self._get_many_request(b)), batches
+                )
+                responses = [r for result in results for r in result]
+        return self._group_by_entity(types, responses)
+
+    def iter_send(self, request: Sendable) -> Iterator[Response]:
+        """Like send, but yields each Response while the rest of the reply is
+        still being received and parsed.
+
+        The connection is only released once the iterator is exhausted.
+        """
+        if self.on_call is not None:
+            yield from self._iter_send_instrumented(request)
+            return
+
+        reqxml = self._serialize_request(request)
+        try:
+            with self._throttled(), self.pool.urlopen(
+                *self._build_http_request(reqxml), resend=only_reads(request)
+            ) as response:
+                yield from self._iter_parse_response(response, request)
+        finally:
+            self._invalidate_cache(request)
+
+    def _iter_send_instrumented(self, request: Sendable) -> Iterator[Response]:
+        """iter_send, timing each phase of the call for `on_call`.
+
+        The network time is until the reply starts to arrive. Reading the
+        rest of it is part of the parse time, which leaves out the time that
+        the caller spends between Responses.
+        """
+        stats = CallStats(len(request.transactions))
+        with self._reported(stats):
+            http_request = self._timed_serialize(request, stats)
+            start = time.perf_counter()
+            try:
+                with self._throttled(), self.pool.urlopen(
+                    *http_request, resend=only_reads(request)
+                ) as response:
+                    stats.network_seconds = time.perf_counter() - start
+                    stream = _CountingReader(response)
+                    responses = self._iter_parse_response(
+                        cast(BinaryIO, stream), request
+                    )
+                    while True:
+                        start = time.perf_counter()
+                        item = next(responses, None)
+                        stats.parse_seconds += time.perf_counter() - start
+                        stats.response_bytes = stream.bytes_read
+                        if item is None:
+                            break
+                        stats.count((item,))
+                        yield item
+            finally:
+                self._invalidate_cache(request)
+
+    def _make_api_call(self, request: Sendable) -> bytes:
+        reqxml = self._serialize_request(request)
+        return self._request_bytes(request, self._build_http_request(reqxml))
+
     def test_login(self) -> dict:
         """Run a login-only request to test client-server access and
         authentication.
@@ -126,20 +807,8 @@ class Client:
         """
 
         request = Request(apiversion=self.apiversion)
-        response_element = self._make_api_call(request)
-
-        status_code = -1
-        message = "No response"
-        if len(response_element) == 1:
-
-            response = Response(response_element[0])
-            status_code = response.status_code
-            message = response.data["message"]  # type: ignore
-
-        return {
-            "status_code": status_code,
-            "message": message,
-        }
+        response_body = self._make_api_call(request)
+        return self._parse_login(ET.fromstring(response_body))
 
     # PROXIES FOR REQUEST
     def _request_proxy_call(
@@ -148,12 +817,38 @@ class Client:
         """Proxy to run one-off Request methods.
 
         Call Request.fn_name(*args, **kwargs)
+        Get calls are answered from the cache when one is set.
         """
+        if self.cache is not None and fn_name in _CACHEABLE_CALLS:
+            if "zone" in fn_name:
+                entity = "Zone"
+            else:
+                entity = args[0] if args else kwargs["entity"]
+            # criteria may be given as a list
+            key = (
+                fn_name,
+                args,
+                tuple(
+                    (k, tuple(v) if isinstance(v, list) else v)
+                    for k, v in sorted(kwargs.items())
+                ),
+            )
+            return self.cache.get(
+                key,
+                entity,
+                lambda: self._send_proxy_call(fn_name, *args, **kwargs),
+            )
+
+        return self._send_proxy_call(fn_name, *args, **kwargs)
+
+    def _send_proxy_call(
+        self, fn_name: str, *args, **kwargs
+    ) -> list[Response]:
         request = Request(apiversion=self.apiversion)
         getattr(request, fn_name)(*args, **kwargs)
 
         responses = self.send(request)
-        return responses
+        return self._get_result(fn_name, responses)
 
     # GENERIC METHODS
     def get(self, *args, **kwargs) -> list[Response]:
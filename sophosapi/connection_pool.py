@@ -0,0 +1,225 @@
+from __future__ import annotations
+
+import http.client
+import select
+import ssl
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Deque
+from typing import Iterable
+from typing import Iterator
+from typing import Mapping
+from typing import Tuple
+from urllib.error import HTTPError
+
+# errors raised when the server has silently closed a kept-alive connection
+_RESET_ERRORS = (
+    ConnectionResetError,
+    BrokenPipeError,
+    ConnectionAbortedError,
+    http.client.RemoteDisconnected,
+    http.client.BadStatusLine,
+)
+
+
+def _is_dropped(conn: http.client.HTTPConnection) -> bool:
+    """Whether the server has closed an idle connection. Nothing is due on
+    it, so a readable socket means the server has sent EOF, or its alert.
+    """
+    sock = conn.sock
+    if sock is None:
+        return True
+    try:
+        readable, _, _ = select.select([sock], [], [], 0)
+    except (OSError, ValueError):  # closed, or no longer a socket
+        return True
+    return bool(readable)
+
+
+class PoolStats:
+    """Counters describing how well connections are being reused."""
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.connections_created = 0
+        self.connections_reused = 0
+        self.reconnects = 0
+        self.evictions = 0
+
+    @property
+    def reuse_rate(self) -> float:
+        """Fraction of requests which did not need a new connection."""
+        if self.requests == 0:
+            return 0.0
+        return self.connections_reused / self.requests
+
+    def as_dict(self) -> dict:
+        return {
+            "requests": self.requests,
+            "connections_created": self.connections_created,
+            "connections_reused": self.connections_reused,
+            "reconnects": self.reconnects,
+            "evictions": self.evictions,
+            "reuse_rate": self.reuse_rate,
+        }
+
+    def __repr__(self) -> str:
+        return f"PoolStats({self.as_dict()})"
+
+
+class ConnectionPool:
+    """
+    Keeps HTTPS connections to one firewall alive between API calls, so that
+    consecutive calls skip the TCP connect and the TLS handshake.
+
+    `maxsize` is the number of idle connections kept open. Connections which
+    were idle for longer than `idle_timeout` seconds are closed rather than
+    reused, as the firewall would have dropped them by then anyway, as are
+    those which the firewall has already closed.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        *,
+        maxsize: int = 4,
+        idle_timeout: float = 60.0,
+        timeout: float | None = None,
+        ssl_context: ssl.SSLContext | None = None,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.maxsize = maxsize
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self.ssl_context = ssl_context or ssl.create_default_context()
+        self.stats = PoolStats()
+
+        # (connection, time it was returned to the pool)
+        self._idle: Deque[Tuple[http.client.HTTPConnection, float]] = deque()
+        self._lock = threading.Lock()
+
+    def _new_connection(self) -> http.client.HTTPConnection:
+        with self._lock:
+            self.stats.connections_created += 1
+        return http.client.HTTPSConnection(
+            self.host,
+            self.port,
+            timeout=self.timeout,
+            context=self.ssl_context,
+        )
+
+    def _get_connection(self) -> tuple[http.client.HTTPConnection, bool]:
+        """Return an idle connection if one is available, or a new one.
+        The second item is True when the connection is being reused.
+        """
+        now = time.monotonic()
+        with self._lock:
+            self.stats.requests += 1
+            while self._idle:
+                conn, last_used = self._idle.pop()  # most recently used
+                if now - last_used > self.idle_timeout or _is_dropped(conn):
+                    self.stats.evictions += 1
+                    conn.close()
+                    continue
+                self.stats.connections_reused += 1
+                return conn, True
+
+        return self._new_connection(), False
+
+    def _put_connection(self, conn: http.client.HTTPConnection) -> None:
+        with self._lock:
+            if len(self._idle) < self.maxsize:
+                self._idle.append((conn, time.monotonic()))
+                return
+        conn.close()
+
+    @contextmanager
+    def urlopen(
+        self,
+        method: str,
+        url: str,
+        body: bytes | Iterable[bytes] | None = None,
+        headers: Mapping[str, str] | None = None,
+        *,
+        resend: bool = False,
+    ) -> Iterator[http.client.HTTPResponse]:
+        """Send the request and yield the response, which is returned to the
+        pool once the body has been read.
+
+        An idle connection which the server has closed is not reused. One
+        which is reset by the server all the same is replaced by a new one and
+        the request sent once more, so an iterable `body` must be iterable
+        more than once (eg a tuple). This is only done if the connection
+        failed while sending the request, or if `resend` is set. A request
+        which was sent in full may have been processed, so set `resend` only
+        for requests which are safe to repeat, such as gets.
+        """
+        headers = dict(headers or {})
+        conn, reused = self._get_connection()
+        sent = False
+        try:
+            conn.request(method, url, body=body, headers=headers)
+            sent = True
+            response = conn.getresponse()
+        except _RESET_ERRORS:
+            conn.close()
+            if not reused or (sent and not resend):
+                raise
+            with self._lock:
+                self.stats.reconnects += 1
+            conn = self._new_connection()
+            try:
+                conn.request(method, url, body=body, headers=headers)
+                response = conn.getresponse()
+            except BaseException:
+                conn.close()
+                raise
+        except BaseException:
+            conn.close()
+            raise
+
+        try:
+            if response.status >= 400:  # same behaviour as urllib's urlopen
+                raise HTTPError(
+                    url,
+                    response.status,
+                    response.reason,
+                    response.headers,  # type: ignore
+                    None,
+                )
+            yield response
+        except BaseException:
+            conn.close()
+            raise
+
+        if response.will_close or not response.isclosed():
+            # server asked to close, or the body was not fully consumed
+            conn.close()
+        else:
+            self._put_connection(conn)
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        body: bytes | Iterable[bytes] | None = None,
+        headers: Mapping[str, str] | None = None,
+        *,
+        resend: bool = False,
+    ) -> bytes:
+        """Send the request and return the full response body."""
+        with self.urlopen(
+            method, url, body, headers, resend=resend
+        ) as response:
+            return response.read()
+
+    def close(self) -> None:
+        """Close all idle connections."""
+        with self._lock:
+            while self._idle:
+                conn, _ = self._idle.pop()
+                conn.close()
@@ -0,0 +1,367 @@
+from __future__ import annotations
+
+from typing import Any
+from typing import Callable
+from typing import Collection
+from typing import Iterable
+from typing import Iterator
+from typing import List
+from xml.etree.ElementTree import ParseError
+from xml.parsers import expat
+
+from defusedxml.common import EntitiesForbidden  # type: ignore
+from defusedxml.common import ExternalReferenceForbidden  # type: ignore
+
+from .response import _login_status
+from .response import LazyResponse
+from .response import Response
+from .xml_converter import _DICT
+from .xml_converter import _FLAT_LIST
+from .xml_converter import _FLAT_LISTS
+from .xml_converter import _HOSTS
+from .xml_converter import _kind
+from .xml_converter import _LIST
+
+# Frame kinds besides those of xml_converter, for elements which are not
+# converted with the xml_to_json rules
+_IGNORE = 10  # content is not used
+_TEXT = 11  # only the text is used, children are ignored
+_FLAT_ITEM = 12  # an AccessPath or Exception
+_TOP_LOGIN = 13  # <Login>, reads ./status
+_TOP_STATUS = 14  # <Status>, an error for the whole request
+_TOP_RESULT = 15  # result of set/add/update/remove, reads ./Status
+_TOP_GET = 16  # an entity returned by a get
+
+
+# An open element is a list: [tag, kind, text, value, attrib]. Lists are used
+# rather than a class as there is one per element, and most are leaves.
+#  - text is the text before the first child, like Element.text
+#  - value is the converted children, None until the first child. For Login
+#    and results it is the frame of the status child instead, and for _TEXT
+#    and _TOP_STATUS True once a child has started.
+_Frame = List[Any]
+
+
+class ResponseParser:
+    """
+    Parses the firewall's reply straight into Responses, without building an
+    ElementTree first. The data is the same as with Response(element).
+
+    Like defusedxml, entity declarations and external references are
+    rejected, with the same exceptions.
+
+    Bytes can be fed as they arrive, and each call to `feed` returns the
+    Responses which were completed, as (tag, Response) pairs.
+
+    With `lazy`, get results are returned as LazyResponses holding the XML
+    of their entity, which is only converted when read. With `fields`, only
+    those fields of get results are converted.
+    """
+
+    def __init__(
+        self, *, lazy: bool = False, fields: Collection[str] | None = None
+    ) -> None:
+        parser = expat.ParserCreate()
+        parser.buffer_text = True
+        parser.buffer_size = 64 * 1024
+        if lazy:
+            parser.StartElementHandler = self._lazy_start
+            parser.EndElementHandler = self._lazy_end
+        else:
+            parser.StartElementHandler = self._start
+            parser.EndElementHandler = self._end
+        parser.CharacterDataHandler = self._data
+        # same protections as defusedxml's defaults
+        parser.EntityDeclHandler = _forbid_entity_decl
+        parser.UnparsedEntityDeclHandler = _forbid_unparsed_entity_decl
+        parser.ExternalEntityRefHandler = _forbid_external_ref
+        self._parser = parser
+
+        self._stack: list[_Frame] = []
+        self._done: list[tuple[str, Response]] = []
+        # kind of the children of dicts, by tag
+        self._kinds: dict[str, int] = {}
+        self._fields = None if fields is None else frozenset(fields)
+
+        # for lazy: the bytes not yet known to be done with, starting at
+        # byte _offset of the reply
+        self._lazy = lazy
+        self._buffer = bytearray()
+        self._offset = 0
+        # where the entity being read started, and whether it has content
+        self._span_start: int | None = None
+        self._span_content = False
+        self._span_depth = 0
+        # where the last direct child of <Response> ended
+        self._consumed = 0
+
+    def feed(self, data: bytes) -> list[tuple[str, Response]]:
+        if self._lazy:
+            self._buffer += data
+        self._parse(data, False)
+        if self._lazy:
+            keep = self._consumed
+            if self._span_start is not None:
+                keep = self._span_start
+            del self._buffer[: keep - self._offset]
+            self._offset = keep
+        return self._take_done()
+
+    def close(self) -> list[tuple[str, Response]]:
+        self._parse(b"", True)
+        return self._take_done()
+
+    def _parse(self, data: bytes, is_final: bool) -> None:
+        try:
+            self._parser.Parse(data, is_final)
+        except expat.ExpatError as e:
+            err = ParseError(str(e))
+            err.code = e.code  # type: ignore
+            err.position = (e.lineno, e.offset)  # type: ignore
+            raise err from None
+
+    def _take_done(self) -> list[tuple[str, Response]]:
+        done = self._done
+        self._done = []
+        return done
+
+    # HANDLERS
+    def _start(self, tag: str, attrib: dict) -> None:
+        stack = self._stack
+        if not stack:  # <Response>
+            stack.append([tag, _IGNORE, None, None, None])
+            return
+
+        parent = stack[-1]
+        parent_kind = parent[1]
+
+        if parent_kind == _DICT or parent_kind == _TOP_GET:
+            if parent[3] is None:
+                parent[3] = {}
+            if (
+                parent_kind == _TOP_GET
+                and self._fields is not None
+                and tag not in self._fields
+            ):
+                stack.append([tag, _IGNORE, None, None, None])
+                return
+            kind = self._kinds.get(tag)
+            if kind is None:
+                kind = self._kinds[tag] = _kind(tag)
+            stack.append([tag, kind, None, None, None])
+            return
+
+        if len(stack) == 1:
+            stack.append([tag, _top_kind(tag, attrib), None, None, attrib])
+            return
+
+        if parent_kind == _LIST:
+            if parent[3] is None:
+                parent[3] = []
+            # list items are converted as a whole
+            stack.append([tag, _DICT, None, None, None])
+        elif parent_kind == _FLAT_LIST:
+            if parent[3] is None:
+                parent[3] = []
+            if tag == _FLAT_LISTS[parent[0]][0]:
+                stack.append([tag, _FLAT_ITEM, None, {}, None])
+            else:
+                stack.append([tag, _IGNORE, None, None, None])
+        elif parent_kind == _HOSTS:
+            if parent[3] is None:
+                parent[3] = ([], [])
+            stack.append([tag, _TEXT, None, None, None])
+        elif parent_kind == _FLAT_ITEM:
+            stack.append([tag, _TEXT, None, None, None])
+        elif parent_kind == _TOP_LOGIN and tag == "status":
+            wanted = parent[3] is None
+            stack.append([tag, _TEXT if wanted else _IGNORE, None, None, None])
+        elif parent_kind == _TOP_RESULT and tag == "Status":
+            wanted = parent[3] is None
+            stack.append(
+                [tag, _TEXT if wanted else _IGNORE, None, None, attrib]
+            )
+        else:  # children of _IGNORE, _TEXT, _TOP_STATUS, ...
+            if parent_kind == _TEXT or parent_kind == _TOP_STATUS:
+                parent[3] = True  # the text after it is not used
+            stack.append([tag, _IGNORE, None, None, None])
+
+    def _data(self, data: str) -> None:
+        frame = self._stack[-1]
+        if frame[3] is not None or frame[1] == _IGNORE:
+            return  # after the first child, or not used
+        text = frame[2]
+        frame[2] = data if text is None else text + data
+
+    def _end(self, tag: str) -> None:
+        stack = self._stack
+        frame = stack.pop()
+        if len(stack) < 2:
+            if stack:  # a direct child of <Response>
+                self._done.append((tag, _top_response(frame)))
+            return
+
+        parent = stack[-1]
+        parent_kind = parent[1]
+        value = frame[3]
+
+        if parent_kind == _DICT or parent_kind == _TOP_GET:
+            if value is None:
+                parent[3][tag] = frame[2] or ""
+            elif frame[1] == _HOSTS:
+                parent[3]["Hosts"], parent[3]["DstHosts"] = value
+            else:
+                parent[3][tag] = value
+
+        elif parent_kind == _LIST:
+            parent[3].append(frame[2] or "" if value is None else value)
+
+        elif parent_kind == _FLAT_LIST:
+            if frame[1] == _FLAT_ITEM:
+                parent[3].append(value)
+
+        elif parent_kind == _FLAT_ITEM:
+            key = _FLAT_LISTS[stack[-2][0]][1].get(tag)
+            if key is None:
+                parent[3][tag] = frame[2] or ""
+            elif key in parent[3]:
+                parent[3][key].append(frame[2])
+            else:
+                parent[3][key] = [frame[2]]
+
+        elif parent_kind == _HOSTS:
+            if tag == "Host":
+                parent[3][0].append(frame[2])
+            elif tag == "DstHost":
+                parent[3][1].append(frame[2])
+
+        elif parent_kind == _TOP_LOGIN or parent_kind == _TOP_RESULT:
+            if frame[1] == _TEXT:
+                parent[3] = frame
+
+        # _IGNORE, _TEXT and _TOP_STATUS parents do not use their children
+
+    # HANDLERS with lazy: while within a lazy entity the parser calls the
+    # _span handlers, which only track the depth
+    def _lazy_start(self, tag: str, attrib: dict) -> None:
+        stack = self._stack
+        if len(stack) == 1 and _top_kind(tag, attrib) == _TOP_GET:
+            self._span_start = self._parser.CurrentByteIndex
+            self._span_content = False
+            self._span_depth = 0
+            stack.append([tag, _IGNORE, None, None, attrib])
+            self._set_handlers(self._span_start_handler, self._span_end)
+            self._parser.CharacterDataHandler = self._span_data
+        else:
+            self._start(tag, attrib)
+
+    def _lazy_end(self, tag: str) -> None:
+        self._end(tag)
+        if len(self._stack) == 1:
+            self._consumed = self._parser.CurrentByteIndex
+
+    def _span_start_handler(self, tag: str, attrib: dict) -> None:
+        self._span_content = True
+        self._span_depth += 1
+
+    def _span_data(self, data: str) -> None:
+        self._span_content = True
+
+    def _span_end(self, tag: str) -> None:
+        if self._span_depth:
+            self._span_depth -= 1
+            return
+        self._done.append((tag, self._lazy_response(self._stack.pop())))
+        self._span_start = None
+        self._set_handlers(self._lazy_start, self._lazy_end)
+        self._parser.CharacterDataHandler = self._data
+        self._consumed = self._parser.CurrentByteIndex
+
+    def _set_handlers(self, start: Callable, end: Callable) -> None:
+        self._parser.StartElementHandler = start
+        self._parser.EndElementHandler = end
+
+    def _lazy_response(self, frame: _Frame) -> Response:
+        transactionid = frame[4].get("transactionid")
+        if not self._span_content:  # as with xml_to_json
+            return Response.from_values(transactionid, 200, "")  # type: ignore
+
+        # at the "</" of the entity's end tag
+        start = self._span_start - self._offset  # type: ignore
+        end = 1 + self._buffer.index(
+            b">", self._parser.CurrentByteIndex - self._offset
+        )
+        raw = bytes(self._buffer[start:end])
+        return LazyResponse.from_raw(transactionid, raw)
+
+
+def _top_kind(tag: str, attrib: dict) -> int:
+    """The kind of a direct child of <Response>, following Response()."""
+    if tag == "Status":
+        return _TOP_STATUS
+    if tag == "Login":
+        return _TOP_LOGIN
+    if attrib.get("transactionid", "").startswith("get"):
+        return _TOP_GET
+    return _TOP_RESULT
+
+
+def _top_response(frame: _Frame) -> Response:
+    _, kind, text, value, attrib = frame
+    transactionid = attrib.get("transactionid")
+
+    if kind == _TOP_STATUS:
+        code = int(attrib["code"])
+        return Response.from_values(transactionid, code, {"message": text})
+
+    if kind == _TOP_LOGIN:
+        status_code, message = _login_status(value[2])
+        return Response.from_values(
+            transactionid, status_code, {"message": message}
+        )
+
+    if kind == _TOP_GET:
+        # a str when there are no children, as with xml_to_json
+        data = value if value is not None else text or ""
+        return Response.from_values(transactionid, 200, data)  # type: ignore
+
+    # _TOP_RESULT
+    return Response.from_values(
+        transactionid, int(value[4]["code"]), {"message": value[2]}
+    )
+
+
+def parse_responses(
+    chunks: Iterable[bytes], lazy: bool = False
+) -> Iterator[tuple[str, Response]]:
+    """Parse a reply given as byte chunks, yielding (tag, Response) pairs
+    as soon as each is complete.
+    """
+    parser = ResponseParser(lazy=lazy)
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+    yield from parser.close()
+
+
+def parse_entity(raw: bytes, fields: Collection[str] | None = None) -> Any:
+    """The data of a get result from the XML of its entity, as held by a
+    LazyResponse. With `fields`, only those fields are converted.
+    """
+    parser = ResponseParser(fields=fields)
+    ((_, response),) = parser.feed(b"<Response>" + raw + b"</Response>")
+    parser.close()
+    return response.data
+
+
+def _forbid_entity_decl(
+    name, is_parameter_entity, value, base, sysid, pubid, notation_name
+):
+    raise EntitiesForbidden(name, value, base, sysid, pubid, notation_name)
+
+
+def _forbid_unparsed_entity_decl(name, base, sysid, pubid, notation_name):
+    raise EntitiesForbidden(name, None, base, sysid, pubid, notation_name)
+
+
+def _forbid_external_ref(context, base, sysid, pubid):
+    raise ExternalReferenceForbidden(context, base, sysid, pubid)
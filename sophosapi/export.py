@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import datetime
+import gzip
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable
+from typing import Iterator
+from typing import NamedTuple
+
+from .api_factory import JsonData
+from .client import Client
+from .request import Request
+from .response import get_result
+
+MANIFEST = "manifest.json"
+
+
+class ExportResult(NamedTuple):
+    """The snapshot of one entity type, as listed in the manifest."""
+
+    entity: str
+    file: str  # name of the JSONL file, in the export's directory
+    records: int  # entities written
+    sha256: str  # of the uncompressed JSONL
+    bytes: int  # size of the compressed file
+    seconds: float
+    error: str | None  # why the export of the type failed, if it did
+
+
+def export(
+    client: Client,
+    entity_types: Iterable[str],
+    directory: str,
+    *,
+    max_workers: int = 4,
+    compresslevel: int = 6,
+) -> dict:
+    """Export all the entities of `entity_types` into `directory`, one
+    gzipped JSONL file per type, and return the manifest.
+
+    Up to `max_workers` types are fetched at once. Each Response is written
+    as soon as it is parsed, so memory use does not grow with the size of
+    the configuration.
+
+    The manifest is written last, as manifest.json, with the number of
+    records, hash, size and time of each type. A type which failed has an
+    error in the manifest, and no file, and does not stop the others.
+    """
+    os.makedirs(directory, exist_ok=True)
+    types = list(dict.fromkeys(entity_types))
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = list(
+            executor.map(
+                lambda entity: _export_entity(
+                    client, entity, directory, compresslevel
+                ),
+                types,
+            )
+        )
+
+    manifest = {
+        "created": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "server": client.server,
+        "apiversion": client.apiversion,
+        "seconds": time.perf_counter() - start,
+        "entities": {result.entity: result._asdict() for result in results},
+    }
+    _write_atomic(
+        os.path.join(directory, MANIFEST),
+        json.dumps(manifest, indent=2).encode("utf-8"),
+    )
+    return manifest
+
+
+def _export_entity(
+    client: Client, entity: str, directory: str, compresslevel: int
+) -> ExportResult:
+    filename = f"{entity}.jsonl.gz"
+    path = os.path.join(directory, filename)
+    partial = path + ".part"
+
+    start = time.perf_counter()
+    digest = hashlib.sha256()
+    records = 0
+    error = None
+    request = Request(apiversion=client.apiversion)
+    request.get(entity)
+    try:
+        with gzip.open(partial, "wb", compresslevel=compresslevel) as f:
+            for response in client.iter_send(request):
+                entity_data = get_result(response)  # raises on an error
+                if entity_data is None:
+                    continue
+                line = json.dumps(entity_data, separators=(",", ":"))
+                data = (line + "\n").encode("utf-8")
+                digest.update(data)
+                f.write(data)
+                records += 1
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+
+    if error is not None:
+        try:
+            os.remove(partial)
+        except FileNotFoundError:  # it could not be created
+            pass
+        return ExportResult(
+            entity, "", 0, "", 0, time.perf_counter() - start, error
+        )
+
+    os.replace(partial, path)
+    return ExportResult(
+        entity,
+        filename,
+        records,
+        digest.hexdigest(),
+        os.path.getsize(path),
+        time.perf_counter() - start,
+        None,
+    )
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    with open(path + ".part", "wb") as f:
+        f.write(data)
+    os.replace(path + ".part", path)
+
+
+def load_manifest(directory: str) -> dict:
+    with open(os.path.join(directory, MANIFEST), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def verify_snapshot(
+    directory: str, entity: str, manifest: dict | None = None
+) -> None:
+    """Check the snapshot of `entity` against the manifest, raising
+    ValueError if it failed to export or its hash differs.
+    """
+    result = _snapshot_result(directory, entity, manifest)
+    digest = hashlib.sha256()
+    with gzip.open(os.path.join(directory, result["file"]), "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    if digest.hexdigest() != result["sha256"]:
+        raise ValueError(f"{result['file']} does not match the manifest")
+
+
+def _snapshot_result(
+    directory: str, entity: str, manifest: dict | None
+) -> dict:
+    if manifest is None:
+        manifest = load_manifest(directory)
+    result = manifest["entities"][entity]
+    if result["error"] is not None:
+        raise ValueError(f"{entity} was not exported: {result['error']}")
+    return result
+
+
+def iter_snapshot(
+    directory: str, entity: str, manifest: dict | None = None
+) -> Iterator[JsonData]:
+    """Yield the data of each exported entity of type `entity`.
+
+    The file's hash is checked against the manifest once it has been read,
+    raising ValueError if they differ. To check it before using any of the
+    data, call verify_snapshot first.
+    """
+    result = _snapshot_result(directory, entity, manifest)
+
+    digest = hashlib.sha256()
+    with gzip.open(os.path.join(directory, result["file"]), "rb") as f:
+        for line in f:
+            digest.update(line)
+            yield json.loads(line)
+
+    if digest.hexdigest() != result["sha256"]:
+        raise ValueError(f"{result['file']} does not match the manifest")
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict
+from typing import Iterable
+from typing import NamedTuple
+from typing import Union
+
+from .client import Client
+from .prepared import Sendable
+from .response import Response
+
+# a Client, or the keyword arguments to create one. An optional "name" key
+# sets the name the firewall's results are keyed by.
+FirewallSpec = Union[Client, Dict[str, object]]
+
+
+class FleetResult(NamedTuple):
+    """The outcome of sending a Request to one firewall of the fleet."""
+
+    firewall: str
+    responses: list[Response] | None  # None if the call failed
+    error: Exception | None
+    elapsed: float  # seconds
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class FleetClient:
+    """
+    Sends the same Request to many firewalls in parallel.
+
+    A failure on one firewall is recorded in its FleetResult and does not stop
+    the others.
+    """
+
+    def __init__(
+        self,
+        firewalls: Iterable[FirewallSpec],
+        *,
+        max_workers: int = 16,
+    ) -> None:
+        self.max_workers = max_workers
+        self.clients: dict[str, Client] = {}
+
+        for spec in firewalls:
+            if isinstance(spec, Client):
+                name = f"{spec.server}:{spec.port}"
+                client = spec
+            else:
+                kwargs = dict(spec)
+                name = kwargs.pop("name", None)  # type: ignore
+                client = Client(**kwargs)  # type: ignore
+                if name is None:
+                    name = f"{client.server}:{client.port}"
+
+            if name in self.clients:
+                raise ValueError(f"Firewall {name} is listed more than once")
+            self.clients[name] = client
+
+    def close(self) -> None:
+        for client in self.clients.values():
+            client.close()
+
+    def __enter__(self) -> FleetClient:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def send(self, request: Sendable) -> dict[str, FleetResult]:
+        """Send `request` to every firewall. The results are keyed by
+        firewall name, in the order the firewalls were given.
+        """
+
+        def send_one(name: str) -> FleetResult:
+            start = time.perf_counter()
+            try:
+                responses = self.clients[name].send(request)
+            except Exception as e:
+                return FleetResult(name, None, e, time.perf_counter() - start)
+            return FleetResult(
+                name, responses, None, time.perf_counter() - start
+            )
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            results = executor.map(send_one, self.clients)
+            return {result.firewall: result for result in results}
+
+    def test_login(self) -> dict[str, dict]:
+        """Run Client.test_login on every firewall. Connection errors are
+        reported with a status_code of -1.
+        """
+
+        def test_one(client: Client) -> dict:
+            try:
+                return client.test_login()
+            except Exception as e:
+                return {"status_code": -1, "message": str(e)}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            results = executor.map(test_one, self.clients.values())
+            return dict(zip(self.clients, results))
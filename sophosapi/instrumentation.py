@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+from collections import Counter
+from typing import Iterable
+
+from .response import Response
+
+
+class CallStats:
+    """
+    Where the time of one call to the firewall went, given to the Client's
+    `on_call` hook once the call is done.
+
+    The phases are:
+    - serialize: writing the request's XML, including the login. The XML of
+      each transaction is written when it is added to the Request, so
+      json_to_xml is not part of it.
+    - encode: quoting the XML into the URL, or the multipart body of a POST.
+    - network: sending the request and reading the whole reply.
+    - parse: parsing the reply. With the "expat" parser, this includes
+      converting it to Responses.
+    - convert: converting the parsed reply to Responses, with "etree".
+    """
+
+    def __init__(self, transactions: int = 0) -> None:
+        self.transactions = transactions
+        self.method = ""
+        self.request_bytes = 0
+        self.response_bytes = 0
+
+        self.serialize_seconds = 0.0
+        self.encode_seconds = 0.0
+        self.network_seconds = 0.0
+        self.parse_seconds = 0.0
+        self.convert_seconds = 0.0
+
+        # responses by entity type, and by status code
+        self.entities: Counter[str] = Counter()
+        self.status_codes: Counter[int] = Counter()
+        # the exception which the call raised, if any
+        self.error: BaseException | None = None
+
+    @property
+    def total_seconds(self) -> float:
+        return (
+            self.serialize_seconds
+            + self.encode_seconds
+            + self.network_seconds
+            + self.parse_seconds
+            + self.convert_seconds
+        )
+
+    def count(self, responses: Iterable[Response]) -> None:
+        """Add `responses` to the counts by entity type and status code."""
+        for response in responses:
+            self.status_codes[response.status_code] += 1
+            if response.transaction is not None:
+                self.entities[response.transaction.entity] += 1
+
+    def as_dict(self) -> dict:
+        return {
+            "transactions": self.transactions,
+            "method": self.method,
+            "request_bytes": self.request_bytes,
+            "response_bytes": self.response_bytes,
+            "serialize_seconds": self.serialize_seconds,
+            "encode_seconds": self.encode_seconds,
+            "network_seconds": self.network_seconds,
+            "parse_seconds": self.parse_seconds,
+            "convert_seconds": self.convert_seconds,
+            "total_seconds": self.total_seconds,
+            "entities": dict(self.entities),
+            "status_codes": dict(self.status_codes),
+            "error": self.error,
+        }
+
+    def __repr__(self) -> str:
+        return f"CallStats({self.as_dict()})"
@@ -0,0 +1,326 @@
+from __future__ import annotations
+
+import random
+import ssl
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+from typing import Iterable
+from xml.etree.ElementTree import Element
+
+from defusedxml import ElementTree as ET  # type: ignore
+
+from .api_factory import xml_to_json
+from .client import API_PATH
+from .xml_writer import element_xml
+from .xml_writer import entity_xml
+
+# (code, message) of the statuses the firewall answers with
+_APPLIED = (200, "Configuration applied successfully.")
+_FAILED = (500, "Operation could not be performed on Entity.")
+_EXISTS = (502, "Operation failed. Entity having same name already exists.")
+_NOT_FOUND = (502, "Operation failed. Entity not found.")
+_NO_RECORDS = (529, "No. of records Zero.")
+_NOT_ALLOWED = (534, "Operation not allowed.")
+
+
+def _status_xml(status: tuple[int, str]) -> str:
+    return element_xml("Status", {"code": str(status[0])}, status[1])
+
+
+def _entity_name(data: dict) -> str | None:
+    # entities are named by Name, except a few such as LocalServiceACL
+    for key in ("Name", "RuleName"):
+        name = data.get(key)
+        if isinstance(name, str):
+            return name
+    return None
+
+
+def _matches(data: dict, key: str, criteria: str, value: str) -> bool:
+    field = data.get(key)
+    if criteria == "!=":
+        return field != value
+    if not isinstance(field, str):
+        return False
+    if criteria == "like":
+        return value.lower() in field.lower()
+    return field == value
+
+
+class MockFirewall:
+    """
+    An in-memory stand-in for the firewall's API, for tests and load tests.
+
+    Requests are answered with the same shapes and status codes as the
+    firewall: Login first, then the result of each Get, Set and Remove
+    transaction in order. Entities are kept in memory, by type and name.
+
+    Each call takes `latency` seconds plus `latency_per_entity` seconds for
+    each entity returned or written, as the firewall processes the
+    transactions of a request one after the other. A fraction `error_rate`
+    of transactions fail with a 500 status.
+    """
+
+    def __init__(
+        self,
+        *,
+        username: str = "admin",
+        password: str = "admin",
+        apiversion: str = "1905.1",
+        latency: float = 0.0,
+        latency_per_entity: float = 0.0,
+        error_rate: float = 0.0,
+        seed: int | None = None,
+    ) -> None:
+        self.username = username
+        self.password = password
+        self.apiversion = apiversion
+        self.latency = latency
+        self.latency_per_entity = latency_per_entity
+        self.error_rate = error_rate
+
+        # entity type, in lower case as the firewall ignores the case, to
+        # the data of each entity by name
+        self._store: dict[str, dict[str, dict]] = {}
+        self._lock = threading.Lock()
+        self._random = random.Random(seed)
+
+        self.requests = 0
+        self.transactions = 0
+
+    def populate(self, entity: str, entities: Iterable[dict]) -> None:
+        """Store the data of `entities` as entities of type `entity`."""
+        with self._lock:
+            store = self._store.setdefault(entity.lower(), {})
+            for data in entities:
+                store[_entity_name(data) or ""] = data
+
+    def entities(self, entity: str) -> list[dict]:
+        """The data of the stored entities of type `entity`."""
+        with self._lock:
+            return list(self._store.get(entity.lower(), {}).values())
+
+    def handle(self, reqxml: bytes) -> bytes:
+        """The reply to the request `reqxml`."""
+        start = time.perf_counter()
+        parts: list[str] = []
+        entities = self._handle(reqxml, parts)
+
+        delay = self.latency + self.latency_per_entity * entities
+        delay -= time.perf_counter() - start
+        if delay > 0:
+            time.sleep(delay)
+
+        body = "".join(parts)
+        return (
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            f'<Response APIVersion="{self.apiversion}" IPS_CAT_VER="1">'
+            f"{body}</Response>"
+        ).encode("ascii", "xmlcharrefreplace")
+
+    def _handle(self, reqxml: bytes, parts: list[str]) -> int:
+        """Write the reply into `parts`, returning the number of entities
+        returned or written.
+        """
+        with self._lock:
+            self.requests += 1
+        try:
+            request = ET.fromstring(reqxml)
+        except ET.ParseError:
+            parts.append(_status_xml(_NOT_ALLOWED))
+            return 0
+
+        login = request.find("Login")
+        if login is None or not self._authenticate(login):
+            status = "Authentication Failure"
+            parts.append(f"<Login><status>{status}</status></Login>")
+            return 0
+        status = "Authentication Successful"
+        parts.append(f"<Login><status>{status}</status></Login>")
+
+        entities = 0
+        for container in request:
+            if container.tag == "Get":
+                handle = self._get
+            elif container.tag == "Set":
+                handle = self._set
+            elif container.tag == "Remove":
+                handle = self._remove
+            else:
+                continue
+
+            for elem in container:
+                with self._lock:
+                    self.transactions += 1
+                if self.error_rate and self._random.random() < self.error_rate:
+                    parts.append(self._result(elem, _FAILED))
+                else:
+                    entities += handle(container, elem, parts)
+        return entities
+
+    def _authenticate(self, login: Element) -> bool:
+        return (
+            login.findtext("Username") == self.username
+            and login.findtext("Password") == self.password
+        )
+
+    def _result(self, elem: Element, status: tuple[int, str]) -> str:
+        return element_xml(elem.tag, dict(elem.attrib), _status_xml(status))
+
+    def _get(self, container: Element, elem: Element, parts: list) -> int:
+        transactionid = elem.get("transactionid")
+        keys = elem.findall("Filter/key")
+        with self._lock:
+            found = [
+                data
+                for data in self._store.get(elem.tag.lower(), {}).values()
+                if all(
+                    _matches(
+                        data,
+                        k.get("name", ""),
+                        k.get("criteria", "="),
+                        k.text or "",
+                    )
+                    for k in keys
+                )
+            ]
+
+        if not found:
+            parts.append(self._result(elem, _NO_RECORDS))
+            return 0
+        parts.extend(
+            entity_xml(elem.tag, data, transactionid) for data in found
+        )
+        return len(found)
+
+    def _set(self, container: Element, elem: Element, parts: list) -> int:
+        data = xml_to_json(elem)
+        name = _entity_name(data) if isinstance(data, dict) else None
+        if name is None:
+            parts.append(self._result(elem, _FAILED))
+            return 0
+
+        operation = container.get("operation")
+        with self._lock:
+            store = self._store.setdefault(elem.tag.lower(), {})
+            if operation == "add" and name in store:
+                status = _EXISTS
+            elif operation == "update" and name not in store:
+                status = _NOT_FOUND
+            else:
+                store[name] = data  # type: ignore
+                status = _APPLIED
+        parts.append(self._result(elem, status))
+        return 1
+
+    def _remove(self, container: Element, elem: Element, parts: list) -> int:
+        name = elem.findtext("Name")
+        with self._lock:
+            store = self._store.get(elem.tag.lower(), {})
+            status = _NOT_FOUND if store.pop(name, None) is None else _APPLIED
+        parts.append(self._result(elem, status))
+        return 1
+
+
+def _multipart_field(body: bytes, content_type: str, field: str) -> bytes:
+    """The value of `field` in a multipart/form-data body."""
+    boundary = content_type.split("boundary=")[1].strip('"').encode()
+    for part in body.split(b"--" + boundary):
+        head, _, value = part.partition(b"\r\n\r\n")
+        if f'name="{field}"'.encode() in head:
+            return value[: -len(b"\r\n")]
+    return b""
+
+
+class _Handler(BaseHTTPRequestHandler):
+    # keep connections alive, as the Client's connection pool expects
+    protocol_version = "HTTP/1.1"
+    server: MockServer
+
+    def do_GET(self) -> None:
+        url = urllib.parse.urlsplit(self.path)
+        query = urllib.parse.parse_qs(url.query)
+        reqxml = query.get("reqxml", [""])[0].encode("utf-8")
+        self._reply(url.path, reqxml)
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length)
+        content_type = self.headers.get("Content-Type", "")
+        reqxml = body
+        if content_type.startswith("multipart/form-data"):
+            reqxml = _multipart_field(body, content_type, "reqxml")
+        self._reply(urllib.parse.urlsplit(self.path).path, reqxml)
+
+    def _reply(self, path: str, reqxml: bytes) -> None:
+        if path != API_PATH:
+            self.send_error(404)
+            return
+        reply = self.server.firewall.handle(reqxml)
+        self.send_response(200)
+        self.send_header("Content-Type", "text/xml")
+        self.send_header("Content-Length", str(len(reply)))
+        self.end_headers()
+        self.wfile.write(reply)
+
+    def log_message(self, format: str, *args) -> None:
+        pass  # quiet under load
+
+
+class MockServer(ThreadingHTTPServer):
+    """
+    Serves a MockFirewall over HTTPS at the API's path, so that a Client can
+    be pointed at it. Port 0 picks a free port, see `port`.
+
+        firewall = MockFirewall(username="u", password="p")
+        with MockServer(firewall, certfile=certfile, keyfile=keyfile) as s:
+            client = Client(..., server="127.0.0.1", port=s.port)
+
+    The certificate and its key are not made here, eg the tests make a
+    self-signed one with the openssl command. Give the Client an ssl_context
+    which trusts it: ssl.create_default_context(cafile=certfile).
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        firewall: MockFirewall,
+        *,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        certfile: str,
+        keyfile: str | None = None,
+    ) -> None:
+        super().__init__((host, port), _Handler)
+        self.firewall = firewall
+
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(certfile, keyfile)
+        self.socket = context.wrap_socket(self.socket, server_side=True)
+        self._thread: threading.Thread | None = None
+
+    @property
+    def port(self) -> int:
+        return self.server_address[1]
+
+    def start(self) -> None:
+        """Serve in a background thread."""
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> MockServer:
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import re
+from typing import Any
+from typing import Callable
+from typing import Tuple
+from typing import Union
+
+from .request import _PARAM_RE
+from .request import Request
+from .request import Transaction
+from .xml_writer import escape_attrib
+from .xml_writer import escape_cdata
+
+# the characters which change where the XML is, as they are always escaped
+# in attribute values, and < and > in text
+_MARKUP_RE = re.compile(r'[<>"]')
+
+# a Param in the XML, and how its value is escaped there
+_Slot = Tuple[str, Callable[[str], str]]
+
+
+class Param(str):
+    """
+    A placeholder for a text value in a Request, such as a filter name or a
+    field of the data, filled in by PreparedRequest.bind.
+    """
+
+    name: str
+
+    def __new__(cls, name: str) -> Param:
+        if not name.isidentifier():
+            raise ValueError(f"Param name must be an identifier: {name!r}")
+        param = super().__new__(cls, f"\x00{name}\x00")
+        param.name = name
+        return param
+
+    def __repr__(self) -> str:
+        return f"Param({self.name!r})"
+
+
+class PreparedRequest:
+    """
+    A Request which is serialised once and can then be sent many times, with
+    its Params filled in differently each time.
+
+        request = Request(apiversion=client.apiversion)
+        request.get_filter("IPHost", Filter.LIKE, Param("name"))
+        prepared = PreparedRequest(request)
+
+        client.send(prepared.bind(name="web"))
+
+    Clients also serialise their login once, so sending a bound request does
+    not build any Element.
+
+    Params can be in the text of an element or in an attribute value, such
+    as the name of a Filter key, but not in a tag or attribute name.
+    """
+
+    def __init__(self, request: Request) -> None:
+        self.apiversion = request.apiversion
+        self._head = request._head().encode("ascii", "xmlcharrefreplace")
+
+        # static parts at even indexes, Params at odd ones
+        parts = _PARAM_RE.split(request._body())
+        self._parts: list[bytes | _Slot] = []
+        in_tag = in_value = False
+        for i, part in enumerate(parts):
+            if not i % 2:
+                self._parts.append(part.encode("ascii", "xmlcharrefreplace"))
+                in_tag, in_value = _markup_state(part, in_tag, in_value)
+            elif in_value:
+                self._parts.append((part, escape_attrib))
+            elif in_tag:
+                raise ValueError(
+                    f"Param {part!r} is in a tag or attribute name, it can "
+                    "only be in text or an attribute value"
+                )
+            else:
+                self._parts.append((part, escape_cdata))
+        self.params = frozenset(parts[1::2])
+
+        self._transactions = dict(request.transactions)
+        # those with a Param in their data, which is filled in by bind
+        self._bound_transactions = [
+            tid for tid, t in self._transactions.items() if _has_param(t.data)
+        ]
+
+    def bind(self, **params: str) -> BoundRequest:
+        """Fill in the Params. All of them must be given, as str."""
+        missing = self.params - params.keys()
+        if missing:
+            raise TypeError(f"Missing params: {', '.join(sorted(missing))}")
+        unknown = params.keys() - self.params
+        if unknown:
+            raise TypeError(f"Unknown params: {', '.join(sorted(unknown))}")
+
+        body = b"".join(
+            (
+                part
+                if isinstance(part, bytes)
+                else part[1](params[part[0]]).encode(
+                    "ascii", "xmlcharrefreplace"
+                )
+            )
+            for part in self._parts
+        )
+
+        transactions = self._transactions
+        if self._bound_transactions:
+            transactions = dict(transactions)
+            for tid in self._bound_transactions:
+                t = transactions[tid]
+                transactions[tid] = t._replace(data=_bind(t.data, params))
+
+        return BoundRequest(self._head, body, transactions)
+
+
+class BoundRequest:
+    """A PreparedRequest with its Params filled in, ready to send."""
+
+    def __init__(
+        self,
+        head: bytes,
+        body: bytes,
+        transactions: dict[str, Transaction],
+    ) -> None:
+        self._head = head
+        self._body = body
+        self.transactions = transactions
+
+    def to_bytes(self, login: str | None = None) -> bytes:
+        """As Request.to_bytes, with the login given as XML."""
+        if login is None:
+            return self._head + self._body
+        login_bytes = login.encode("ascii", "xmlcharrefreplace")
+        return b"".join((self._head, login_bytes, self._body))
+
+
+# anything a Client can send
+Sendable = Union[Request, BoundRequest]
+
+
+def _markup_state(xml: str, in_tag: bool, in_value: bool) -> tuple[bool, bool]:
+    """Whether the end of `xml` is within a tag, and within an attribute
+    value in it, given the same for its start.
+    """
+    for match in _MARKUP_RE.finditer(xml):
+        char = match.group()
+        if in_value:
+            in_value = char != '"'
+        elif not in_tag:
+            in_tag = char == "<"
+        elif char == '"':
+            in_value = True
+        elif char == ">":
+            in_tag = False
+    return in_tag, in_value
+
+
+def _has_param(value: Any) -> bool:
+    if isinstance(value, Param):
+        return True
+    if isinstance(value, dict):
+        return any(_has_param(v) for v in value.values())
+    if isinstance(value, list):
+        return any(_has_param(v) for v in value)
+    return False
+
+
+def _bind(value: Any, params: dict[str, str]) -> Any:
+    if isinstance(value, Param):
+        return params[value.name]
+    if isinstance(value, dict):
+        return {k: _bind(v, params) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_bind(v, params) for v in value]
+    return value
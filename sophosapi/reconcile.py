@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+from typing import Iterable
+from typing import Iterator
+from typing import Mapping
+from typing import NamedTuple
+
+from .api_factory import JsonData
+from .api_factory import json_to_xml
+from .api_factory import xml_to_json
+from .client import Client
+from .request import Request
+from .response import Response
+from .response import get_result
+from .restore import DEPENDENCIES
+from .restore import restore_order
+from .tags_of_lists import tags_of_lists
+from .watcher import entity_name
+
+_SYMBOLS = {"add": "+", "update": "~", "remove": "-"}
+
+
+class Change(NamedTuple):
+    """One transaction needed to bring the firewall to the desired state."""
+
+    operation: str  # add, update or remove
+    entity: str  # eg IPHost
+    name: str
+    data: JsonData | None  # what is sent, None when removed
+    fields: tuple[str, ...]  # the keys which differ, when updated
+
+
+class Plan:
+    """
+    The changes which make the firewall match the desired state, and the
+    number of entities which already match it.
+    """
+
+    def __init__(self, changes: list[Change], unchanged: int = 0) -> None:
+        self.changes = changes
+        self.unchanged = unchanged
+
+    def __len__(self) -> int:
+        return len(self.changes)
+
+    def __iter__(self) -> Iterator[Change]:
+        return iter(self.changes)
+
+    def count(self, operation: str) -> int:
+        return sum(1 for c in self.changes if c.operation == operation)
+
+    def request(self, apiversion: str = "") -> Request:
+        """The Request which applies all the changes at once."""
+        request = Request(apiversion=apiversion)
+        for change in self.changes:
+            if change.operation == "remove":
+                request.remove(change.entity, change.name)
+            else:
+                getattr(request, change.operation)(change.entity, change.data)
+        return request
+
+    def apply(self, client: Client) -> list[Response]:
+        """Send the changes to `client`, returning the responses."""
+        if not self.changes:
+            return []
+        return client.send(self.request(client.apiversion))
+
+    def format(self) -> str:
+        """The changes, one per line, followed by a summary."""
+        lines = []
+        for change in self.changes:
+            symbol = _SYMBOLS[change.operation]
+            line = f"{symbol} {change.entity} {change.name}"
+            if change.fields:
+                line += f" ({', '.join(change.fields)})"
+            lines.append(line)
+        lines.append(
+            f"{self.count('add')} to add, {self.count('update')} to update, "
+            f"{self.count('remove')} to remove, {self.unchanged} unchanged"
+        )
+        return "\n".join(lines)
+
+    def __str__(self) -> str:
+        return self.format()
+
+    def __repr__(self) -> str:
+        return f"Plan({self.changes!r}, unchanged={self.unchanged})"
+
+
+def canonical(entity: str, data: JsonData) -> JsonData:
+    """`data` as the firewall would return it, with the lists of names
+    sorted, so that equal entities compare equal.
+
+    The data goes through the same XML round trip as a get, so that the
+    special cases of json_to_xml and xml_to_json apply to both sides. A
+    list of one item given as a string becomes a list.
+    """
+    return _normalise(xml_to_json(json_to_xml(entity, data)))  # type: ignore
+
+
+def _normalise(value):
+    if isinstance(value, dict):
+        return {
+            key: (
+                [item]
+                if key in tags_of_lists and isinstance(item, str) and item
+                else _normalise(item)
+            )
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        items = [_normalise(item) for item in value]
+        if all(isinstance(item, str) for item in items):
+            items.sort()
+        return items
+    return value
+
+
+def make_plan(
+    client: Client,
+    desired: Mapping[str, Iterable[JsonData]],
+    *,
+    prune: bool = False,
+    dependencies: Mapping[str, Iterable[str]] = DEPENDENCIES,
+) -> Plan:
+    """Compare the desired entities, by type, with those on the firewall and
+    plan the changes which make them match.
+
+    Entities are matched by name. Only the keys given in the desired data
+    are compared, so defaults filled in by the firewall do not show as
+    changes, and an update sends the live data with the desired keys over
+    it. With `prune`, entities of the desired types which are not desired
+    are removed.
+
+    Adds and updates are in dependency order, and removes in the reverse
+    order, so that the Request can be sent as it is.
+    """
+    wanted: dict[str, dict[str, JsonData]] = {}
+    for entity, items in desired.items():
+        wanted[entity] = {}
+        for data in items:
+            name = entity_name(data)
+            if name in wanted[entity]:
+                raise ValueError(f"{entity} {name} is desired more than once")
+            wanted[entity][name] = data
+
+    types = [t for level in restore_order(wanted, dependencies) for t in level]
+    live = _live_state(client, types)
+
+    changes: list[Change] = []
+    removes: list[Change] = []
+    unchanged = 0
+    for entity in types:
+        current = live[entity]
+        for name, data in wanted[entity].items():
+            if name not in current:
+                changes.append(Change("add", entity, name, data, ()))
+                continue
+            fields = _differences(entity, data, current[name])
+            if fields:
+                update = {**current[name], **data}
+                changes.append(Change("update", entity, name, update, fields))
+            else:
+                unchanged += 1
+
+        if prune:
+            removes[:0] = [
+                Change("remove", entity, name, None, ())
+                for name in current
+                if name not in wanted[entity]
+            ]
+
+    return Plan(changes + removes, unchanged)
+
+
+def _live_state(
+    client: Client, types: list[str]
+) -> dict[str, dict[str, JsonData]]:
+    live: dict[str, dict[str, JsonData]] = {}
+    for entity, responses in client.get_many(types).items():
+        live[entity] = {}
+        for response in responses:
+            try:
+                data = get_result(response)
+            except ValueError as e:
+                raise ValueError(f"Could not get {entity}: {e}") from None
+            if data is not None:
+                live[entity][entity_name(data)] = data
+    return live
+
+
+def _differences(
+    entity: str, desired: JsonData, current: JsonData
+) -> tuple[str, ...]:
+    """The keys of `desired` whose values differ in `current`."""
+    want = canonical(entity, desired)
+    have = canonical(entity, {k: v for k, v in current.items() if k in want})
+    return tuple(key for key in want if want[key] != have.get(key))
+
+
+def reconcile(
+    client: Client,
+    desired: Mapping[str, Iterable[JsonData]],
+    *,
+    prune: bool = False,
+    dry_run: bool = False,
+    dependencies: Mapping[str, Iterable[str]] = DEPENDENCIES,
+) -> tuple[Plan, list[Response]]:
+    """Plan the changes which make the firewall match `desired` (see
+    make_plan) and, unless `dry_run`, send them in one Request.
+    """
+    plan = make_plan(client, desired, prune=prune, dependencies=dependencies)
+    responses = [] if dry_run else plan.apply(client)
+    return plan, responses
@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+from typing import AbstractSet
+from typing import Iterable
+from typing import Mapping
+from typing import Optional
+from typing import Tuple
+
+from .api_factory import JsonData
+from .tags_of_lists import tags_of_lists
+from .watcher import ChangeEvent
+from .watcher import entity_name
+
+_HOSTS = ("IPHost", "IPHostGroup", "FQDNHost", "FQDNHostGroup", "MACHost")
+_SERVICES = ("Services", "ServiceGroup")
+
+# the entity types which the names held by each key can be
+REFERENCE_TYPES: dict[str, tuple[str, ...]] = {
+    "HostList": ("IPHost",),
+    "FQDNHostList": ("FQDNHost",),
+    "HostGroupList": ("IPHostGroup",),
+    "ServiceList": ("Services",),
+    "Services": _SERVICES,
+    "OriginalServices": _SERVICES,
+    "SourceZones": ("Zone",),
+    "DestinationZones": ("Zone",),
+    "SourceNetworks": _HOSTS,
+    "DestinationNetworks": _HOSTS,
+    "OriginalSourceNetworks": _HOSTS,
+    "OriginalDestinationNetworks": _HOSTS,
+    "Hosts": _HOSTS,
+    "DstHosts": _HOSTS,
+    "backends": ("WebServer",),
+    "allowed_networks": _HOSTS,
+    "denied_networks": _HOSTS,
+    "TranslatedSource": _HOSTS,
+    "TranslatedDestination": _HOSTS,
+    "TranslatedService": _SERVICES,
+    "Schedule": ("Schedule",),
+}
+
+# keys which hold the name of a single other entity, eg the translated
+# destination of a NATRule
+SCALAR_REFERENCES = frozenset(
+    {
+        "TranslatedSource",
+        "TranslatedDestination",
+        "TranslatedService",
+        "Schedule",
+    }
+)
+
+Node = Tuple[str, str]  # (entity type, name)
+# (entity type, name) referred to, the type None when it is not known
+Target = Tuple[Optional[str], str]
+
+
+def find_references(
+    data: JsonData,
+    scalars: AbstractSet[str] = SCALAR_REFERENCES,
+    types: Mapping[str, Iterable[str]] = REFERENCE_TYPES,
+) -> set[Target]:
+    """The (entity type, name) of the entities which the entity `data`, as
+    returned by xml_to_json, refers to.
+
+    These are the items of its list fields (those in tags_of_lists), at any
+    depth, and the values of the `scalars` keys. This includes the backends
+    and allowed_networks of the AccessPaths of a FirewallRule's
+    HTTPBasedPolicy, which xml_to_json turns into lists.
+
+    The types of a name are those listed for its key in `types`, eg a name
+    in SourceNetworks is given once for each type of host. A name under a key
+    which is not listed has the type None.
+    """
+    names: set[Target] = set()
+    _collect(data, scalars, types, names)
+    return names
+
+
+def _collect(
+    data: dict,
+    scalars: AbstractSet[str],
+    types: Mapping[str, Iterable[str]],
+    names: set[Target],
+) -> None:
+    for key, value in data.items():
+        if isinstance(value, dict):
+            _collect(value, scalars, types, names)
+            continue
+
+        if isinstance(value, list):
+            items = []
+            for item in value:
+                if isinstance(item, dict):
+                    _collect(item, scalars, types, names)
+                elif item and key in tags_of_lists:
+                    items.append(item)
+        elif value and (key in tags_of_lists or key in scalars):
+            items = [value]  # a list of one given as a string
+        else:
+            continue
+
+        targets = types.get(key, (None,))
+        names.update((t, item) for item in items for t in targets)
+
+
+class ReferenceGraph:
+    """
+    Which entities refer to which, by type and name, for answering "what
+    uses X" in constant time.
+
+    Build it from a snapshot of the entity data by type, such as the data of
+    the responses of Client.get_many, or an export read with iter_snapshot.
+    Then keep it current with add, remove or apply as entities change.
+
+    The type of a reference comes from its key (see REFERENCE_TYPES), so a
+    Zone and an IPHost of the same name are told apart. Keys which can hold
+    several types, such as SourceNetworks, refer to the name as each of
+    them, and keys which are not listed refer to the name as any type.
+    """
+
+    def __init__(
+        self,
+        snapshot: Mapping[str, Iterable[JsonData]] | None = None,
+        *,
+        scalars: AbstractSet[str] = SCALAR_REFERENCES,
+        types: Mapping[str, Iterable[str]] = REFERENCE_TYPES,
+    ) -> None:
+        self.scalars = scalars
+        self.types = types
+        # what each entity refers to, and the entities referring to each
+        self._references: dict[Node, frozenset[Target]] = {}
+        self._referrers: dict[Target, set[Node]] = {}
+
+        for entity, items in (snapshot or {}).items():
+            for data in items:
+                self.add(entity, data)
+
+    def __len__(self) -> int:
+        return len(self._references)
+
+    def __contains__(self, node: object) -> bool:
+        return node in self._references
+
+    def add(self, entity: str, data: JsonData) -> None:
+        """Add the entity, replacing the entity of the same type and name."""
+        node = (entity, entity_name(data))
+        self._unlink(node)
+        targets = frozenset(find_references(data, self.scalars, self.types))
+        self._references[node] = targets
+        for target in targets:
+            self._referrers.setdefault(target, set()).add(node)
+
+    def remove(self, entity: str, name: str) -> None:
+        self._unlink((entity, name))
+        self._references.pop((entity, name), None)
+
+    def apply(self, event: ChangeEvent) -> None:
+        """Update the graph with a change reported by a Watcher."""
+        if event.data is None:
+            self.remove(event.entity, event.name)
+        else:
+            self.add(event.entity, event.data)
+
+    def _unlink(self, node: Node) -> None:
+        for target in self._references.get(node, ()):
+            referrers = self._referrers[target]
+            referrers.discard(node)
+            if not referrers:
+                del self._referrers[target]
+
+    def referrers(
+        self,
+        entity: str,
+        name: str,
+        entity_types: Iterable[str] | None = None,
+    ) -> set[Node]:
+        """The (entity type, name) of the entities which refer to the
+        `entity` called `name`, only of `entity_types` if given.
+        """
+        nodes = self._referrers.get((entity, name), set()) | (
+            self._referrers.get((None, name), set())
+        )
+        if entity_types is None:
+            return nodes
+        types = set(entity_types)
+        return {node for node in nodes if node[0] in types}
+
+    def is_referenced(self, entity: str, name: str) -> bool:
+        return (entity, name) in self._referrers or (
+            (None, name) in self._referrers
+        )
+
+    def references(self, entity: str, name: str) -> frozenset[Target]:
+        """The (entity type, name) of what the entity refers to."""
+        return self._references.get((entity, name), frozenset())
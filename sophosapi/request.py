@@ -1,72 +1,233 @@
 from __future__ import annotations
 
+import itertools
+import re
+from typing import Iterable
+from typing import NamedTuple
 from xml.etree.ElementTree import Element
 
 from defusedxml import ElementTree as ET  # type: ignore
 
-from .api_factory import _create_element
-from .api_factory import _make_filter
+from .api_factory import _make_filter_keys
+from .api_factory import Criterion
 from .api_factory import Filter
-from .api_factory import json_to_xml
+from .xml_writer import element_xml
+from .xml_writer import entity_xml
+from .xml_writer import escape_attrib
+
+
+class Transaction(NamedTuple):
+    """One call within a Request, as recorded against its transactionid."""
+
+    transactionid: str
+    operation: str  # get, set, add, update or remove
+    entity: str
+    data: dict | None  # the data sent, or None for a get
+
+
+class Operation(NamedTuple):
+    """The XML of one transaction, as listed by Request.operations()."""
+
+    container: int  # index in Request containers
+    transactionid: str
+    xml: str
+
+
+# (tag, attributes) of the containers, in the order that the firewall
+# processes them
+_CONTAINERS: tuple[tuple[str, dict[str, str]], ...] = (
+    ("Get", {}),
+    ("Set", {}),
+    ("Set", {"operation": "add"}),
+    ("Set", {"operation": "update"}),
+    ("Remove", {}),
+)
+_GET, _SET, _ADD, _UPDATE, _REMOVE = range(len(_CONTAINERS))
+
+# a prepared.Param is written into the XML as this marker, which cannot come
+# from escaped text as it holds NUL characters
+_PARAM_RE = re.compile(r"\x00(\w+)\x00")
+
+
+def _login_xml(login: Element | str) -> str:
+    if isinstance(login, str):
+        return login
+    return ET.tostring(login, encoding="unicode")
 
 
 class Request:
     def __init__(self, apiversion: str = "") -> None:
-        self.request = _create_element("Request")
-        self.request.set("APIVersion", apiversion)
-
-        self._get = _create_element("Get")
-        self._set = _create_element("Set")
-        self._add = _create_element("Set")
-        self._add.set("operation", "add")
-        self._update = _create_element("Set")
-        self._update.set("operation", "update")
-        self._remove = _create_element("Remove")
-
-        self.request.append(self._get)
-        self.request.append(self._set)
-        self.request.append(self._add)
-        self.request.append(self._update)
-        self.request.append(self._remove)
+        self._apiversion = apiversion
+
+        # the XML of each transaction is written as it is added, rather than
+        # building Elements and serialising them when sent
+        self._containers: tuple[list[Operation], ...] = tuple(
+            [] for _ in _CONTAINERS
+        )
+        # set with set_login
+        self._logins: list[Element | str] = []
+
+        # each transaction gets a unique id, so the responses can be linked
+        # back to the call that they answer
+        self.transactions: dict[str, Transaction] = {}
+        self._transaction_counter = itertools.count(1)
 
     def __str__(self) -> str:
-        return ET.tostring(self.request).decode("utf-8")
+        return self.to_bytes().decode("utf-8")
+
+    def to_bytes(self, login: Element | str | None = None) -> bytes:
+        """The serialised XML of the whole request, UTF-8 encoded.
+
+        If `login` is given it is placed first in the serialised request, but
+        the Request itself is left unchanged so that it can be sent to more
+        than one firewall, or more than once. It can also be given as XML.
+
+        Raises ValueError if it holds a Param, which is only filled in by
+        binding a PreparedRequest.
+        """
+        logins = self._logins if login is None else [login, *self._logins]
+        xml = "".join(
+            (
+                self._head(),
+                *(_login_xml(e) for e in logins),
+                self._body(),
+            )
+        )
+        params = _PARAM_RE.findall(xml)
+        if params:
+            names = ", ".join(sorted(set(params)))
+            raise ValueError(f"Unbound params: {names}")
+        # as ET.tostring, which escapes anything outside of ASCII
+        return xml.encode("ascii", "xmlcharrefreplace")
+
+    def _head(self) -> str:
+        return f'<Request APIVersion="{escape_attrib(self._apiversion)}">'
+
+    def _body(self) -> str:
+        """The XML after the logins, up to the end of the request."""
+        parts = [
+            element_xml(tag, attrib, "".join(op.xml for op in operations))
+            for (tag, attrib), operations in zip(_CONTAINERS, self._containers)
+        ]
+        parts.append("</Request>")
+        return "".join(parts)
+
+    @property
+    def apiversion(self) -> str:
+        return self._apiversion
+
+    @property
+    def request(self) -> Element:
+        """The whole request as an Element, as it was before the XML was
+        written directly. It is parsed from the XML, so changing it does not
+        change the Request.
+        """
+        return ET.fromstring(self.to_bytes())
+
+    def operations(self) -> list[Operation]:
+        """List every transaction, in the order that the firewall processes
+        them.
+        """
+        return [op for container in self._containers for op in container]
+
+    def subrequest(self, operations: Iterable[Operation]) -> Request:
+        """Create a Request holding only the given `operations`, as listed by
+        Request.operations().
+        """
+        request = Request(apiversion=self.apiversion)
+        for op in operations:
+            request._containers[op.container].append(op)
+            request.transactions[op.transactionid] = self.transactions[
+                op.transactionid
+            ]
+        return request
+
+    def _add_transaction(
+        self, container: int, xml: str, transaction: Transaction
+    ) -> None:
+        self.transactions[transaction.transactionid] = transaction
+        self._containers[container].append(
+            Operation(container, transaction.transactionid, xml)
+        )
+
+    def _new_transactionid(self, prefix: str) -> str:
+        return f"{prefix}_{next(self._transaction_counter)}"
 
     def set_login(self, login: Element) -> None:
-        self.request.insert(0, login)
+        """Include `login` whenever the request is serialised. Replaces any
+        previous login, so sending the same Request again is safe.
+        """
+        self._logins = [login]
 
     # GENERIC METHODS
     def get(self, entity: str) -> None:
-        elem = _create_element(entity, transactionid=f"get_{entity}s")
-        self._get.append(elem)
+        transactionid = self._new_transactionid(f"get_{entity}s")
+        self._add_transaction(
+            _GET,
+            element_xml(entity, {"transactionid": transactionid}),
+            Transaction(transactionid, "get", entity, None),
+        )
 
-    def get_filter(self, entity: str, type: Filter, name: str) -> None:
-        elem = _create_element(
-            entity, transactionid=f"get_{entity}_{type.name}"
+    def get_filter(
+        self,
+        entity: str,
+        type: Filter | None = None,
+        name: str | None = None,
+        *,
+        key: str = "Name",
+        criteria: Iterable[Criterion] = (),
+    ) -> None:
+        """Get the entities whose `key` (the name by default) matches `name`.
+
+        More criteria, on any key, can be given with `criteria`, eg.
+        [Filter.LIKE.on("IPAddress", "10.0.")]. They are all sent in one
+        <Filter>, so the firewall only returns the entities matching all of
+        them.
+        """
+        keys = list(criteria)
+        if type is not None:
+            if name is None:
+                raise TypeError("get_filter needs a name with the filter type")
+            keys.insert(0, Criterion(key, type, name))
+        if not keys:
+            raise TypeError("get_filter needs at least one criterion")
+
+        types = "_".join(c.type.name for c in keys)
+        transactionid = self._new_transactionid(f"get_{entity}_{types}")
+        filter_xml = ET.tostring(_make_filter_keys(keys), encoding="unicode")
+        self._add_transaction(
+            _GET,
+            element_xml(entity, {"transactionid": transactionid}, filter_xml),
+            Transaction(transactionid, "get", entity, None),
         )
-        filter_elem = _make_filter(type, name)
-        elem.append(filter_elem)
-        self._get.append(elem)
 
     def set(self, entity: str, data: dict) -> None:
-        elem = json_to_xml(entity, data)
-        elem.set("transactionid", f"set_{entity}")
-        self._set.append(elem)
+        self._add_set_transaction(_SET, "set", entity, data)
 
     def add(self, entity: str, data: dict) -> None:
-        elem = json_to_xml(entity, data)
-        elem.set("transactionid", f"set_{entity}")
-        self._add.append(elem)
+        self._add_set_transaction(_ADD, "add", entity, data)
 
     def update(self, entity: str, data: dict) -> None:
-        elem = json_to_xml(entity, data)
-        elem.set("transactionid", f"set_{entity}")
-        self._update.append(elem)
+        self._add_set_transaction(_UPDATE, "update", entity, data)
 
     def remove(self, entity: str, name: str) -> None:
-        elem = json_to_xml(entity, {"Name": name})
-        elem.set("transactionid", f"remove_{entity}")
-        self._remove.append(elem)
+        data: dict = {"Name": name}
+        transactionid = self._new_transactionid(f"remove_{entity}")
+        self._add_transaction(
+            _REMOVE,
+            entity_xml(entity, data, transactionid),
+            Transaction(transactionid, "remove", entity, data),
+        )
+
+    def _add_set_transaction(
+        self, container: int, operation: str, entity: str, data: dict
+    ) -> None:
+        transactionid = self._new_transactionid(f"{operation}_{entity}")
+        self._add_transaction(
+            container,
+            entity_xml(entity, data, transactionid),
+            Transaction(transactionid, operation, entity, data),
+        )
 
     # ZONES
     def get_zones(self) -> None:
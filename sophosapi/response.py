@@ -1,9 +1,39 @@
 from __future__ import annotations
 
+from typing import Any
+from typing import Iterator
+from typing import Mapping
+from typing import TYPE_CHECKING
 from xml.etree.ElementTree import Element
 
 from .api_factory import JsonData
-from .api_factory import xml_to_json
+from .xml_converter import xml_to_json
+
+if TYPE_CHECKING:
+    from .request import Transaction
+
+
+_AUTH_FAILURE_MESSAGE = (
+    "Authentication Failure: Can be either incorrect "
+    "username/password, user not an administrator, MFA is "
+    "required, or password is plaintext but not marked as "
+    "`is_encrypted = False` in Client(...) definition."
+)
+
+
+def _login_status(status: str) -> tuple[int, str]:
+    """The status code and message of a Login reply's status text."""
+    if status == "Authentication Failure":
+        # unofficial: to indicate unauthorized
+        return 401, _AUTH_FAILURE_MESSAGE
+
+    assert status == "Authentication Successful"
+    # unofficial: to indicate successful auth
+    return 200, status
+
+
+# the Status of a get which found no entities of the type
+NO_RECORDS = "No. of records Zero."
 
 
 class Response:
@@ -11,6 +41,9 @@ class Response:
         self.data: JsonData = {}
         self.status_code = 0
         self.original_request = response_elem.get("transactionid")
+        self.transactionid = self.original_request
+        # the call this is a response to, set by the Client when known
+        self.transaction: Transaction | None = None
 
         # check for errors
         if response_elem.tag == "Status":
@@ -20,21 +53,11 @@ class Response:
 
         # check for Login status
         if response_elem.tag == "Login":
-            if response_elem.find("./status").text == "Authentication Failure":
-                self.status_code = 401  # unofficial: to indicate unauthorized
-                self.data["message"] = (
-                    "Authentication Failure: Can be either incorrect "
-                    "username/password, user not an administrator, MFA is "
-                    "required, or password is plaintext but not marked as "
-                    "`is_encrypted = False` in Client(...) definition."
-                )
-                return
-            else:
-                self.status_code = 200  # unofficial: to indicate successful auth  # noqa: E501
-                auth_success = response_elem.find("./status").text
-                assert auth_success == "Authentication Successful"
-                self.data["message"] = auth_success
-                return
+            self.status_code, message = _login_status(
+                response_elem.find("./status").text
+            )
+            self.data["message"] = message
+            return
 
         # Check for return data
         if self.original_request.startswith("get"):  # eg get_zones
@@ -45,3 +68,135 @@ class Response:
             status = response_elem.find("./Status")
             self.data["message"] = status.text
             self.status_code = int(status.get("code"))
+
+    @classmethod
+    def from_values(
+        cls,
+        transactionid: str | None,
+        status_code: int,
+        data: JsonData,
+    ) -> Response:
+        """Create a Response from values which were already parsed, without
+        an Element.
+        """
+        response = cls.__new__(cls)
+        response.data = data
+        response.status_code = status_code
+        response.original_request = transactionid
+        response.transactionid = transactionid
+        response.transaction = None
+        return response
+
+
+def get_result(response: Response) -> JsonData | None:
+    """The entity data of a Response to a get, or None when there are no
+    entities of the type.
+
+    Raises ValueError for any other reply, such as a failed login, an error
+    for the whole request, or an error Status in place of the entities.
+    """
+    if response.status_code != 200 or response.transaction is None:
+        raise ValueError(f"{response.status_code}: {response.data}")
+    data = response.data
+    if not isinstance(data, dict):  # an empty element
+        return None
+    if set(data) == {"Status"}:
+        if data["Status"] == NO_RECORDS:
+            return None
+        raise ValueError(f"{response.transaction.entity}: {data['Status']}")
+    return data
+
+
+class LazyResponse(Response):
+    """
+    A get Response which keeps the XML of its entity, and only converts it
+    when `data` is first read. Created by the expat parser, see
+    Client(lazy_responses=True).
+
+    `fields` reads single fields, converting only those.
+    """
+
+    __slots__ = ("_raw", "_data", "_fields")
+    _raw: bytes | None
+    _data: JsonData | None
+    # the fields read through `fields` before `data`, _MISSING if not found
+    _fields: dict[str, Any]
+
+    @classmethod
+    def from_raw(cls, transactionid: str, raw: bytes) -> LazyResponse:
+        response = cls.__new__(cls)
+        response._raw = raw
+        response._data = None
+        response._fields = {}
+        response.status_code = 200
+        response.original_request = transactionid
+        response.transactionid = transactionid
+        response.transaction = None
+        return response
+
+    @property  # type: ignore
+    def data(self) -> JsonData:  # type: ignore
+        if self._data is None:
+            # imported here as expat_parser creates the Responses
+            from .expat_parser import parse_entity
+
+            self._data = parse_entity(self._raw)  # type: ignore
+            self._raw = None  # no longer needed
+            self._fields = {}
+        return self._data
+
+    @data.setter
+    def data(self, value: JsonData) -> None:
+        self._data = value
+        self._raw = None  # replaced, so fields reads the new data
+        self._fields = {}
+
+    @property
+    def fields(self) -> Mapping[str, Any]:
+        """A mapping of the data which only converts the fields that are
+        read. Iterating over it converts all of the data.
+        """
+        if self._raw is not None:
+            return _FieldsView(self)
+        data = self.data
+        return data if isinstance(data, dict) else {}
+
+
+_MISSING = object()
+
+
+class _FieldsView(Mapping):
+    __slots__ = ("_response",)
+
+    def __init__(self, response: LazyResponse) -> None:
+        self._response = response
+
+    def __getitem__(self, key: str) -> Any:
+        response = self._response
+        raw = response._raw
+        if raw is None:  # converted since
+            return response.fields[key]
+
+        if key not in response._fields:
+            from .expat_parser import parse_entity
+
+            # Hosts holds the DstHosts of LocalServiceACL
+            fields = (key, "Hosts") if key == "DstHosts" else (key,)
+            data = parse_entity(raw, fields)
+            found = data if isinstance(data, dict) else {}
+            response._fields[key] = found.get(key, _MISSING)
+
+        value = response._fields[key]
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def _converted(self) -> Mapping[str, Any]:
+        self._response.data
+        return self._response.fields
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._converted())
+
+    def __len__(self) -> int:
+        return len(self._converted())
@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+import itertools
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
+from typing import Iterable
+from typing import Mapping
+from typing import NamedTuple
+
+from .client import Client
+from .export import iter_snapshot
+from .export import load_manifest
+from .export import verify_snapshot
+from .request import Request
+from .watcher import entity_name
+
+# the entity types which each type refers to, and so must be restored first
+DEPENDENCIES: dict[str, tuple[str, ...]] = {
+    "IPHostGroup": ("IPHost",),
+    "FQDNHostGroup": ("FQDNHost",),
+    "ServiceGroup": ("Services",),
+    "LocalServiceACL": ("Zone", "IPHost", "IPHostGroup", "Services"),
+    "FirewallRule": (
+        "Zone",
+        "IPHost",
+        "IPHostGroup",
+        "FQDNHost",
+        "FQDNHostGroup",
+        "MACHost",
+        "Services",
+        "ServiceGroup",
+        "Schedule",
+    ),
+    "FirewallRuleGroup": ("FirewallRule",),
+    "NATRule": (
+        "IPHost",
+        "IPHostGroup",
+        "FQDNHost",
+        "FQDNHostGroup",
+        "Services",
+        "ServiceGroup",
+        "FirewallRule",
+    ),
+}
+
+
+class RestoreResult(NamedTuple):
+    """The outcome of restoring one entity type."""
+
+    entity: str
+    applied: int  # entities the firewall accepted
+    failed: list[tuple[str, int, str]]  # (name, status code, message)
+    error: str | None  # why the type could not be restored, if it could not
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and not self.failed
+
+
+def restore_order(
+    entity_types: Iterable[str],
+    dependencies: Mapping[str, Iterable[str]] = DEPENDENCIES,
+) -> list[list[str]]:
+    """Group `entity_types` into levels, each only depending on the types of
+    the levels before it. Dependencies outside of `entity_types` are
+    ignored.
+    """
+    types = list(dict.fromkeys(entity_types))
+    waiting = _waiting_on(types, dependencies)
+    levels = []
+    while waiting:
+        level = [t for t in types if t in waiting and not waiting[t]]
+        if not level:
+            raise ValueError(f"Circular dependencies between {list(waiting)}")
+        for t in level:
+            del waiting[t]
+        for deps in waiting.values():
+            deps.difference_update(level)
+        levels.append(level)
+    return levels
+
+
+def _waiting_on(
+    types: list[str], dependencies: Mapping[str, Iterable[str]]
+) -> dict[str, set[str]]:
+    """The dependencies of each of `types`, among `types`."""
+    return {
+        t: {d for d in dependencies.get(t, ()) if d in types and d != t}
+        for t in types
+    }
+
+
+def restore(
+    client: Client,
+    directory: str,
+    entity_types: Iterable[str] | None = None,
+    *,
+    operation: str = "set",
+    batch_size: int = 500,
+    max_workers: int = 4,
+    dependencies: Mapping[str, Iterable[str]] = DEPENDENCIES,
+) -> dict[str, RestoreResult]:
+    """Restore the entities of an export (see export.export) to the firewall.
+
+    Types are restored once the types they depend on are done, and up to
+    `max_workers` types at once. Each type is streamed from its snapshot and
+    sent in Requests of `batch_size` transactions, so only one batch of
+    each type is held in memory. `operation` is "set", "add" or "update".
+
+    All the exported types are restored, unless `entity_types` is given.
+    Types which failed do not stop the types which depend on them. Each
+    snapshot is checked against the manifest's hash before any of it is
+    sent.
+    """
+    if operation not in ("set", "add", "update"):
+        raise ValueError(f"Unknown operation {operation!r}")
+    manifest = load_manifest(directory)
+    if entity_types is None:
+        entity_types = [
+            t for t, r in manifest["entities"].items() if r["error"] is None
+        ]
+    types = list(dict.fromkeys(entity_types))
+
+    restore_order(types, dependencies)  # raises on circular dependencies
+    waiting = _waiting_on(types, dependencies)
+
+    def restore_type(entity: str) -> RestoreResult:
+        return _restore_entity(
+            client, directory, manifest, entity, operation, batch_size
+        )
+
+    results: dict[str, RestoreResult] = {}
+    running: dict[Future, str] = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while waiting or running:
+            for t in [t for t in types if t in waiting and not waiting[t]]:
+                del waiting[t]
+                running[executor.submit(restore_type, t)] = t
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                entity = running.pop(future)
+                results[entity] = future.result()
+                for deps in waiting.values():
+                    deps.discard(entity)
+
+    return {t: results[t] for t in types}
+
+
+def _restore_entity(
+    client: Client,
+    directory: str,
+    manifest: dict,
+    entity: str,
+    operation: str,
+    batch_size: int,
+) -> RestoreResult:
+    applied = 0
+    failed: list[tuple[str, int, str]] = []
+    try:
+        # nothing is sent from a snapshot which does not match the manifest
+        verify_snapshot(directory, entity, manifest)
+        items = iter_snapshot(directory, entity, manifest)
+        while True:
+            batch = list(itertools.islice(items, batch_size))
+            if not batch:
+                break
+            request = Request(apiversion=client.apiversion)
+            for data in batch:
+                getattr(request, operation)(entity, data)
+
+            for response in client.send(request):
+                if response.status_code == 200:
+                    applied += 1
+                    continue
+                transaction = response.transaction
+                name = (
+                    ""
+                    if transaction is None
+                    else entity_name(transaction.data or {})
+                )
+                data = response.data
+                message = (
+                    data.get("message", "") if isinstance(data, dict) else data
+                )
+                failed.append((name, response.status_code, str(message)))
+    except Exception as e:
+        return RestoreResult(
+            entity, applied, failed, f"{type(e).__name__}: {e}"
+        )
+    return RestoreResult(entity, applied, failed, None)
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+from typing import Dict
+from typing import Iterable
+from typing import List
+
+from .response import Response
+
+Index = Dict[str, List[Response]]
+
+# the list methods which change the responses, and so clear the indexes
+_MUTATORS = (
+    "__setitem__",
+    "__delitem__",
+    "__iadd__",
+    "append",
+    "extend",
+    "insert",
+    "pop",
+    "remove",
+    "clear",
+    "sort",
+    "reverse",
+)
+
+
+class ResultSet(List[Response]):
+    """
+    The responses of a get, with hash indexes on their fields for lookups in
+    constant time.
+
+    The index of a field is built the first time it is looked up, and kept
+    until the ResultSet is changed. Copies share the indexes until they are
+    changed. A field is a key of the entity data, or
+    a path of keys separated by dots for nested data, eg
+    "NetworkPolicy.SourceNetworks". A field holding a list, such as the
+    HostList of an IPHostGroup, is indexed on each of its items, so looking
+    up a host finds the groups which contain it.
+    """
+
+    def __init__(self, responses: Iterable[Response] = ()) -> None:
+        super().__init__(responses)
+        self._indexes: dict[str, Index] = {}
+
+    def index_on(self, field: str) -> Index:
+        """The responses by each value of `field`. The index is shared, so
+        it must not be changed.
+        """
+        index = self._indexes.get(field)
+        if index is None:
+            index = self._indexes[field] = _build_index(self, field)
+        return index
+
+    def lookup(self, field: str, value: str) -> list[Response]:
+        """The responses whose `field` is, or contains, `value`."""
+        return list(self.index_on(field).get(value, ()))
+
+    def copy(self) -> ResultSet:  # type: ignore[override]
+        """A shallow copy, which shares the indexes with this ResultSet until
+        one of them is changed.
+        """
+        result = ResultSet(self)
+        result._indexes = self._indexes
+        return result
+
+    def contains(self, field: str, value: str) -> bool:
+        return value in self.index_on(field)
+
+    def by_name(self, name: str) -> Response | None:
+        """The response of the entity called `name`, by its Name, or
+        RuleName for entities such as LocalServiceACL.
+        """
+        for field in ("Name", "RuleName"):
+            found = self.lookup(field, name)
+            if found:
+                return found[0]
+        return None
+
+    def __repr__(self) -> str:
+        return f"ResultSet({list.__repr__(self)})"
+
+
+def _clearing_indexes(name: str):
+    method = getattr(list, name)
+
+    def wrapper(self, *args, **kwargs):
+        self._indexes = {}  # not cleared, as copies may share it
+        return method(self, *args, **kwargs)
+
+    wrapper.__name__ = name
+    wrapper.__doc__ = method.__doc__
+    return wrapper
+
+
+for _name in _MUTATORS:
+    setattr(ResultSet, _name, _clearing_indexes(_name))
+
+
+def _build_index(responses: Iterable[Response], field: str) -> Index:
+    path = field.split(".")
+    index: Index = {}
+    for response in responses:
+        value = response.data
+        for key in path:
+            if not isinstance(value, dict):
+                break
+            value = value.get(key)  # type: ignore
+        else:
+            if isinstance(value, str):
+                index.setdefault(value, []).append(response)
+            elif isinstance(value, list):
+                # a host listed twice still gives its group once
+                items = (v for v in value if isinstance(v, str))
+                for item in dict.fromkeys(items):
+                    index.setdefault(item, []).append(response)
+    return index
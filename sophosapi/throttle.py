@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import http.client
+import random
+import socket
+import threading
+import time
+from typing import AbstractSet
+from urllib.error import HTTPError
+
+from .prepared import Sendable
+
+# transaction Status codes of a firewall too busy to process the transaction
+BUSY_STATUSES = frozenset({503})
+# HTTP statuses worth retrying, and those of a request the firewall refused
+# before processing any of it
+_RETRY_HTTP_STATUSES = frozenset({429, 502, 503, 504})
+_REFUSED_HTTP_STATUSES = frozenset({429, 503})
+
+_TRANSIENT_ERRORS = (
+    ConnectionError,
+    TimeoutError,
+    socket.timeout,
+    http.client.HTTPException,
+)
+
+
+class TokenBucket:
+    """
+    Limits calls to `rate` per second, allowing bursts of up to `burst`
+    calls. Can be shared by several Clients to limit them together.
+    """
+
+    def __init__(self, rate: float, burst: int = 1) -> None:
+        if rate <= 0 or burst < 1:
+            raise ValueError("rate must be above 0 and burst at least 1")
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Wait for a token, returning the seconds waited."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.burst,
+                    self._tokens + (now - self._updated) * self.rate,
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+            waited += wait
+
+
+class RetryPolicy:
+    """
+    How a Client retries calls which failed for a transient reason.
+
+    A call is tried at most `attempts` times. Before each retry it waits a
+    random time between 0 and `backoff` * 2**retry seconds, capped at
+    `max_backoff` ("full jitter"), so clients which failed together do not
+    retry together.
+
+    Transport errors and HTTP 429, 502, 503 and 504 are retried. A request
+    which writes is only sent again if the firewall refused it (connection
+    refused, HTTP 429 or 503), as otherwise some writes may have been
+    applied.
+
+    Transactions answered with a Status code in `statuses` are sent again on
+    their own, with the same transactionids, and their new responses replace
+    the busy ones. The transactions which succeeded are not sent again.
+    """
+
+    def __init__(
+        self,
+        *,
+        attempts: int = 3,
+        backoff: float = 0.5,
+        max_backoff: float = 10.0,
+        statuses: AbstractSet[int] = BUSY_STATUSES,
+    ) -> None:
+        if attempts < 1:
+            raise ValueError("attempts must be at least 1")
+        self.attempts = attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.statuses = statuses
+
+    def delay(self, retry: int) -> float:
+        """The seconds to wait before retry number `retry`, from 0."""
+        return random.uniform(
+            0, min(self.max_backoff, self.backoff * 2**retry)
+        )
+
+    def should_retry(
+        self, request: Sendable, error: BaseException, retry: int
+    ) -> bool:
+        """Whether to send `request` again after it failed with `error`."""
+        if retry + 1 >= self.attempts:
+            return False
+
+        if isinstance(error, HTTPError):
+            if error.code not in _RETRY_HTTP_STATUSES:
+                return False
+            refused = error.code in _REFUSED_HTTP_STATUSES
+        elif isinstance(error, _TRANSIENT_ERRORS):
+            refused = isinstance(error, ConnectionRefusedError)
+        else:
+            return False
+
+        return refused or only_reads(request)
+
+
+def only_reads(request: Sendable) -> bool:
+    """Whether `request` only gets, and so is safe to send again."""
+    return all(t.operation == "get" for t in request.transactions.values())
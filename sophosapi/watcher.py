@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+import time
+from typing import Callable
+from typing import Iterable
+from typing import NamedTuple
+
+from .api_factory import JsonData
+from .client import Client
+from .prepared import PreparedRequest
+from .request import Request
+from .response import get_result
+
+
+class ChangeEvent(NamedTuple):
+    """An entity which changed between two polls."""
+
+    kind: str  # added, removed or modified
+    entity: str  # eg IPHost
+    name: str
+    data: JsonData | None  # the new data, None when removed
+
+
+def fingerprint(data: JsonData) -> str:
+    """A hash of the entity data which does not depend on key order."""
+    canonical = json.dumps(data, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def entity_name(data: JsonData) -> str:
+    """The name which identifies an entity. Most entities have a Name, some
+    (eg LocalServiceACL) a RuleName. Failing both, the fingerprint is used.
+    """
+    for key in ("Name", "RuleName"):
+        name = data.get(key)
+        if isinstance(name, str):
+            return name
+    return fingerprint(data)
+
+
+class Watcher:
+    """
+    Polls entity types on a Client and reports what was added, removed or
+    modified since the previous poll.
+
+    Only a fingerprint of each entity is kept between polls. Each entity type
+    has its own poll interval: it is reset to `min_interval` when the type
+    changes, and grows by `backoff` each time it does not, up to
+    `max_interval`. Types which are due at the same time are fetched in one
+    Request.
+    """
+
+    def __init__(
+        self,
+        client: Client,
+        entity_types: Iterable[str],
+        *,
+        min_interval: float = 30.0,
+        max_interval: float = 900.0,
+        backoff: float = 1.5,
+    ) -> None:
+        self.client = client
+        self.entity_types = list(entity_types)
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+
+        # entity type -> entity name -> fingerprint. Missing until first poll
+        self._fingerprints: dict[str, dict[str, str]] = {}
+        self.intervals = {e: min_interval for e in self.entity_types}
+        self._next_poll = {e: 0.0 for e in self.entity_types}
+        # the requests of each set of types polled together, kept for reuse
+        self._requests: dict[tuple[str, ...], PreparedRequest] = {}
+
+    def poll(
+        self, entity_types: Iterable[str] | None = None
+    ) -> list[ChangeEvent]:
+        """Fetch `entity_types` (all by default) now and return the changes.
+
+        The first poll of a type records its entities without reporting them.
+        Raises ValueError if any of the gets failed, without recording any of
+        them, so that a failed poll is not taken as every entity removed.
+        """
+        entity_types = list(
+            self.entity_types if entity_types is None else entity_types
+        )
+        if not entity_types:
+            return []
+
+        key = tuple(entity_types)
+        prepared = self._requests.get(key)
+        if prepared is None:
+            request = Request(apiversion=self.client.apiversion)
+            for entity in entity_types:
+                request.get(entity)
+            prepared = self._requests[key] = PreparedRequest(request)
+
+        fetched: dict[str, list[JsonData]] = {e: [] for e in entity_types}
+        for response in self.client.send(prepared.bind()):
+            data = get_result(response)
+            if data is not None and response.transaction is not None:
+                fetched[response.transaction.entity].append(data)
+
+        now = time.monotonic()
+        events = []
+        for entity, items in fetched.items():
+            changes = self._diff(entity, items)
+            events.extend(changes)
+
+            if changes:
+                self.intervals[entity] = self.min_interval
+            else:
+                self.intervals[entity] = min(
+                    self.intervals[entity] * self.backoff, self.max_interval
+                )
+            self._next_poll[entity] = now + self.intervals[entity]
+
+        return events
+
+    def poll_due(self) -> list[ChangeEvent]:
+        """Poll the entity types whose interval has elapsed."""
+        now = time.monotonic()
+        due = [e for e in self.entity_types if self._next_poll[e] <= now]
+        return self.poll(due)
+
+    def seconds_until_due(self) -> float:
+        now = time.monotonic()
+        return max(0.0, min(self._next_poll.values(), default=0.0) - now)
+
+    def run(
+        self,
+        callback: Callable[[ChangeEvent], None],
+        stop: threading.Event | None = None,
+    ) -> None:
+        """Poll until `stop` is set, calling `callback` for each change."""
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            for event in self.poll_due():
+                callback(event)
+            stop.wait(self.seconds_until_due())
+
+    def _diff(self, entity: str, items: list[JsonData]) -> list[ChangeEvent]:
+        current = {}
+        data_by_name = {}
+        for data in items:
+            name = entity_name(data)
+            current[name] = fingerprint(data)
+            data_by_name[name] = data
+
+        previous = self._fingerprints.get(entity)
+        self._fingerprints[entity] = current
+        if previous is None:  # first poll
+            return []
+
+        events = []
+        for name, digest in current.items():
+            if name not in previous:
+                events.append(
+                    ChangeEvent("added", entity, name, data_by_name[name])
+                )
+            elif previous[name] != digest:
+                events.append(
+                    ChangeEvent("modified", entity, name, data_by_name[name])
+                )
+        for name in previous.keys() - current.keys():
+            events.append(ChangeEvent("removed", entity, name, None))
+
+        return events
@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+from xml.etree.ElementTree import Element
+
+from .api_factory import JsonData
+from .tags_of_lists import tags_of_lists
+
+# How an element with children is converted, decided by its tag. These follow
+# the if/elif chain of api_factory.xml_to_json.
+_DICT = 0  # recurse
+_LIST = 1  # a tags_of_lists list
+_HOSTS = 2  # LocalServiceACL Hosts, split into Hosts and DstHosts
+_FLAT_LIST = 3  # FirewallRule HTTPBasedPolicy AccessPaths and Exceptions
+
+# FirewallRule/HTTPBasedPolicy lists whose items hold repeated tags, which are
+# gathered into lists: {list tag: (item tag, {repeated tag: key in JSON})}
+_FLAT_LISTS = {
+    "AccessPaths": (
+        "AccessPath",
+        {
+            "backend": "backends",
+            "allowed_networks": "allowed_networks",
+            "denied_networks": "denied_networks",
+        },
+    ),
+    "Exceptions": (
+        "Exception",
+        {
+            "path": "paths",
+            "source": "sources",
+            "skip_threats_filter_categories": "skip_threats_filter_categories",
+        },
+    ),
+}
+
+
+def _kind(tag: str) -> int:
+    if tag == "Hosts":
+        return _HOSTS
+    if tag in _FLAT_LISTS:
+        return _FLAT_LIST
+    if tag in tags_of_lists:
+        return _LIST
+    return _DICT
+
+
+class _Plan:
+    """The conversion of the children of one tag path, filled in as new
+    child tags are met and reused for every later element on that path.
+    """
+
+    __slots__ = ("children", "items")
+
+    def __init__(self) -> None:
+        # child tag -> (kind, plan of the child)
+        self.children: dict[str, tuple[int, _Plan]] = {}
+        # plans of list items, by item tag
+        self.items: dict[str, _Plan] = {}
+
+    def child(self, tag: str) -> tuple[int, _Plan]:
+        step = self.children.get(tag)
+        if step is None:
+            step = self.children[tag] = (_kind(tag), _Plan())
+        return step
+
+    def item(self, tag: str) -> _Plan:
+        plan = self.items.get(tag)
+        if plan is None:
+            plan = self.items[tag] = _Plan()
+        return plan
+
+
+class XmlToJsonConverter:
+    """
+    Converts Elements to JSON exactly like api_factory.xml_to_json, but
+    decides how to handle each tag path once and caches the decision, rather
+    than going through the special cases for every element.
+
+    The plans only depend on tags_of_lists and the special cases, so one
+    converter can be shared by all Responses.
+    """
+
+    def __init__(self) -> None:
+        self._plans: dict[str, _Plan] = {}
+
+    def __call__(self, elem: Element) -> JsonData:
+        plan = self._plans.get(elem.tag)
+        if plan is None:
+            plan = self._plans[elem.tag] = _Plan()
+        return self._convert(elem, plan)
+
+    def _convert(self, elem: Element, plan: _Plan) -> JsonData:
+        if len(elem) == 0:
+            return elem.text or ""  # type: ignore
+
+        obj: JsonData = {}
+        children = plan.children
+        convert = self._convert
+        for attribute in elem:
+            tag = attribute.tag
+
+            if not len(attribute):
+                obj[tag] = attribute.text or ""
+                continue
+
+            step = children.get(tag)
+            if step is None:
+                step = plan.child(tag)
+            kind, child_plan = step
+
+            if kind == _DICT:
+                obj[tag] = convert(attribute, child_plan)
+
+            elif kind == _LIST:
+                items = child_plan.items
+                values: list = [
+                    (
+                        convert(e, items.get(e.tag) or child_plan.item(e.tag))
+                        if len(e)
+                        else e.text or ""
+                    )  # most list items are plain names
+                    for e in attribute
+                ]
+                obj[tag] = values
+
+            elif kind == _HOSTS:
+                hosts = []
+                dsthosts = []
+                for e in attribute:
+                    if e.tag == "Host":
+                        hosts.append(e.text)
+                    elif e.tag == "DstHost":
+                        dsthosts.append(e.text)
+                obj["Hosts"] = hosts  # type: ignore
+                obj["DstHosts"] = dsthosts  # type: ignore
+
+            else:  # _FLAT_LIST
+                obj[tag] = _convert_flat_list(attribute)  # type: ignore
+
+        return obj
+
+
+def _convert_flat_list(elem: Element) -> list[JsonData]:
+    item_tag, repeated = _FLAT_LISTS[elem.tag]
+    items = []
+    for item in elem:
+        if item.tag != item_tag:
+            continue
+
+        obj: JsonData = {}
+        for attribute in item:
+            key = repeated.get(attribute.tag)
+            if key is None:
+                obj[attribute.tag] = attribute.text or ""
+            elif key in obj:
+                obj[key].append(attribute.text)  # type: ignore
+            else:
+                obj[key] = [attribute.text]  # type: ignore
+        items.append(obj)
+
+    return items
+
+
+# shared by the Responses
+xml_to_json = XmlToJsonConverter()
@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+from typing import Any
+from typing import Collection
+from typing import Tuple
+
+from defusedxml import ElementTree as ET  # type: ignore
+
+from .api_factory import json_to_xml
+from .tags_of_lists import tags_of_lists
+
+# Writes the XML of json_to_xml(entity, data) as ET.tostring would, without
+# building the Elements.
+
+_Pair = Tuple[str, Any]
+
+
+class _Children(list):
+    """The (tag, value) children of an element, as rearranged by one of the
+    json_to_xml special cases.
+    """
+
+
+def escape_cdata(text: str) -> str:
+    """Escape `text` for the content of an element, as ET.tostring does."""
+    if "&" in text:
+        text = text.replace("&", "&amp;")
+    if "<" in text:
+        text = text.replace("<", "&lt;")
+    if ">" in text:
+        text = text.replace(">", "&gt;")
+    return text
+
+
+def escape_attrib(text: str) -> str:
+    """Escape `text` for an attribute value in double quotes, as ET.tostring
+    does since Python 3.8, where line ends and tabs are kept as references.
+    """
+    text = escape_cdata(text)
+    if '"' in text:
+        text = text.replace('"', "&quot;")
+    if "\r" in text:
+        text = text.replace("\r", "&#13;")
+    if "\n" in text:
+        text = text.replace("\n", "&#10;")
+    if "\t" in text:
+        text = text.replace("\t", "&#09;")
+    return text
+
+
+def element_xml(
+    tag: str, attrib: dict[str, str] | None = None, content: str = ""
+) -> str:
+    """<tag attrib>content</tag>, or <tag attrib /> when `content` is
+    empty.
+    """
+    attributes = "".join(
+        f' {k}="{escape_attrib(v)}"' for k, v in (attrib or {}).items()
+    )
+    if not content:
+        return f"<{tag}{attributes} />"
+    return f"<{tag}{attributes}>{content}</{tag}>"
+
+
+def entity_xml(
+    entity: str, data: dict, transactionid: str | None = None
+) -> str:
+    """The XML of json_to_xml(`entity`, `data`), with `transactionid` set.
+
+    Encode with "ascii" and "xmlcharrefreplace" to get the same bytes as
+    ET.tostring.
+    """
+    attrib = {} if transactionid is None else {"transactionid": transactionid}
+    pairs: list[_Pair] | None = list(data.items())
+    members = False
+
+    if entity == "SSLTLSInspectionRule":
+        members = True
+    elif entity == "LocalServiceACL":
+        pairs = _move_dsthosts(pairs)  # type: ignore
+    elif entity == "FirewallRule":
+        pairs = _flatten_http_based_policy(pairs)  # type: ignore
+
+    if pairs is None:  # a shape which only json_to_xml can reproduce
+        elem = json_to_xml(entity, data)
+        elem.attrib.update(attrib)
+        return ET.tostring(elem, encoding="unicode")
+
+    out: list[str] = []
+    for tag, value in pairs:
+        _write(out, tag, value, members)
+    return element_xml(entity, attrib, "".join(out))
+
+
+def _pairs(tag: str, value: Any, members: bool) -> Collection[_Pair]:
+    """The (tag, value) children of <tag> holding `value`. `members` renames
+    Identity/Member to Members, for SSLTLSInspectionRule.
+    """
+    if isinstance(value, _Children):
+        return value
+
+    if isinstance(value, dict):
+        if members and tag == "Identity" and "Member" in value:
+            return [
+                ("Members" if k == "Member" else k, v)
+                for k, v in value.items()
+            ]
+        return value.items()
+
+    if isinstance(value, list):
+        item_tag = tags_of_lists[tag]
+        if members and tag == "Identity" and item_tag == "Member":
+            item_tag = "Members"
+        # items other than str or dict are left empty, lists included
+        return [
+            (item_tag, v if isinstance(v, (str, dict)) else None)
+            for v in value
+        ]
+
+    return ()
+
+
+def _write(out: list[str], tag: str, value: Any, members: bool) -> None:
+    if isinstance(value, str):
+        if value:
+            out.append(f"<{tag}>{escape_cdata(value)}</{tag}>")
+        else:
+            out.append(f"<{tag} />")
+        return
+
+    pairs = _pairs(tag, value, members)
+    if not pairs:
+        out.append(f"<{tag} />")
+        return
+
+    out.append(f"<{tag}>")
+    for child_tag, child in pairs:
+        _write(out, child_tag, child, members)
+    out.append(f"</{tag}>")
+
+
+def _has_children(value: Any) -> bool:
+    return isinstance(value, (dict, list)) and len(value) > 0
+
+
+# json_to_xml special cases
+def _move_dsthosts(pairs: list[_Pair]) -> list[_Pair] | None:
+    """_handle_LocalServiceACL_Hosts: the DstHost items are moved to the end
+    of Hosts, and dropped if Hosts is missing or empty.
+
+    Returns None if Hosts or DstHosts are below the top level, where the
+    handler's searches behave differently.
+    """
+    tags = {"Hosts", "DstHosts"}
+    if any(_has_tags(tag, value, tags) for tag, value in pairs):
+        return None
+
+    for i, (tag, dsthosts) in enumerate(pairs):
+        if tag == "DstHosts":
+            del pairs[i]
+            break
+    else:
+        return pairs
+
+    for i, (tag, hosts) in enumerate(pairs):
+        if tag == "Hosts":
+            if _has_children(hosts):
+                children = _Children(_pairs(tag, hosts, False))
+                children.extend(_pairs("DstHosts", dsthosts, False))
+                pairs[i] = (tag, children)
+            break
+
+    return pairs
+
+
+def _has_tags(tag: str, value: Any, tags: set[str]) -> bool:
+    """Whether any descendant of <tag> holding `value` has one of `tags`."""
+    for child_tag, child in _pairs(tag, value, False):
+        if child_tag in tags or _has_tags(child_tag, child, tags):
+            return True
+    return False
+
+
+# list in HTTPBasedPolicy: (item tag, lists flattened into each item)
+_HTTP_BASED_POLICY_LISTS = (
+    ("AccessPaths", ("backends", "allowed_networks", "denied_networks")),
+    ("Exceptions", ("paths", "sources", "skip_threats_filter_categories")),
+)
+
+
+def _flatten_http_based_policy(pairs: list[_Pair]) -> list[_Pair]:
+    """_handle_FirewallRule_HTTPBasedPolicy: in each AccessPath and Exception,
+    the items of some lists are moved to the end, without their list.
+    """
+    for i, (tag, value) in enumerate(pairs):
+        if tag != "HTTPBasedPolicy":
+            continue
+        if not _has_children(value):
+            break
+
+        policy = _Children(_pairs(tag, value, False))
+        for list_tag, flattened in _HTTP_BASED_POLICY_LISTS:
+            for j, (child_tag, items) in enumerate(policy):
+                if child_tag == list_tag:
+                    if _has_children(items):
+                        policy[j] = (
+                            child_tag,
+                            _Children(
+                                (item_tag, _flatten(item_tag, item, flattened))
+                                for item_tag, item in _pairs(
+                                    child_tag, items, False
+                                )
+                            ),
+                        )
+                    break
+
+        pairs[i] = (tag, policy)
+        break
+
+    return pairs
+
+
+def _flatten(tag: str, value: Any, flattened: tuple[str, ...]) -> Any:
+    if not _has_children(value):
+        return value
+
+    pairs = _Children(_pairs(tag, value, False))
+    for name in flattened:
+        for i, (child_tag, child) in enumerate(pairs):
+            if child_tag == name:
+                del pairs[i]
+                pairs.extend(_pairs(child_tag, child, False))
+                break
+    return pairs
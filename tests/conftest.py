@@ -0,0 +1,90 @@
+import pathlib
+import shutil
+import ssl
+import sys
+
+import pytest
+
+from sophosapi.client import Client
+from sophosapi.mock_server import MockServer
+
+# the benchmarks' helpers, which are scripts rather than a package
+sys.path.append(str(pathlib.Path(__file__).parents[1] / "benchmarks"))
+from certs import self_signed_cert  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def server_cert(tmp_path_factory):
+    """A self-signed certificate for 127.0.0.1 and its key, made with the
+    openssl command.
+    """
+    if shutil.which("openssl") is None:
+        pytest.skip("needs openssl")
+    return self_signed_cert(str(tmp_path_factory.mktemp("cert")))
+
+
+@pytest.fixture
+def ssl_context(server_cert):
+    """A client SSLContext which trusts the servers of `serve`."""
+    return ssl.create_default_context(cafile=server_cert[0])
+
+
+@pytest.fixture
+def serve(server_cert):
+    """Start a MockServer for a MockFirewall, stopped after the test."""
+    certfile, keyfile = server_cert
+    servers = []
+
+    def serve(firewall):
+        server = MockServer(firewall, certfile=certfile, keyfile=keyfile)
+        server.start()
+        servers.append(server)
+        return server
+
+    yield serve
+    for server in servers:
+        server.stop()
+
+
+@pytest.fixture
+def connect(monkeypatch):
+    """Make a Client whose calls are answered by a MockFirewall in process,
+    without a server. The requests it sends are added to `sent`, if given.
+    Only send and the calls made through it are answered.
+    """
+
+    def connect(firewall, sent=None):
+        client = Client(username="u", password="p", server="127.0.0.1")
+
+        def make_api_call(request):
+            if sent is not None:
+                sent.append(request)
+            return firewall.handle(client._serialize_request(request))
+
+        monkeypatch.setattr(client, "_make_api_call", make_api_call)
+        return client
+
+    return connect
+
+
+@pytest.fixture
+def server_client(serve, ssl_context):
+    """Make a Client connected to a MockServer serving a MockFirewall."""
+    clients = []
+
+    def server_client(firewall, **kwargs):
+        server = serve(firewall)
+        client = Client(
+            username="u",
+            password="p",
+            server="127.0.0.1",
+            port=server.port,
+            ssl_context=ssl_context,
+            **kwargs,
+        )
+        clients.append(client)
+        return client
+
+    yield server_client
+    for client in clients:
+        client.close()
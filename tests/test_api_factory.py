@@ -4,6 +4,9 @@ from defusedxml import ElementTree as ET
 from sophosapi.api_factory import _create_element
 from sophosapi.api_factory import json_to_xml
 from sophosapi.api_factory import xml_to_json
+from sophosapi.expat_parser import parse_responses
+from sophosapi.xml_converter import XmlToJsonConverter
+from sophosapi.xml_writer import entity_xml
 
 
 def element_equality(e1, e2):
@@ -300,6 +303,13 @@ def test_xml_to_json(xml_string, expected):
     output = xml_to_json(elem)
 
     assert output == expected
+    assert XmlToJsonConverter()(elem) == expected
+
+    elem.set("transactionid", "get_1")
+    body = b"<Response>" + ET.tostring(elem) + b"</Response>"
+    ((tag, response),) = parse_responses([body])
+    assert tag == elem.tag
+    assert response.data == expected
 
 
 @pytest.mark.parametrize(
@@ -603,3 +613,4 @@ def test_json_to_xml(entity, data, expected):
     elem = json_to_xml(entity, data)
 
     assert element_equality(elem, ET.fromstring(expected))
+    assert entity_xml(entity, data) == ET.tostring(elem, encoding="unicode")
@@ -0,0 +1,122 @@
+import asyncio
+import time
+
+import pytest
+
+from sophosapi import async_client
+from sophosapi.async_client import AsyncClient
+from sophosapi.mock_server import MockFirewall
+
+
+@pytest.fixture
+def firewall():
+    firewall = MockFirewall(username="u", password="p")
+    firewall.populate("IPHost", [{"Name": f"h{i}"} for i in range(3)])
+    firewall.populate("Zone", [{"Name": "LAN"}])
+    return firewall
+
+
+@pytest.fixture
+def connections(monkeypatch):
+    """The connections opened by the AsyncClients of the test."""
+    opened = []
+    open_connection = asyncio.open_connection
+
+    async def counting(*args, **kwargs):
+        opened.append(args)
+        return await open_connection(*args, **kwargs)
+
+    monkeypatch.setattr(async_client.asyncio, "open_connection", counting)
+    return opened
+
+
+def make_client(server, ssl_context, **kwargs):
+    return AsyncClient(
+        username="u",
+        password="p",
+        server="127.0.0.1",
+        port=server.port,
+        ssl_context=ssl_context,
+        **kwargs,
+    )
+
+
+def test_concurrent_gets(firewall, serve, ssl_context, connections):
+    client = make_client(serve(firewall), ssl_context, max_concurrency=2)
+
+    async def main():
+        async with client:
+            return await asyncio.gather(
+                *(client.get(e) for e in ["IPHost", "Zone"] * 3)
+            )
+
+    results = asyncio.run(main())
+
+    assert [len(r) for r in results] == [3, 1] * 3
+    assert [r.data["Name"] for r in results[1]] == ["LAN"]
+    assert firewall.requests == 6
+    assert len(connections) == 2  # max_concurrency
+
+
+def test_get_many_no_types(firewall, serve, ssl_context, connections):
+    client = make_client(serve(firewall), ssl_context)
+
+    async def main():
+        async with client:
+            return await client.get_many([])
+
+    assert asyncio.run(main()) == {}
+    assert firewall.requests == 0
+
+
+def test_post_body_and_keep_alive(firewall, serve, ssl_context, connections):
+    client = make_client(serve(firewall), ssl_context, post_threshold=256)
+
+    async def main():
+        async with client:
+            await client.add("IPHost", {"Name": "a" * 300})  # sent as a POST
+            return await client.get("IPHost")
+
+    hosts = asyncio.run(main())
+
+    assert hosts[-1].data["Name"] == "a" * 300
+    assert len(connections) == 1
+    assert client._idle == []  # closed
+
+
+def test_reconnect_after_server_closes(
+    firewall, serve, ssl_context, connections, monkeypatch
+):
+    # the server drops connections idle for longer than this
+    monkeypatch.setattr("sophosapi.mock_server._Handler.timeout", 0.1)
+    client = make_client(serve(firewall), ssl_context)
+
+    async def main():
+        async with client:
+            await client.get("Zone")
+            time.sleep(0.3)  # without running the loop, so it is not seen
+            return await client.get("Zone")
+
+    (zone,) = asyncio.run(main())
+
+    assert zone.data["Name"] == "LAN"
+    assert len(connections) == 2
+    assert firewall.requests == 2
+
+
+def test_write_not_resent_after_reset(
+    firewall, serve, ssl_context, connections, monkeypatch
+):
+    monkeypatch.setattr("sophosapi.mock_server._Handler.timeout", 0.1)
+    client = make_client(serve(firewall), ssl_context)
+
+    async def main():
+        async with client:
+            await client.get("Zone")
+            time.sleep(0.3)
+            await client.add("Zone", {"Name": "DMZ"})
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(main())
+    assert len(connections) == 1
+    assert [z["Name"] for z in firewall.entities("Zone")] == ["LAN"]
@@ -0,0 +1,124 @@
+import threading
+import time
+
+from sophosapi.api_factory import Filter
+from sophosapi.cache import ResponseCache
+from sophosapi.client import Client
+from sophosapi.response import Response
+
+
+class CountingLoader:
+    def __init__(self):
+        self.calls = 0
+        self.loaded = threading.Event()
+
+    def __call__(self):
+        self.calls += 1
+        self.loaded.set()
+        return [self.calls]
+
+
+def test_hit_miss_and_ttl():
+    cache = ResponseCache(ttl=60.0, ttls={"IPHost": 0.0})
+    loader = CountingLoader()
+
+    assert cache.get("zones", "Zone", loader) == [1]
+    assert cache.get("zones", "Zone", loader) == [1]
+    assert loader.calls == 1
+
+    cache.get("hosts", "IPHost", loader)
+    time.sleep(0.01)
+    cache.get("hosts", "IPHost", loader)  # expired straight away
+    assert loader.calls == 3
+
+    assert cache.stats.hits == 1
+    assert cache.stats.misses == 3
+
+
+def test_lru_eviction():
+    cache = ResponseCache(maxsize=2)
+    loader = CountingLoader()
+
+    cache.get("a", "Zone", loader)
+    cache.get("b", "Zone", loader)
+    cache.get("a", "Zone", loader)  # b is now the least recently used
+    cache.get("c", "Zone", loader)
+    assert cache.stats.evictions == 1
+
+    cache.get("a", "Zone", loader)
+    assert loader.calls == 3
+    cache.get("b", "Zone", loader)
+    assert loader.calls == 4
+
+
+def test_invalidate_is_case_insensitive():
+    cache = ResponseCache()
+    loader = CountingLoader()
+
+    cache.get("zones", "Zone", loader)
+    cache.invalidate("zone")
+    cache.get("zones", "Zone", loader)
+    assert loader.calls == 2
+
+
+def test_refresh_ahead_for_hot_entries():
+    cache = ResponseCache(ttl=0.2, refresh_ahead=0.0, hot_threshold=2)
+    loader = CountingLoader()
+
+    cache.get("zones", "Zone", loader)
+    loader.loaded.clear()
+    cache.get("zones", "Zone", loader)
+    cache.get("zones", "Zone", loader)  # second hit: refreshed in background
+
+    assert loader.loaded.wait(1.0)
+    for _ in range(100):
+        if cache.stats.refreshes:
+            break
+        time.sleep(0.01)
+    assert cache.stats.refreshes == 1
+    assert cache.get("zones", "Zone", loader) == [2]
+
+
+def test_client_writes_invalidate():
+    cache = ResponseCache()
+    client = Client(username="u", password="p", server="x", cache=cache)
+    sent = []
+
+    def fake_api_call(request):
+        sent.append(request)
+        replies = "".join(
+            f'<Zone transactionid="{t}"><Status code="200" /></Zone>'
+            for t in request.transactions
+        )
+        return f"<Response>{replies}</Response>".encode()
+
+    client._make_api_call = fake_api_call
+
+    client.get_zones()
+    client.get("Zone")
+    client.get_zones()
+    assert len(sent) == 2
+
+    client.set_zone({"Name": "LAN"})
+    client.get_zones()
+    assert len(sent) == 4
+    assert cache.stats.invalidations == 1
+
+    criteria = [Filter.LIKE.on("IPAddress", "10.0.")]
+    client.get_filter("Zone", criteria=criteria)
+    client.get_filter("Zone", criteria=criteria)
+    assert len(sent) == 5
+
+
+def test_hits_share_responses():
+    cache = ResponseCache()
+
+    def loader():
+        return [Response.from_values("get_1", 200, {"Name": "LAN"})]
+
+    first = cache.get("zones", "Zone", loader)
+    first.append(None)
+    second = cache.get("zones", "Zone", loader)
+
+    assert len(second) == 1  # the list is copied
+    assert second[0] is first[0]  # but not the Responses
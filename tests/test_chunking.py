@@ -0,0 +1,89 @@
+import urllib.parse
+
+from defusedxml import ElementTree as ET
+
+from sophosapi.chunking import ChunkSizer
+from sophosapi.chunking import iter_chunks
+from sophosapi.client import Client
+from sophosapi.request import Request
+
+
+def make_request(n):
+    request = Request(apiversion="1805.2")
+    request.get("Zone")
+    for i in range(n):
+        request.add("IPHost", {"Name": f"host{i}", "IPAddress": "1.1.1.1"})
+    return request
+
+
+def test_sizer_targets_latency():
+    sizer = ChunkSizer(
+        max_entities=1000, target_latency=1.0, initial_entities=10
+    )
+    assert sizer.size == 10
+
+    sizer.observe(10, 0.1)  # 10ms per entity
+    assert sizer.size == 100
+
+    sizer.observe(100, 100.0)  # much slower, clamped to at least 1
+    assert 1 <= sizer.size < 100
+
+    sizer = ChunkSizer(max_entities=20, target_latency=1.0)
+    sizer.observe(10, 0.001)
+    assert sizer.size == 20
+
+
+def test_iter_chunks_respects_limits():
+    request = make_request(25)
+    operations = request.operations()
+    assert len(operations) == 26
+
+    sizer = ChunkSizer(
+        max_entities=10, target_latency=1.0, initial_entities=10
+    )
+    chunks = list(iter_chunks(operations, sizer, max_bytes=10**6))
+    assert [len(c) for c in chunks] == [10, 10, 6]
+    assert [op for chunk in chunks for op in chunk] == operations
+
+    one_op = len(operations[1].xml)
+    chunks = list(iter_chunks(operations, sizer, max_bytes=one_op * 3))
+    assert all(len(c) <= 3 for c in chunks)
+
+
+def test_subrequest_keeps_containers():
+    request = make_request(2)
+    sub = request.subrequest(request.operations()[1:])
+
+    assert sub.apiversion == "1805.2"
+    xml = str(sub)
+    assert "<Get />" in xml
+    assert xml.count("<IPHost") == 2
+    assert '<Set operation="add"><IPHost' in xml
+
+
+def test_send_chunked_merges_responses_in_order():
+    client = Client(username="u", password="p", server="127.0.0.1")
+    sent = []
+
+    def fake_request(method, url, body=None, headers=None, resend=False):
+        reqxml = urllib.parse.unquote(url.split("reqxml=", 1)[1])
+        sent.append(reqxml)
+        replies = "".join(
+            f'<IPHost transactionid="set_IPHost">'
+            f'<Status code="200">{e.find("Name").text}</Status>'
+            f"</IPHost>"
+            for e in ET.fromstring(reqxml).iter("IPHost")
+        )
+        return f"<Response>{replies}</Response>".encode()
+
+    client.post_threshold = None
+    client.pool.request = fake_request
+    request = make_request(0)
+    for i in range(12):
+        request.add("IPHost", {"Name": f"host{i}"})
+
+    responses = client.send_chunked(request, max_entities=5, max_in_flight=2)
+
+    assert len(sent) >= 3
+    messages = [r.data["message"] for r in responses]
+    assert messages == [f"host{i}" for i in range(12)]
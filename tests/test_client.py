@@ -0,0 +1,145 @@
+import io
+import urllib.parse
+
+import pytest
+from defusedxml import ElementTree as ET
+
+from sophosapi.client import API_PATH
+from sophosapi.client import Client
+from sophosapi.request import Request
+
+
+@pytest.fixture
+def client():
+    client = Client(
+        username="user",
+        password="pass",
+        server="127.0.0.1",
+        post_threshold=64,
+    )
+    yield client
+    client.close()
+
+
+def test_small_request_in_query_string(client):
+    reqxml = b"<Request><Get><Zone /></Get></Request>"
+    method, url, body, headers = client._build_http_request(reqxml)
+
+    assert method == "GET"
+    assert body is None
+    assert url == f"{API_PATH}?reqxml={urllib.parse.quote(reqxml)}"
+
+
+def test_large_request_as_post_body(client):
+    reqxml = b"<Request>" + b"<Get><Zone /></Get>" * 10 + b"</Request>"
+    method, url, body, headers = client._build_http_request(reqxml)
+
+    assert method == "POST"
+    assert url == API_PATH
+    body_bytes = b"".join(body)
+    assert len(body_bytes) == int(headers["Content-Length"])
+    assert reqxml in body_bytes
+
+    boundary = headers["Content-Type"].split("boundary=")[1]
+    assert body_bytes.startswith(f"--{boundary}\r\n".encode())
+    assert body_bytes.endswith(f"\r\n--{boundary}--\r\n".encode())
+    assert b'name="reqxml"' in body_bytes
+
+
+def test_iter_parse_response(client):
+    body = (
+        b"<Response>"
+        b"<Login><status>Authentication Successful</status></Login>"
+        b'<Zone transactionid="get_Zones"><Name>LAN</Name></Zone>'
+        b'<Zone transactionid="get_Zones"><Name>WAN</Name></Zone>'
+        b"</Response>"
+    )
+    responses = list(client._iter_parse_response(io.BytesIO(body)))
+
+    assert [r.data for r in responses] == [{"Name": "LAN"}, {"Name": "WAN"}]
+    assert all(r.status_code == 200 for r in responses)
+
+
+def test_responses_linked_to_transactions(client):
+    request = Request()
+    request.add("IPHost", {"Name": "host1"})
+    request.add("IPHost", {"Name": "host2"})
+    first, second = request.transactions
+
+    body = (
+        "<Response>"
+        f'<IPHost transactionid="{second}">'
+        '<Status code="502">Operation failed</Status></IPHost>'
+        f'<IPHost transactionid="{first}">'
+        '<Status code="200">Configuration applied successfully.</Status>'
+        "</IPHost>"
+        "</Response>"
+    )
+    responses = client._parse_response(ET.fromstring(body), request)
+
+    assert responses[0].transaction.data == {"Name": "host2"}
+    assert responses[0].status_code == 502
+    assert responses[1].transaction.data == {"Name": "host1"}
+
+
+def fake_get_api_call(sent, counts):
+    """A _make_api_call answering gets with `counts` entities per type."""
+
+    def fake_api_call(request):
+        sent.append(request)
+        replies = "".join(
+            f'<{t.entity} transactionid="{tid}"><Name>{t.entity}{i}</Name>'
+            f"</{t.entity}>"
+            for tid, t in request.transactions.items()
+            for i in range(counts[t.entity])
+        )
+        return f"<Response>{replies}</Response>".encode()
+
+    return fake_api_call
+
+
+@pytest.mark.parametrize("strategy", ["batch", "parallel"])
+def test_get_many(client, strategy):
+    sent = []
+    counts = {"Zone": 2, "IPHost": 3}
+    client._make_api_call = fake_get_api_call(sent, counts)
+
+    grouped = client.get_many(["Zone", "IPHost", "Zone"], strategy=strategy)
+
+    assert list(grouped) == ["Zone", "IPHost"]
+    assert [r.data["Name"] for r in grouped["IPHost"]] == [
+        "IPHost0",
+        "IPHost1",
+        "IPHost2",
+    ]
+    assert len(grouped["Zone"]) == 2
+    assert len(sent) == (1 if strategy == "batch" else 2)
+
+
+def test_get_many_auto(client):
+    sent = []
+    counts = {"Zone": 2, "IPHost": 1000, "IPHostGroup": 1}
+    client._make_api_call = fake_get_api_call(sent, counts)
+
+    client.get_many(["Zone", "IPHost"])  # nothing known yet, batched
+    client.get_many(["Zone", "IPHost"])  # IPHost is large, in parallel
+    assert len(sent) == 3
+
+    # the small types are still batched together
+    sent.clear()
+    grouped = client.get_many(["Zone", "IPHost", "IPHostGroup"])
+    batches = [[t.entity for t in r.transactions.values()] for r in sent]
+    assert sorted(batches) == [["IPHost"], ["Zone", "IPHostGroup"]]
+    assert len(grouped["IPHost"]) == 1000
+
+    with pytest.raises(ValueError):
+        client.get_many(["Zone"], strategy="fastest")
+
+
+@pytest.mark.parametrize("strategy", ["auto", "batch", "parallel"])
+def test_get_many_no_types(client, strategy):
+    sent = []
+    client._make_api_call = fake_get_api_call(sent, {})
+
+    assert client.get_many([], strategy=strategy) == {}
+    assert sent == []
@@ -0,0 +1,141 @@
+import time
+import urllib.parse
+
+import pytest
+
+from sophosapi.client import API_PATH
+from sophosapi.connection_pool import ConnectionPool
+from sophosapi.connection_pool import PoolStats
+from sophosapi.mock_server import MockFirewall
+from sophosapi.request import Request
+
+LOGIN = "<Login><Username>u</Username><Password>p</Password></Login>"
+
+
+def url_of(request):
+    reqxml = urllib.parse.quote(request.to_bytes(login=LOGIN))
+    return f"{API_PATH}?reqxml={reqxml}"
+
+
+GET = Request()
+GET.get("Zone")
+ADD = Request()
+ADD.add("Zone", {"Name": "z"})
+
+
+@pytest.fixture
+def firewall():
+    return MockFirewall(username="u", password="p")
+
+
+@pytest.fixture
+def make_pool(firewall, serve, ssl_context):
+    server = serve(firewall)
+    pools = []
+
+    def make_pool(**kwargs):
+        pool = ConnectionPool(
+            "127.0.0.1", server.port, ssl_context=ssl_context, **kwargs
+        )
+        pools.append(pool)
+        return pool
+
+    yield make_pool
+    for pool in pools:
+        pool.close()
+
+
+@pytest.fixture
+def server_drops_idle(monkeypatch):
+    """Make the server close connections idle for 0.1 seconds, and return a
+    function waiting until it has.
+    """
+    monkeypatch.setattr("sophosapi.mock_server._Handler.timeout", 0.1)
+    return lambda: time.sleep(0.3)
+
+
+def test_reuse(make_pool, firewall):
+    pool = make_pool()
+    for _ in range(3):
+        assert b"<Zone" in pool.request("GET", url_of(GET))
+
+    assert firewall.requests == 3
+    assert pool.stats.as_dict() == {
+        "requests": 3,
+        "connections_created": 1,
+        "connections_reused": 2,
+        "reconnects": 0,
+        "evictions": 0,
+        "reuse_rate": 2 / 3,
+    }
+
+
+def test_idle_eviction(make_pool):
+    pool = make_pool(idle_timeout=0)
+    pool.request("GET", url_of(GET))
+    time.sleep(0.01)
+    pool.request("GET", url_of(GET))
+
+    assert pool.stats.connections_created == 2
+    assert pool.stats.evictions == 1
+    assert pool.stats.reuse_rate == 0
+
+
+def test_maxsize(make_pool):
+    pool = make_pool(maxsize=1)
+    with pool.urlopen("GET", url_of(GET)) as first:
+        with pool.urlopen("GET", url_of(GET)) as second:
+            first.read(), second.read()
+
+    assert len(pool._idle) == 1
+
+
+def test_closed_connection_not_reused(make_pool, firewall, server_drops_idle):
+    pool = make_pool()
+    pool.request("GET", url_of(GET))
+    server_drops_idle()
+    pool.request("GET", url_of(ADD))  # a write, so not resent on a reset
+
+    assert [z["Name"] for z in firewall.entities("Zone")] == ["z"]
+    assert pool.stats.evictions == 1
+    assert pool.stats.reconnects == 0
+
+
+@pytest.fixture
+def reset_on_reuse(monkeypatch, server_drops_idle):
+    """Make the server drop idle connections without the pool noticing, so
+    that the next request on one is reset. Returns a function waiting until
+    it has.
+    """
+    monkeypatch.setattr(
+        "sophosapi.connection_pool._is_dropped", lambda conn: False
+    )
+    return server_drops_idle
+
+
+def test_reconnect_on_reset(make_pool, firewall, reset_on_reuse):
+    pool = make_pool()
+    pool.request("GET", url_of(GET))
+    reset_on_reuse()
+    reply = pool.request("GET", url_of(GET), resend=True)
+
+    assert b"<Zone" in reply
+    assert pool.stats.reconnects == 1
+    assert firewall.requests == 2
+
+
+def test_write_not_resent_on_reset(make_pool, firewall, reset_on_reuse):
+    pool = make_pool()
+    pool.request("GET", url_of(GET))
+    reset_on_reuse()
+
+    with pytest.raises(ConnectionError):
+        pool.request("GET", url_of(ADD))
+    assert pool.stats.reconnects == 0
+    assert firewall.entities("Zone") == []
+
+
+def test_pool_stats():
+    stats = PoolStats()
+    assert stats.reuse_rate == 0
+    assert "reconnects" in repr(stats)
@@ -0,0 +1,123 @@
+import io
+
+import pytest
+from defusedxml import ElementTree as ET
+from defusedxml.common import EntitiesForbidden
+
+from sophosapi.client import Client
+from sophosapi.expat_parser import parse_responses
+from sophosapi.expat_parser import ResponseParser
+from sophosapi.request import Request
+from sophosapi.response import Response
+
+BODY = (
+    b'<?xml version="1.0" encoding="UTF-8"?>\n'
+    b"<Response APIVersion='1905.1' IPS_CAT_VER='1'>\n"
+    b"  <Login><status>Authentication Successful</status></Login>\n"
+    b'  <IPHost transactionid="get_IPHosts_1">\n'
+    b"    <Name>host &amp; co</Name>\n"
+    b"    <HostGroupList><HostGroup>g1</HostGroup></HostGroupList>\n"
+    b"    <Empty/>\n"
+    b"  </IPHost>\n"
+    b'  <IPHost transactionid="get_IPHosts_1">\n'
+    b'    <Status code="529">No. of records Zero.</Status>\n'
+    b"  </IPHost>\n"
+    b'  <Zone transactionid="get_Zone_1" />\n'
+    b'  <IPHost transactionid="set_IPHost_2">\n'
+    b'    <Status code="200">Configuration applied successfully.</Status>\n'
+    b"  </IPHost>\n"
+    b'  <Status code="534">Operation not allowed.</Status>\n'
+    b"</Response>"
+)
+
+
+def as_tuples(responses):
+    return [(r.transactionid, r.status_code, r.data) for r in responses]
+
+
+def test_same_as_element_tree():
+    expected = [(e.tag, Response(e)) for e in ET.fromstring(BODY)]
+    parsed = list(parse_responses([BODY]))
+
+    assert [tag for tag, _ in parsed] == [tag for tag, _ in expected]
+    assert as_tuples(r for _, r in parsed) == as_tuples(r for _, r in expected)
+
+
+def test_text_after_a_child_ignored():
+    body = (
+        b"<Response>"
+        b"<Login><status>Authentication Successful</status></Login>"
+        b'<LocalServiceACL transactionid="get_LocalServiceACLs_1">'
+        b"<Hosts><Host>a<b/>tail</Host><DstHost><b/>t</DstHost></Hosts>"
+        b"</LocalServiceACL>"
+        b'<FirewallRule transactionid="get_FirewallRules_2">'
+        b"<HTTPBasedPolicy><AccessPaths><AccessPath>"
+        b"<path>/<b/>x</path><backend><b/>y</backend>"
+        b"</AccessPath></AccessPaths></HTTPBasedPolicy>"
+        b"</FirewallRule>"
+        b'<IPHost transactionid="set_IPHost_3">'
+        b'<Status code="200">applied<b/>tail</Status></IPHost>'
+        b'<Status code="534">not<b/> allowed</Status>'
+        b"</Response>"
+    )
+    expected = [Response(e) for e in ET.fromstring(body)]
+    parsed = [r for _, r in parse_responses([body])]
+
+    assert as_tuples(parsed) == as_tuples(expected)
+
+
+def test_login_failure():
+    body = b"<Response><Login><status>Authentication Failure</status>"
+    ((tag, response),) = parse_responses([body, b"</Login></Response>"])
+
+    assert tag == "Login"
+    assert response.status_code == 401
+
+
+def test_responses_returned_as_they_complete():
+    parser = ResponseParser()
+    split = BODY.index(b"  <IPHost", BODY.index(b"get_IPHosts_1") + 1)
+
+    first = parser.feed(BODY[:split])
+    rest = parser.feed(BODY[split:]) + parser.close()
+
+    assert [tag for tag, _ in first] == ["Login", "IPHost"]
+    assert len(rest) == 4
+
+
+def test_entities_forbidden():
+    body = (
+        b'<!DOCTYPE Response [<!ENTITY a "aaaa">]>'
+        b'<Response><Zone transactionid="get_1">&a;</Zone></Response>'
+    )
+    with pytest.raises(EntitiesForbidden):
+        list(parse_responses([body]))
+
+
+def test_malformed_reply():
+    with pytest.raises(ET.ParseError):
+        list(parse_responses([b"<Response><Zone></Response>"]))
+
+
+@pytest.mark.parametrize("parser", ["etree", "expat"])
+def test_client_parsers(parser):
+    client = Client(
+        username="user", password="pass", server="127.0.0.1", parser=parser
+    )
+    request = Request()
+    request.get("IPHost")
+    request.set("IPHost", {"Name": "h"})
+
+    responses = client._parse_response_body(BODY, request)
+    streamed = list(client._iter_parse_response(io.BytesIO(BODY), request))
+    client.close()
+
+    assert as_tuples(responses) == as_tuples(streamed)
+    assert len(responses) == 5  # without the login
+    assert responses[0].transaction.entity == "IPHost"
+    assert responses[3].transaction.operation == "set"
+
+
+def test_unknown_parser():
+    with pytest.raises(ValueError):
+        Client(username="u", password="p", server="s", parser="lxml")
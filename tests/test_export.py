@@ -0,0 +1,100 @@
+import gzip
+import json
+
+import pytest
+
+from sophosapi.export import export
+from sophosapi.export import iter_snapshot
+from sophosapi.export import load_manifest
+from sophosapi.mock_server import MockFirewall
+
+
+@pytest.fixture
+def firewall():
+    firewall = MockFirewall(username="u", password="p")
+    firewall.populate("IPHost", [{"Name": f"h{i}"} for i in range(50)])
+    firewall.populate("Zone", [{"Name": "LAN", "Type": "LAN"}])
+    return firewall
+
+
+@pytest.fixture
+def client(firewall, server_client):
+    return server_client(firewall)
+
+
+def test_export(client, tmp_path):
+    manifest = export(
+        client, ["IPHost", "Zone", "FQDNHost"], str(tmp_path), max_workers=2
+    )
+
+    assert manifest == load_manifest(str(tmp_path))
+    entities = manifest["entities"]
+    assert {k: v["records"] for k, v in entities.items()} == {
+        "IPHost": 50,
+        "Zone": 1,
+        "FQDNHost": 0,
+    }
+    assert list(iter_snapshot(str(tmp_path), "Zone")) == [
+        {"Name": "LAN", "Type": "LAN"}
+    ]
+    with gzip.open(tmp_path / "IPHost.jsonl.gz") as f:
+        assert json.loads(f.readline()) == {"Name": "h0"}
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "FQDNHost.jsonl.gz",
+        "IPHost.jsonl.gz",
+        "Zone.jsonl.gz",
+        "manifest.json",
+    ]
+
+
+def test_failed_type(client, firewall, tmp_path, monkeypatch):
+    handle = firewall.handle
+
+    def failing_handle(reqxml):
+        if b"Broken" in reqxml:
+            return b"<Response><Broken"  # cut short
+        return handle(reqxml)
+
+    monkeypatch.setattr(firewall, "handle", failing_handle)
+    manifest = export(client, ["Zone", "Broken"], str(tmp_path))
+
+    broken = manifest["entities"]["Broken"]
+    assert broken["error"].startswith("ParseError")
+    assert not (tmp_path / "Broken.jsonl.gz").exists()
+    assert manifest["entities"]["Zone"]["error"] is None
+    with pytest.raises(ValueError):
+        list(iter_snapshot(str(tmp_path), "Broken"))
+
+
+def test_error_status(client, firewall, tmp_path):
+    firewall.error_rate = 1.0  # answers each get with an error Status
+    manifest = export(client, ["IPHost"], str(tmp_path))
+
+    result = manifest["entities"]["IPHost"]
+    assert result["error"].startswith("ValueError: IPHost: Operation")
+    assert result["records"] == 0
+    assert not (tmp_path / "IPHost.jsonl.gz").exists()
+
+
+def test_file_not_created(client, tmp_path, monkeypatch):
+    open_gzip = gzip.open
+
+    def failing_open(filename, *args, **kwargs):
+        if "Zone" in str(filename):
+            raise PermissionError("denied")
+        return open_gzip(filename, *args, **kwargs)
+
+    monkeypatch.setattr("sophosapi.export.gzip.open", failing_open)
+    manifest = export(client, ["Zone", "IPHost"], str(tmp_path))
+
+    assert manifest["entities"]["Zone"]["error"] == "PermissionError: denied"
+    assert manifest["entities"]["IPHost"]["records"] == 50
+
+
+def test_snapshot_hash_checked(client, tmp_path):
+    export(client, ["Zone"], str(tmp_path))
+    with gzip.open(tmp_path / "Zone.jsonl.gz", "wb") as f:
+        f.write(b'{"Name": "WAN"}\n')
+
+    with pytest.raises(ValueError):
+        list(iter_snapshot(str(tmp_path), "Zone"))
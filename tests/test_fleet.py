@@ -0,0 +1,56 @@
+import pytest
+
+from sophosapi.client import Client
+from sophosapi.fleet import FleetClient
+from sophosapi.request import Request
+
+
+class FakeClient(Client):
+    def send(self, request):
+        if self.server == "down":
+            raise ConnectionRefusedError("down")
+        return [self.server]
+
+
+def make_client(server):
+    return FakeClient(username="user", password="pass", server=server)
+
+
+def test_send_isolates_failures():
+    fleet = FleetClient(
+        [make_client("fw1"), make_client("down"), make_client("fw2")],
+        max_workers=2,
+    )
+    results = fleet.send(Request())
+
+    assert list(results) == ["fw1:4444", "down:4444", "fw2:4444"]
+    assert results["fw1:4444"].ok
+    assert results["fw1:4444"].responses == ["fw1"]
+    assert not results["down:4444"].ok
+    assert isinstance(results["down:4444"].error, ConnectionRefusedError)
+    assert results["fw2:4444"].responses == ["fw2"]
+    assert all(r.elapsed >= 0 for r in results.values())
+
+
+def test_named_specs():
+    fleet = FleetClient(
+        [{"name": "branch", "username": "u", "password": "p", "server": "x"}]
+    )
+    assert list(fleet.clients) == ["branch"]
+
+    with pytest.raises(ValueError):
+        FleetClient([make_client("fw1"), make_client("fw1")])
+
+
+def test_login_serialised_without_changing_request():
+    client = make_client("fw1")
+    request = Request(apiversion="1805.2")
+    request.get("Zone")
+    before = str(request)
+
+    reqxml = client._serialize_request(request)
+    client._serialize_request(request)
+
+    assert str(request) == before
+    assert reqxml.count(b"<Login>") == 1
+    assert reqxml.startswith(b'<Request APIVersion="1805.2"><Login>')
@@ -0,0 +1,113 @@
+import pytest
+
+from sophosapi.client import Client
+from sophosapi.instrumentation import CallStats
+from sophosapi.mock_server import MockFirewall
+from sophosapi.request import Request
+
+
+def make_client(parser, calls, reply):
+    client = Client(
+        username="u",
+        password="p",
+        server="127.0.0.1",
+        parser=parser,
+        on_call=calls.append,
+    )
+
+    def fake_request(method, url, body=None, headers=None, resend=False):
+        if isinstance(reply, Exception):
+            raise reply
+        return reply
+
+    client.pool.request = fake_request
+    return client
+
+
+@pytest.mark.parametrize("parser", ["etree", "expat"])
+def test_call_stats(parser):
+    request = Request()
+    request.get("IPHost")
+    request.add("Zone", {"Name": "z"})
+    get, add = request.transactions
+    reply = (
+        "<Response>"
+        "<Login><status>Authentication Successful</status></Login>"
+        f'<IPHost transactionid="{get}"><Name>a</Name></IPHost>'
+        f'<IPHost transactionid="{get}"><Name>b</Name></IPHost>'
+        f'<Zone transactionid="{add}">'
+        '<Status code="502">Operation failed.</Status></Zone>'
+        "</Response>"
+    ).encode()
+    calls = []
+    client = make_client(parser, calls, reply)
+
+    client.send(request)
+
+    (stats,) = calls
+    assert stats.transactions == 2
+    assert stats.method == "GET"
+    assert stats.request_bytes == len(client._serialize_request(request))
+    assert stats.response_bytes == len(reply)
+    assert stats.entities == {"IPHost": 2, "Zone": 1}
+    assert stats.status_codes == {200: 2, 502: 1}
+    assert stats.error is None
+    assert stats.total_seconds >= stats.parse_seconds > 0
+    assert (stats.convert_seconds > 0) == (parser == "etree")
+
+
+def test_call_stats_on_error():
+    calls = []
+    client = make_client("etree", calls, ConnectionResetError())
+
+    with pytest.raises(ConnectionResetError):
+        client.get("Zone")
+
+    (stats,) = calls
+    assert isinstance(stats.error, ConnectionResetError)
+    assert stats.response_bytes == 0
+
+
+@pytest.mark.parametrize("parser", ["etree", "expat"])
+def test_iter_send_stats(parser, server_client):
+    firewall = MockFirewall(username="u", password="p")
+    firewall.populate("IPHost", [{"Name": f"h{i}"} for i in range(20)])
+    calls = []
+    client = server_client(firewall, parser=parser, on_call=calls.append)
+    request = Request()
+    request.get("IPHost")
+
+    names = [r.data["Name"] for r in client.iter_send(request)]
+
+    (stats,) = calls
+    assert len(names) == 20
+    assert stats.entities == {"IPHost": 20}
+    assert stats.response_bytes > 20 * len("<IPHost><Name>h0</Name>")
+    assert stats.network_seconds > 0
+    assert stats.parse_seconds > 0
+    assert stats.error is None
+
+    responses = client.iter_send(request)
+    next(responses)
+    responses.close()  # stopped after one Response
+    assert len(calls) == 2
+    assert calls[1].entities == {"IPHost": 1}
+    assert calls[1].error is None
+
+
+def test_send_chunked_stats():
+    calls = []
+    client = make_client("expat", calls, b"<Response />")
+    request = Request()
+    for i in range(12):
+        request.add("IPHost", {"Name": f"host{i}"})
+
+    client.send_chunked(request, max_entities=5)
+
+    assert [stats.transactions for stats in calls] == [5, 5, 2]
+    assert all(stats.request_bytes > 0 for stats in calls)
+
+
+def test_no_stats_without_hook():
+    assert Client(username="u", password="p", server="s").on_call is None
+    assert "entities" in repr(CallStats())
@@ -0,0 +1,111 @@
+import pytest
+from defusedxml import ElementTree as ET
+
+from sophosapi.api_factory import Filter
+from sophosapi.client import Client
+from sophosapi.mock_server import MockFirewall
+from sophosapi.request import Request
+
+LOGIN = "<Login><Username>u</Username><Password>p</Password></Login>"
+
+
+@pytest.fixture
+def firewall():
+    firewall = MockFirewall(username="u", password="p")
+    firewall.populate(
+        "IPHost",
+        [
+            {"Name": "web1", "IPAddress": "10.0.0.1"},
+            {"Name": "web2", "IPAddress": "10.0.1.1"},
+            {"Name": "db1", "IPAddress": "10.0.0.2"},
+        ],
+    )
+    return firewall
+
+
+def send(firewall, request):
+    reply = firewall.handle(request.to_bytes(login=LOGIN))
+    return list(ET.fromstring(reply))
+
+
+def test_get_and_filter(firewall):
+    request = Request()
+    request.get("IPHost")
+    request.get_filter(
+        "IPHost",
+        Filter.LIKE,
+        "web",
+        criteria=[Filter.LIKE.on("IPAddress", "10.0.0.")],
+    )
+    request.get("Zone")
+    login, *replies = send(firewall, request)
+
+    assert login.findtext("status") == "Authentication Successful"
+    assert [e.findtext("Name") for e in replies[:4]] == [
+        "web1",
+        "web2",
+        "db1",
+        "web1",
+    ]
+    assert replies[4].get("transactionid") == "get_Zones_3"
+    assert replies[4].find("Status").get("code") == "529"
+
+
+def test_set_and_remove(firewall):
+    request = Request()
+    request.add("IPHost", {"Name": "web1"})
+    request.add("IPHost", {"Name": "new", "IPAddress": "10.0.0.3"})
+    request.update("IPHost", {"Name": "missing"})
+    request.remove("IPHost", "db1")
+    _, *replies = send(firewall, request)
+
+    codes = [e.find("Status").get("code") for e in replies]
+    assert codes == ["502", "200", "502", "200"]
+    assert [d["Name"] for d in firewall.entities("iphost")] == [
+        "web1",
+        "web2",
+        "new",
+    ]
+
+
+def test_authentication_failure(firewall):
+    request = Request()
+    request.get("IPHost")
+    reply = firewall.handle(request.to_bytes(login=LOGIN.replace("p<", "x<")))
+
+    (login,) = ET.fromstring(reply)
+    assert login.findtext("status") == "Authentication Failure"
+
+
+def test_error_rate(firewall):
+    firewall.error_rate = 1.0
+    request = Request()
+    request.get("IPHost")
+    _, reply = send(firewall, request)
+
+    assert reply.find("Status").get("code") == "500"
+
+
+def test_client_against_server(firewall, serve, ssl_context):
+    server = serve(firewall)
+    client = Client(
+        username="u",
+        password="p",
+        is_encrypted=True,
+        server="127.0.0.1",
+        port=server.port,
+        ssl_context=ssl_context,
+        post_threshold=256,
+    )
+    hosts = client.get("IPHost")
+    client.add("IPHost", {"Name": "a" * 300})  # sent as a POST
+    names = [r.data["Name"] for r in client.get("IPHost")]
+    client.close()
+
+    assert [r.data["IPAddress"] for r in hosts] == [
+        "10.0.0.1",
+        "10.0.1.1",
+        "10.0.0.2",
+    ]
+    assert names[-1] == "a" * 300
+    assert firewall.requests == 3
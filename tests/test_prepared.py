@@ -0,0 +1,112 @@
+import pytest
+
+from sophosapi.api_factory import _create_element
+from sophosapi.api_factory import Filter
+from sophosapi.client import Client
+from sophosapi.prepared import Param
+from sophosapi.prepared import PreparedRequest
+from sophosapi.request import Request
+
+
+def build(name, address):
+    request = Request(apiversion="1905.1")
+    request.get_filter("IPHost", Filter.LIKE, name)
+    request.set("IPHost", {"Name": name, "IPAddress": address})
+    return request
+
+
+def test_bind_same_as_request():
+    prepared = PreparedRequest(build(Param("name"), Param("address")))
+    assert prepared.params == {"name", "address"}
+
+    for name in ("web", "a & <b>", "café"):
+        bound = prepared.bind(name=name, address="1.1.1.1")
+        expected = build(name, "1.1.1.1")
+        assert bound.to_bytes() == expected.to_bytes()
+        assert bound.to_bytes(login="<Login />") == expected.to_bytes(
+            login="<Login />"
+        )
+        assert bound.transactions == expected.transactions
+
+
+def test_bind_checks_params():
+    prepared = PreparedRequest(build(Param("name"), "1.1.1.1"))
+
+    with pytest.raises(TypeError, match="Missing"):
+        prepared.bind()
+    with pytest.raises(TypeError, match="Unknown"):
+        prepared.bind(name="a", other="b")
+    with pytest.raises(ValueError):
+        Param("not a name")
+
+
+def test_param_in_attribute():
+    def build_filter(key):
+        request = Request()
+        request.get_filter(
+            "IPHost", criteria=[Filter.LIKE.on(key, 'say "hi" <b>')]
+        )
+        return request
+
+    prepared = PreparedRequest(build_filter(Param("key")))
+
+    for key in ("Name", 'a"b', "<x> & y"):
+        bound = prepared.bind(key=key)
+        assert bound.to_bytes() == build_filter(key).to_bytes()
+
+
+def test_param_in_tag_rejected():
+    request = Request()
+    request.get(Param("entity"))
+    with pytest.raises(ValueError, match="tag or attribute name"):
+        PreparedRequest(request)
+
+    request = Request()
+    request.add("IPHost", {Param("key"): "value"})
+    with pytest.raises(ValueError, match="tag or attribute name"):
+        PreparedRequest(request)
+
+
+def test_set_login_replaces():
+    request = Request()
+    request.set_login(_create_element("Login", text="a"))
+    request.set_login(_create_element("Login", text="a"))
+
+    assert str(request).count("<Login>") == 1
+
+
+def test_client_login_serialised_once():
+    client = Client(username="u", password="p", server="127.0.0.1")
+    sent = []
+
+    def fake_request(method, url, body=None, headers=None, resend=False):
+        sent.append(url)
+        return b"<Response />"
+
+    client.pool.request = fake_request
+
+    prepared = PreparedRequest(build(Param("name"), "1.1.1.1"))
+    login = client._login_xml()
+    client.send(prepared.bind(name="a"))
+    client.send(prepared.bind(name="b"))
+
+    assert client._login_xml() is login
+    assert len(sent) == 2
+    assert "<Username>u</Username>" in login
+
+    client.password = "other"
+    assert "other" in client._login_xml()
+    client.close()
+
+
+def test_unbound_param_not_sent():
+    request = build(Param("name"), Param("address"))
+
+    with pytest.raises(ValueError, match="Unbound params: address, name"):
+        request.to_bytes()
+
+    client = Client(username="u", password="p", server="127.0.0.1")
+    client.pool.request = None  # never reached
+    with pytest.raises(ValueError, match="Unbound"):
+        client.send(request)
+    client.close()
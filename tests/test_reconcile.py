@@ -0,0 +1,101 @@
+import pytest
+
+from sophosapi.mock_server import MockFirewall
+from sophosapi.reconcile import canonical
+from sophosapi.reconcile import make_plan
+from sophosapi.reconcile import reconcile
+
+
+@pytest.fixture
+def firewall():
+    firewall = MockFirewall(username="u", password="p")
+    firewall.populate(
+        "IPHost",
+        [
+            {"Name": "h1", "IPAddress": "10.0.0.1", "Description": "x"},
+            {"Name": "h2", "IPAddress": "10.0.0.2"},
+            {"Name": "old", "IPAddress": "10.0.0.9"},
+        ],
+    )
+    firewall.populate("IPHostGroup", [{"Name": "g", "HostList": ["h2", "h1"]}])
+    return firewall
+
+
+DESIRED = {
+    "IPHostGroup": [{"Name": "g", "HostList": ["h1", "h2", "h3"]}],
+    "IPHost": [
+        {"Name": "h1", "IPAddress": "10.0.0.1"},  # Description is not given
+        {"Name": "h2", "IPAddress": "10.0.0.20"},
+        {"Name": "h3", "IPAddress": "10.0.0.3"},
+    ],
+}
+
+
+def test_canonical():
+    assert canonical("IPHostGroup", {"Name": "g", "HostList": "h1"}) == (
+        canonical("IPHostGroup", {"Name": "g", "HostList": ["h1"]})
+    )
+    assert canonical("IPHostGroup", {"HostList": ["b", "a"]}) == (
+        canonical("IPHostGroup", {"HostList": ["a", "b"]})
+    )
+
+
+def test_unchanged(firewall, connect):
+    desired = {"IPHostGroup": [{"Name": "g", "HostList": ["h1", "h2"]}]}
+    plan = make_plan(connect(firewall), desired)
+
+    assert len(plan) == 0
+    assert plan.unchanged == 1
+
+
+def test_plan(firewall, connect):
+    plan = make_plan(connect(firewall), DESIRED, prune=True)
+
+    assert [(c.operation, c.entity, c.name, c.fields) for c in plan] == [
+        ("update", "IPHost", "h2", ("IPAddress",)),
+        ("add", "IPHost", "h3", ()),
+        ("update", "IPHostGroup", "g", ("HostList",)),
+        ("remove", "IPHost", "old", ()),
+    ]
+    assert plan.unchanged == 1
+    assert str(plan).splitlines() == [
+        "~ IPHost h2 (IPAddress)",
+        "+ IPHost h3",
+        "~ IPHostGroup g (HostList)",
+        "- IPHost old",
+        "1 to add, 2 to update, 1 to remove, 1 unchanged",
+    ]
+
+
+def test_reconcile(firewall, connect):
+    sent = []
+    client = connect(firewall, sent)
+
+    plan, responses = reconcile(client, DESIRED, dry_run=True)
+    assert responses == [] and len(sent) == 1  # only the get
+
+    plan, responses = reconcile(client, DESIRED)
+    assert len(sent) == 3  # the get, and one request with the changes
+    assert [r.status_code for r in responses] == [200, 200, 200]
+    hosts = {h["Name"]: h for h in firewall.entities("IPHost")}
+    assert hosts["h2"]["IPAddress"] == "10.0.0.20"
+    assert "old" in hosts  # not pruned
+
+    plan, responses = reconcile(client, DESIRED)
+    assert len(plan) == 0 and responses == []
+
+
+def test_failed_get(firewall, connect):
+    sent = []
+    client = connect(firewall, sent)
+    firewall.error_rate = 1.0  # answers each get with an error Status
+
+    with pytest.raises(ValueError, match="Could not get IPHost"):
+        reconcile(client, DESIRED)
+    assert len(sent) == 1  # nothing was added
+    assert len(firewall.entities("IPHost")) == 3
+
+
+def test_desired_twice(firewall, connect):
+    with pytest.raises(ValueError):
+        make_plan(connect(firewall), {"IPHost": [{"Name": "a"}] * 2})
@@ -0,0 +1,129 @@
+from xml.etree.ElementTree import fromstring
+
+from sophosapi.api_factory import xml_to_json
+from sophosapi.references import ReferenceGraph
+from sophosapi.references import find_references
+from sophosapi.watcher import ChangeEvent
+
+RULE = fromstring(
+    "<FirewallRule><Name>r</Name><NetworkPolicy>"
+    "<SourceZones><Zone>LAN</Zone></SourceZones>"
+    "<SourceNetworks><Network>g</Network></SourceNetworks>"
+    "<Services><Service>HTTP</Service></Services>"
+    "<Schedule>All The Time</Schedule>"
+    "</NetworkPolicy></FirewallRule>"
+)
+WAF_RULE = fromstring(
+    "<FirewallRule><Name>waf</Name><HTTPBasedPolicy>"
+    "<AccessPaths><AccessPath><path>/</path>"
+    "<backend>web</backend><backend>web2</backend>"
+    "<allowed_networks>office</allowed_networks>"
+    "</AccessPath></AccessPaths>"
+    "</HTTPBasedPolicy></FirewallRule>"
+)
+
+SNAPSHOT = {
+    "IPHost": [{"Name": "h1"}, {"Name": "h2"}],
+    "IPHostGroup": [{"Name": "g", "HostList": ["h1", "h2"]}],
+    "FirewallRule": [xml_to_json(RULE), xml_to_json(WAF_RULE)],
+    "NATRule": [
+        {
+            "Name": "nat",
+            "OriginalSourceNetworks": "h1",
+            "TranslatedDestination": "h2",
+            "Description": "h1",
+        }
+    ],
+    "LocalServiceACL": [
+        {"RuleName": "acl", "Hosts": ["h2"], "DstHosts": ["g"]}
+    ],
+}
+
+
+def test_find_references():
+    hosts = ("IPHost", "IPHostGroup", "FQDNHost", "FQDNHostGroup", "MACHost")
+    assert find_references(SNAPSHOT["FirewallRule"][0]) == {
+        ("Zone", "LAN"),
+        *((t, "g") for t in hosts),
+        ("Services", "HTTP"),
+        ("ServiceGroup", "HTTP"),
+        ("Schedule", "All The Time"),
+    }
+    assert find_references(SNAPSHOT["FirewallRule"][1]) == {
+        ("WebServer", "web"),
+        ("WebServer", "web2"),
+        *((t, "office") for t in hosts),
+    }
+    assert find_references({"Name": "x", "HostList": ""}) == set()
+    assert find_references({"Name": "x", "CountryList": ["MT"]}) == {
+        (None, "MT")
+    }
+
+
+def test_referrers():
+    graph = ReferenceGraph(SNAPSHOT)
+
+    assert len(graph) == 7
+    assert graph.referrers("IPHost", "h1") == {
+        ("IPHostGroup", "g"),
+        ("NATRule", "nat"),
+    }
+    assert graph.referrers("IPHost", "h2") == {
+        ("IPHostGroup", "g"),
+        ("NATRule", "nat"),
+        ("LocalServiceACL", "acl"),
+    }
+    assert graph.referrers("IPHost", "h2", ["NATRule"]) == {
+        ("NATRule", "nat")
+    }
+    assert graph.referrers("IPHostGroup", "g") == {
+        ("FirewallRule", "r"),
+        ("LocalServiceACL", "acl"),
+    }
+    assert graph.referrers("WebServer", "web") == {("FirewallRule", "waf")}
+    assert not graph.is_referenced("FirewallRule", "r")
+    assert graph.references("IPHostGroup", "g") == {
+        ("IPHost", "h1"),
+        ("IPHost", "h2"),
+    }
+
+
+def test_same_name_other_type():
+    graph = ReferenceGraph(
+        {
+            "FirewallRule": [xml_to_json(RULE)],
+            "IPHostGroup": [{"Name": "hg", "HostList": ["LAN", "HTTP"]}],
+            "CountryGroup": [{"Name": "cg", "CountryList": ["LAN"]}],
+        }
+    )
+
+    assert graph.referrers("Zone", "LAN") == {
+        ("FirewallRule", "r"),
+        ("CountryGroup", "cg"),  # the type of CountryList is not known
+    }
+    assert graph.referrers("IPHost", "LAN") == {
+        ("IPHostGroup", "hg"),
+        ("CountryGroup", "cg"),
+    }
+    assert graph.referrers("Services", "HTTP") == {("FirewallRule", "r")}
+    assert graph.referrers("IPHost", "HTTP") == {("IPHostGroup", "hg")}
+
+
+def test_incremental_updates():
+    graph = ReferenceGraph(SNAPSHOT)
+
+    graph.add("IPHostGroup", {"Name": "g", "HostList": ["h2"]})
+    assert graph.referrers("IPHost", "h1") == {("NATRule", "nat")}
+
+    graph.remove("NATRule", "nat")
+    assert not graph.is_referenced("IPHost", "h1")
+    assert ("NATRule", "nat") not in graph
+
+    graph.apply(ChangeEvent("removed", "IPHostGroup", "g", None))
+    graph.apply(
+        ChangeEvent(
+            "added", "IPHostGroup", "g2", {"Name": "g2", "HostList": ["h1"]}
+        )
+    )
+    assert graph.referrers("IPHost", "h1") == {("IPHostGroup", "g2")}
+    assert graph.referrers("IPHost", "h2") == {("LocalServiceACL", "acl")}
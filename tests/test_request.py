@@ -0,0 +1,94 @@
+import pytest
+from defusedxml import ElementTree as ET
+
+from sophosapi.api_factory import Filter
+from sophosapi.request import Request
+
+
+def test_transactionids_are_unique():
+    request = Request()
+    request.get("Zone")
+    request.get_filter("Zone", Filter.LIKE, "AN")
+    for i in range(3):
+        request.add("IPHost", {"Name": f"host{i}"})
+    request.remove("IPHost", "old")
+
+    elem = ET.fromstring(str(request))
+    ids = [
+        e.get("transactionid") for e in elem.iter() if e.get("transactionid")
+    ]
+
+    assert len(ids) == 6
+    assert len(set(ids)) == 6
+    assert set(ids) == set(request.transactions)
+
+
+def test_transaction_index():
+    request = Request()
+    request.get("Zone")
+    request.update("IPHost", {"Name": "host1"})
+    request.remove("IPHost", "host2")
+
+    transactions = list(request.transactions.values())
+    assert [(t.operation, t.entity) for t in transactions] == [
+        ("get", "Zone"),
+        ("update", "IPHost"),
+        ("remove", "IPHost"),
+    ]
+    assert transactions[0].transactionid.startswith("get")
+    assert transactions[1].data == {"Name": "host1"}
+    assert transactions[2].data == {"Name": "host2"}
+
+
+def test_subrequest_keeps_transactions():
+    request = Request()
+    request.get("Zone")
+    request.set("IPHost", {"Name": "host1"})
+
+    sub = request.subrequest(request.operations()[1:])
+    assert list(sub.transactions.values()) == [
+        list(request.transactions.values())[1]
+    ]
+
+
+def test_get_filter_criteria():
+    request = Request()
+    request.get_filter("IPHost", Filter.EQUAL, "10.0.0.1", key="IPAddress")
+    request.get_filter(
+        "IPHost",
+        Filter.LIKE,
+        "web",
+        criteria=[Filter.EXCEPT.on("HostType", "Network")],
+    )
+    request.get_filter("IPHost", criteria=[Filter.LIKE.on("Name", "db")])
+
+    gets = ET.fromstring(str(request)).find("Get")
+    keys = [
+        [(k.get("name"), k.get("criteria"), k.text) for k in e.find("Filter")]
+        for e in gets
+    ]
+    assert keys == [
+        [("IPAddress", "=", "10.0.0.1")],
+        [("Name", "like", "web"), ("HostType", "!=", "Network")],
+        [("Name", "like", "db")],
+    ]
+    assert list(request.transactions)[1] == "get_IPHost_LIKE_EXCEPT_2"
+
+
+def test_get_filter_needs_criteria():
+    request = Request()
+    with pytest.raises(TypeError):
+        request.get_filter("IPHost")
+    with pytest.raises(TypeError):
+        request.get_filter("IPHost", Filter.LIKE)
+
+
+def test_request_element():
+    request = Request(apiversion="1905.1")
+    request.add("IPHost", {"Name": "h"})
+
+    elem = request.request
+    assert elem.get("APIVersion") == "1905.1"
+    assert elem.find("./Set/IPHost/Name").text == "h"
+    elem.clear()  # a copy
+    assert request.request.find("./Set/IPHost") is not None
@@ -0,0 +1,119 @@
+import pytest
+from defusedxml import ElementTree as ET
+
+from sophosapi import expat_parser
+from sophosapi.client import Client
+from sophosapi.expat_parser import parse_responses
+from sophosapi.response import LazyResponse
+from sophosapi.response import Response
+
+BODY = (
+    b'<?xml version="1.0" encoding="UTF-8"?>\n'
+    b"<Response>\n"
+    b"<Login><status>Authentication Successful</status></Login>\n"
+    b'<IPHost transactionid="get_IPHosts_1">'
+    b"<Name>h&amp;1</Name><IPAddress>1.1.1.1</IPAddress>"
+    b"<HostGroupList><HostGroup>g1</HostGroup></HostGroupList>"
+    b"</IPHost>\n"
+    b'<IPHost transactionid="get_IPHosts_1" />'
+    b'<IPHost transactionid="get_IPHosts_1"></IPHost>'
+    b'<IPHost transactionid="get_IPHosts_1">text/&gt;</IPHost>'
+    b'<LocalServiceACL transactionid="get_LocalServiceACLs_2">'
+    b"<RuleName>acl</RuleName>"
+    b"<Hosts><Host>a</Host><DstHost>b</DstHost></Hosts>"
+    b"</LocalServiceACL>"
+    b'<IPHost transactionid="set_IPHost_3">'
+    b'<Status code="200">Configuration applied successfully.</Status>'
+    b"</IPHost>"
+    b'<Status code="534">Operation not allowed.</Status>'
+    b"</Response>"
+)
+
+
+def as_tuples(responses):
+    return [(r.transactionid, r.status_code, r.data) for _, r in responses]
+
+
+def test_responses_take_other_attributes():
+    elem = ET.fromstring(BODY)[1]
+    lazy = LazyResponse.from_raw("get_1", ET.tostring(elem))
+    for response in (Response(elem), lazy):
+        response.note = "kept"
+        assert response.note == "kept"
+
+
+def test_lazy_data_set():
+    elem = ET.fromstring(BODY)[1]
+    lazy = LazyResponse.from_raw("get_1", ET.tostring(elem))
+    assert lazy.fields["Name"] == "h&1"
+
+    lazy.data = {"Name": "other"}
+    assert lazy.fields["Name"] == "other"
+    assert dict(lazy.fields) == {"Name": "other"}
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64, len(BODY)])
+def test_lazy_same_as_response(chunk_size):
+    starts = range(0, len(BODY), chunk_size)
+    chunks = [BODY[start:][:chunk_size] for start in starts]
+    expected = [(e.tag, Response(e)) for e in ET.fromstring(BODY)]
+    lazy = list(parse_responses(chunks, lazy=True))
+
+    assert [type(r) for _, r in lazy].count(LazyResponse) == 3
+    assert [tag for tag, _ in lazy] == [tag for tag, _ in expected]
+    assert as_tuples(lazy) == as_tuples(expected)
+
+
+def test_lazy_fields():
+    responses = [r for _, r in parse_responses([BODY], lazy=True)]
+    host, acl = responses[1], responses[5]
+
+    assert host.fields["Name"] == "h&1"
+    assert host.fields.get("Missing") is None
+    assert "IPAddress" in host.fields
+    assert acl.fields["DstHosts"] == ["b"]
+    assert host._data is None and acl._data is None  # not converted
+
+    assert dict(host.fields) == host.data
+    assert host.fields is host.data  # once converted
+
+
+def test_lazy_fields_parsed_once(monkeypatch):
+    responses = [r for _, r in parse_responses([BODY], lazy=True)]
+    host = responses[1]
+    parsed = []
+    parse_entity = expat_parser.parse_entity
+
+    def counting_parse_entity(raw, fields=None):
+        parsed.append(fields)
+        return parse_entity(raw, fields)
+
+    monkeypatch.setattr(expat_parser, "parse_entity", counting_parse_entity)
+
+    for _ in range(3):
+        assert host.fields["HostGroupList"] == ["g1"]
+        assert "Missing" not in host.fields
+    assert parsed == [("HostGroupList",), ("Missing",)]
+
+    host.data
+    assert host._fields == {}  # dropped once converted
+
+
+def test_client_lazy_responses():
+    client = Client(
+        username="u",
+        password="p",
+        server="127.0.0.1",
+        parser="expat",
+        lazy_responses=True,
+    )
+    responses = client._parse_response_body(BODY)
+    client.close()
+
+    assert isinstance(responses[0], LazyResponse)
+    assert responses[0].fields["IPAddress"] == "1.1.1.1"
+
+    with pytest.raises(ValueError):
+        Client(
+            username="u", password="p", server="127.0.0.1", lazy_responses=True
+        )
@@ -0,0 +1,89 @@
+import gzip
+import json
+import os
+
+import pytest
+
+from sophosapi.export import export
+from sophosapi.mock_server import MockFirewall
+from sophosapi.restore import restore
+from sophosapi.restore import restore_order
+
+
+@pytest.fixture
+def snapshot(tmp_path, server_client):
+    source = MockFirewall(username="u", password="p")
+    source.populate("IPHost", [{"Name": f"h{i}"} for i in range(25)])
+    source.populate("IPHostGroup", [{"Name": "g", "HostList": ["h1", "h2"]}])
+    source.populate("FirewallRule", [{"Name": "r1"}, {"Name": "r2"}])
+    source.populate("Zone", [{"Name": "LAN"}])
+    export(
+        server_client(source),
+        ["FirewallRule", "IPHostGroup", "IPHost", "Zone"],
+        str(tmp_path),
+    )
+    return str(tmp_path)
+
+
+def test_restore_order():
+    assert restore_order(
+        ["FirewallRule", "IPHostGroup", "IPHost", "Zone"]
+    ) == [
+        ["IPHost", "Zone"],
+        ["IPHostGroup"],
+        ["FirewallRule"],
+    ]
+    with pytest.raises(ValueError):
+        restore_order(["A", "B"], {"A": ["B"], "B": ["A"]})
+
+
+def test_restore(snapshot, connect):
+    target = MockFirewall(username="u", password="p")
+    target.populate("Zone", [{"Name": "LAN"}])
+    sent = []
+
+    results = restore(
+        connect(target, sent), snapshot, operation="add", batch_size=10
+    )
+
+    assert {t: (r.applied, len(r.failed)) for t, r in results.items()} == {
+        "FirewallRule": (2, 0),
+        "IPHostGroup": (1, 0),
+        "IPHost": (25, 0),
+        "Zone": (0, 1),  # already exists
+    }
+    assert results["Zone"].failed[0][:2] == ("LAN", 502)
+    assert len(target.entities("IPHost")) == 25
+    assert target.entities("IPHostGroup") == [
+        {"Name": "g", "HostList": ["h1", "h2"]}
+    ]
+
+    order = [next(iter(r.transactions.values())).entity for r in sent]
+    assert order.index("IPHostGroup") > max(
+        i for i, t in enumerate(order) if t == "IPHost"
+    )
+    assert order.index("FirewallRule") > order.index("IPHostGroup")
+    assert order.count("IPHost") == 3  # batches of 10
+
+
+def test_restore_missing_type(snapshot, connect):
+    client = connect(MockFirewall(username="u", password="p"))
+    results = restore(client, snapshot, ["Zone", "NATRule"])
+
+    assert results["Zone"].ok
+    assert results["NATRule"].error.startswith("KeyError")
+    with pytest.raises(ValueError):
+        restore(client, snapshot, operation="remove")
+
+
+def test_restore_tampered_snapshot(snapshot, connect):
+    forged = [{"Name": f"forged{i}"} for i in range(3)]
+    with gzip.open(os.path.join(snapshot, "IPHost.jsonl.gz"), "wt") as f:
+        f.writelines(json.dumps(host) + "\n" for host in forged)
+    target = MockFirewall(username="u", password="p")
+
+    results = restore(connect(target), snapshot, ["IPHost"], batch_size=1)
+
+    assert "does not match the manifest" in results["IPHost"].error
+    assert results["IPHost"].applied == 0
+    assert target.entities("IPHost") == []
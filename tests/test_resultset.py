@@ -0,0 +1,145 @@
+from xml.etree.ElementTree import fromstring
+
+from sophosapi.cache import ResponseCache
+from sophosapi.client import Client
+from sophosapi.response import Response
+from sophosapi.resultset import ResultSet
+
+
+def response(xml):
+    elem = fromstring(xml)
+    elem.set("transactionid", "get")
+    return Response(elem)
+
+
+def host_groups():
+    return ResultSet(
+        [
+            response(
+                "<IPHostGroup><Name>g1</Name>"
+                "<HostList><Host>h1</Host><Host>h2</Host><Host>h1</Host>"
+                "</HostList></IPHostGroup>"
+            ),
+            response(
+                "<IPHostGroup><Name>g2</Name>"
+                "<HostList><Host>h2</Host></HostList></IPHostGroup>"
+            ),
+            response(
+                "<IPHostGroup><Status>No. of records Zero.</Status>"
+                "</IPHostGroup>"
+            ),
+        ]
+    )
+
+
+def test_lookup():
+    groups = host_groups()
+
+    assert groups.by_name("g2") is groups[1]
+    assert groups.by_name("g3") is None
+    assert groups.lookup("HostList", "h1") == [groups[0]]
+    assert groups.lookup("HostList", "h2") == [groups[0], groups[1]]
+    assert groups.contains("HostList", "h2")
+    assert not groups.contains("HostList", "h3")
+    assert groups == list(groups)
+
+
+def test_nested_field():
+    rules = ResultSet(
+        [
+            response(
+                "<FirewallRule><Name>r</Name><NetworkPolicy>"
+                "<SourceNetworks><Network>h1</Network></SourceNetworks>"
+                "</NetworkPolicy></FirewallRule>"
+            )
+        ]
+    )
+    assert rules.lookup("NetworkPolicy.SourceNetworks", "h1") == rules
+    assert rules.lookup("Name.SourceNetworks", "h1") == []
+
+
+def test_indexes_follow_changes():
+    groups = host_groups()
+    assert not groups.contains("Name", "g3")
+
+    groups.append(response("<IPHostGroup><Name>g3</Name></IPHostGroup>"))
+    assert groups.contains("Name", "g3")
+    del groups[-1]
+    assert not groups.contains("Name", "g3")
+
+
+def test_lookup_returns_a_copy():
+    groups = host_groups()
+    groups.lookup("HostList", "h2").clear()
+
+    assert len(groups.lookup("HostList", "h2")) == 2
+
+
+def test_copies_share_indexes_until_changed():
+    groups = host_groups()
+    copy = groups.copy()
+    assert isinstance(copy, ResultSet) and copy == groups
+
+    assert copy.contains("Name", "g1")
+    assert groups._indexes is copy._indexes  # built once, for both
+    copy.sort(key=lambda r: r.data.get("Name", ""), reverse=True)
+    copy.append(response("<IPHostGroup><Name>g3</Name></IPHostGroup>"))
+
+    assert copy.contains("Name", "g3")
+    assert not groups.contains("Name", "g3")
+    assert groups.lookup("HostList", "h2") == [groups[0], groups[1]]
+
+
+def test_client_result_sets():
+    client = Client(
+        username="u", password="p", server="127.0.0.1", result_sets=True
+    )
+
+    def make_api_call(request):
+        (transactionid,) = request.transactions
+        if transactionid.startswith("get"):
+            reply = "<Name>a</Name>"
+        else:
+            reply = '<Status code="200">Configuration applied.</Status>'
+        return (
+            f'<Response><IPHost transactionid="{transactionid}">{reply}'
+            "</IPHost></Response>"
+        ).encode()
+
+    client._make_api_call = make_api_call
+
+    hosts = client.get("IPHost")
+    assert isinstance(hosts, ResultSet)
+    assert hosts.by_name("a") is hosts[0]
+    assert isinstance(client.get_many(["IPHost"])["IPHost"], ResultSet)
+    assert not isinstance(client.add("IPHost", {"Name": "b"}), ResultSet)
+
+
+def test_cached_result_sets_not_shared():
+    client = Client(
+        username="u",
+        password="p",
+        server="127.0.0.1",
+        result_sets=True,
+        cache=ResponseCache(ttl=60),
+    )
+    sent = []
+
+    def make_api_call(request):
+        (transactionid,) = request.transactions
+        sent.append(transactionid)
+        return (
+            f'<Response><IPHost transactionid="{transactionid}">'
+            "<Name>a</Name></IPHost></Response>"
+        ).encode()
+
+    client._make_api_call = make_api_call
+
+    first = client.get("IPHost")
+    assert first.by_name("a") is first[0]
+    first.clear()
+    second = client.get("IPHost")
+
+    assert len(sent) == 1
+    assert isinstance(second, ResultSet)
+    assert second.by_name("a") is second[0]
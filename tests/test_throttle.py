@@ -0,0 +1,166 @@
+import threading
+import time
+import urllib.parse
+from urllib.error import HTTPError
+
+import pytest
+from defusedxml import ElementTree as ET
+
+from sophosapi.client import Client
+from sophosapi.request import Request
+from sophosapi.throttle import RetryPolicy
+from sophosapi.throttle import TokenBucket
+
+
+def make_client(**kwargs):
+    return Client(username="u", password="p", server="127.0.0.1", **kwargs)
+
+
+def reqxml_of(url):
+    return urllib.parse.parse_qs(urllib.parse.urlsplit(url).query)["reqxml"][0]
+
+
+def test_token_bucket():
+    bucket = TokenBucket(rate=50, burst=2)
+    waits = [bucket.acquire() for _ in range(3)]
+
+    assert waits[:2] == [0, 0]
+    assert waits[2] == pytest.approx(0.02, abs=0.01)
+
+
+def test_should_retry():
+    retry = RetryPolicy(attempts=2)
+    gets, writes = Request(), Request()
+    gets.get("Zone")
+    writes.add("Zone", {"Name": "z"})
+    unavailable = HTTPError("/", 503, "Busy", None, None)  # type: ignore
+
+    assert retry.should_retry(gets, ConnectionResetError(), 0)
+    assert not retry.should_retry(gets, ConnectionResetError(), 1)
+    assert not retry.should_retry(gets, ValueError(), 0)
+    # a write may have been applied before the connection was lost
+    assert not retry.should_retry(writes, ConnectionResetError(), 0)
+    assert retry.should_retry(writes, ConnectionRefusedError(), 0)
+    assert retry.should_retry(writes, unavailable, 0)
+
+
+def test_transport_errors_retried():
+    client = make_client(retry=RetryPolicy(backoff=0))
+    errors = [ConnectionResetError(), TimeoutError()]
+
+    def fake_request(method, url, body=None, headers=None, resend=False):
+        if errors:
+            raise errors.pop()
+        return b'<Response><Zone transactionid="get_Zones_1" /></Response>'
+
+    client.pool.request = fake_request
+    (response,) = client.get("Zone")
+
+    assert response.status_code == 200
+    assert not errors
+
+
+def test_busy_transactions_resent():
+    client = make_client(retry=RetryPolicy(backoff=0))
+    sent = []
+
+    def fake_request(method, url, body=None, headers=None, resend=False):
+        request = ET.fromstring(reqxml_of(url))
+        tids = [e.get("transactionid") for e in request.iter("Zone")]
+        sent.append(tids)
+        code = 503 if len(sent) == 1 and len(tids) > 1 else 200
+        replies = "".join(
+            f'<Zone transactionid="{tid}"><Status code="{code if i else 200}">'
+            "</Status></Zone>"
+            for i, tid in enumerate(tids)
+        )
+        return f"<Response>{replies}</Response>".encode()
+
+    client.pool.request = fake_request
+    request = Request()
+    for name in ("a", "b", "c"):
+        request.set("Zone", {"Name": name})
+    responses = client.send(request)
+
+    assert sent == [["set_Zone_1", "set_Zone_2", "set_Zone_3"]] + [
+        ["set_Zone_2", "set_Zone_3"]
+    ]
+    assert [r.transactionid for r in responses] == sent[0]
+    assert [r.status_code for r in responses] == [200, 200, 200]
+
+
+def test_busy_resent_within_chunk():
+    client = make_client(retry=RetryPolicy(backoff=0))
+    sent = []
+
+    def fake_request(method, url, body=None, headers=None, resend=False):
+        request = ET.fromstring(reqxml_of(url))
+        tids = [e.get("transactionid") for e in request.iter("Zone")]
+        sent.append(tids)
+        busy = "set_Zone_4" in tids and len(tids) > 1
+        replies = "".join(
+            f'<Zone transactionid="{tid}"><Status code="'
+            f'{503 if busy and tid == "set_Zone_4" else 200}"></Status></Zone>'
+            for tid in tids
+        )
+        return f"<Response>{replies}</Response>".encode()
+
+    client.pool.request = fake_request
+    request = Request()
+    for i in range(6):
+        request.set("Zone", {"Name": f"z{i}"})
+    responses = client.send_chunked(request, max_entities=3)
+
+    assert sent == [
+        ["set_Zone_1", "set_Zone_2", "set_Zone_3"],
+        ["set_Zone_4", "set_Zone_5", "set_Zone_6"],
+        ["set_Zone_4"],
+    ]
+    assert [r.status_code for r in responses] == [200] * 6
+    assert [r.transactionid for r in responses] == sent[0] + sent[1]
+
+
+def test_busy_kept_when_retry_unanswered():
+    client = make_client(retry=RetryPolicy(attempts=2, backoff=0))
+    replies = [
+        '<Response><Zone transactionid="set_Zone_1">'
+        '<Status code="503">Busy</Status></Zone></Response>',
+        '<Response><Status code="534">Operation failed</Status></Response>',
+    ]
+
+    def fake_request(method, url, body=None, headers=None, resend=False):
+        return replies.pop(0).encode()
+
+    client.pool.request = fake_request
+    response = client.set("Zone", {"Name": "a"})
+
+    assert not replies
+    assert response.transactionid == "set_Zone_1"
+    assert response.status_code == 503
+
+
+def test_max_concurrency():
+    client = make_client(max_concurrency=2)
+    active = []
+    peak = []
+    lock = threading.Lock()
+
+    def fake_request(method, url, body=None, headers=None, resend=False):
+        with lock:
+            active.append(1)
+            peak.append(len(active))
+        time.sleep(0.01)
+        with lock:
+            active.pop()
+        return b"<Response />"
+
+    client.pool.request = fake_request
+    threads = [
+        threading.Thread(target=client.get, args=("Zone",)) for _ in range(6)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert max(peak) == 2
@@ -0,0 +1,108 @@
+import pytest
+
+from sophosapi.client import Client
+from sophosapi.watcher import fingerprint
+from sophosapi.watcher import Watcher
+
+
+class FakeFirewall:
+    def __init__(self):
+        self.hosts = {}
+        self.zones = {"LAN": "<Type>LAN</Type>"}
+
+    def reply(self, request):
+        replies = []
+        for tid, transaction in request.transactions.items():
+            items = (
+                self.hosts if transaction.entity == "IPHost" else self.zones
+            )
+            if not items:
+                replies.append(
+                    f'<{transaction.entity} transactionid="{tid}">'
+                    f"<Status>No. of records Zero.</Status>"
+                    f"</{transaction.entity}>"
+                )
+            for name, body in items.items():
+                replies.append(
+                    f'<{transaction.entity} transactionid="{tid}">'
+                    f"<Name>{name}</Name>{body}"
+                    f"</{transaction.entity}>"
+                )
+        return f"<Response>{''.join(replies)}</Response>".encode()
+
+
+def make_watcher(firewall, **kwargs):
+    client = Client(username="u", password="p", server="x")
+    client._make_api_call = firewall.reply
+    return Watcher(client, ["IPHost", "Zone"], **kwargs)
+
+
+def test_fingerprint_ignores_key_order():
+    assert fingerprint({"a": "1", "b": ["x"]}) == fingerprint(
+        {"b": ["x"], "a": "1"}
+    )
+
+
+def test_poll_reports_changes():
+    firewall = FakeFirewall()
+    watcher = make_watcher(firewall)
+
+    assert watcher.poll() == []  # first poll is the baseline
+
+    firewall.hosts["h1"] = "<IPAddress>1.1.1.1</IPAddress>"
+    firewall.zones["LAN"] = "<Type>DMZ</Type>"
+    events = watcher.poll()
+    assert {(e.kind, e.entity, e.name) for e in events} == {
+        ("added", "IPHost", "h1"),
+        ("modified", "Zone", "LAN"),
+    }
+
+    del firewall.zones["LAN"]
+    events = watcher.poll()
+    assert [(e.kind, e.name, e.data) for e in events] == [
+        ("removed", "LAN", None)
+    ]
+
+
+def test_intervals_adapt():
+    firewall = FakeFirewall()
+    watcher = make_watcher(
+        firewall, min_interval=10, max_interval=40, backoff=2
+    )
+    watcher.poll()
+    watcher.poll()
+    assert watcher.intervals == {"IPHost": 40, "Zone": 40}
+
+    firewall.hosts["h1"] = ""
+    watcher.poll()
+    assert watcher.intervals == {"IPHost": 10, "Zone": 40}
+
+    assert watcher.poll_due() == []  # nothing due yet
+
+
+def test_failed_poll_changes_nothing():
+    firewall = FakeFirewall()
+    firewall.hosts["h1"] = ""
+    watcher = make_watcher(firewall)
+    watcher.poll()
+    reply = firewall.reply
+
+    failures = [
+        b"<Response><Login><status>Authentication Failure</status></Login>"
+        b"</Response>",
+        b'<Response><Status code="534">Operation not allowed.</Status>'
+        b"</Response>",
+        lambda request: reply(request).replace(
+            b"<Name>h1</Name>",
+            b'<Status code="534">Operation not allowed.</Status>',
+        ),
+    ]
+    for failure in failures:
+        watcher.client._make_api_call = (
+            failure if callable(failure) else lambda request: failure
+        )
+        with pytest.raises(ValueError):
+            watcher.poll()
+
+    watcher.client._make_api_call = reply
+    assert watcher.poll() == []
@@ -0,0 +1,128 @@
+import pytest
+from defusedxml import ElementTree as ET
+
+from sophosapi.api_factory import _create_element
+from sophosapi.api_factory import _make_filter
+from sophosapi.api_factory import Filter
+from sophosapi.api_factory import json_to_xml
+from sophosapi.request import Request
+from sophosapi.xml_writer import element_xml
+from sophosapi.xml_writer import entity_xml
+from sophosapi.xml_writer import escape_cdata
+
+
+def tostring(entity, data, transactionid=None):
+    elem = json_to_xml(entity, data)
+    if transactionid is not None:
+        elem.set("transactionid", transactionid)
+    return ET.tostring(elem)
+
+
+@pytest.mark.parametrize(
+    "entity, data",
+    [
+        ("IPHost", {}),
+        ("IPHost", {"Name": 'a & <b> "c"', "Description": ""}),
+        ("IPHost", {"Name": "café ✓", "Port": 80, "Other": None}),
+        ("IPHostGroup", {"HostList": [], "Description": {}}),
+        ("IPHostGroup", {"HostList": ["a", "", 1, ["b"], {"X": "y"}]}),
+        ("LocalServiceACL", {"Hosts": ["a"], "DstHosts": ["b", "c"]}),
+        ("LocalServiceACL", {"DstHosts": ["b"], "Hosts": ["a"], "X": "1"}),
+        ("LocalServiceACL", {"Hosts": [], "DstHosts": ["b"]}),
+        ("LocalServiceACL", {"Hosts": "a", "DstHosts": ["b"]}),
+        ("LocalServiceACL", {"DstHosts": ["b"]}),
+        ("LocalServiceACL", {"Hosts": ["a"]}),
+        ("LocalServiceACL", {"X": {"Hosts": ["a"]}, "DstHosts": ["b"]}),
+        ("FirewallRule", {"HTTPBasedPolicy": {}}),
+        ("FirewallRule", {"HTTPBasedPolicy": {"AccessPaths": "text"}}),
+        (
+            "FirewallRule",
+            {
+                "Name": "waf",
+                "HTTPBasedPolicy": {
+                    "AccessPaths": [
+                        {
+                            "denied_networks": ["d"],
+                            "backends": ["b1", "b2"],
+                            "path": "/",
+                            "allowed_networks": [],
+                            "x": "1",
+                        },
+                        "text",
+                        {},
+                    ],
+                    "Exceptions": [
+                        {"paths": ["/a", "/b"], "sources": "s", "op": "1"}
+                    ],
+                },
+                "Identity": ["u1"],
+            },
+        ),
+        (
+            "SSLTLSInspectionRule",
+            {
+                "Identity": ["u1", "u2"],
+                "Nested": {"Identity": {"Member": "u3", "Other": "x"}},
+            },
+        ),
+    ],
+)
+def test_same_as_json_to_xml(entity, data):
+    xml = entity_xml(entity, data, "set_1")
+    assert xml.encode("ascii", "xmlcharrefreplace") == tostring(
+        entity, data, "set_1"
+    )
+
+
+def test_unknown_list_raises():
+    with pytest.raises(KeyError):
+        entity_xml("IPHost", {"NotAList": []})
+
+
+def test_request_same_as_element_tree():
+    request = Request(apiversion="1905.1")
+    request.get("Zone")
+    request.get_filter("IPHost", Filter.LIKE, "a&b")
+    request.set("IPHost", {"Name": "h1", "IPAddress": "1.1.1.1"})
+    request.update("IPHostGroup", {"Name": "g", "HostList": ["h1"]})
+    request.remove("IPHost", "hé")
+    login = _create_element("Login", text="x")
+
+    root = _create_element("Request")
+    root.set("APIVersion", "1905.1")
+    root.append(login)
+    get, set_, add, update, remove = (
+        _create_element("Get"),
+        _create_element("Set"),
+        _create_element("Set"),
+        _create_element("Set"),
+        _create_element("Remove"),
+    )
+    add.set("operation", "add")
+    update.set("operation", "update")
+    root.extend([get, set_, add, update, remove])
+    zone = _create_element("Zone", transactionid="get_Zones_1")
+    iphost = _create_element("IPHost", transactionid="get_IPHost_LIKE_2")
+    iphost.append(_make_filter(Filter.LIKE, "a&b"))
+    get.extend([zone, iphost])
+    for container, tid in (
+        (set_, "set_IPHost_3"),
+        (update, "update_IPHostGroup_4"),
+        (remove, "remove_IPHost_5"),
+    ):
+        t = request.transactions[tid]
+        elem = json_to_xml(t.entity, t.data)
+        elem.set("transactionid", tid)
+        container.append(elem)
+
+    assert request.to_bytes(login=login) == ET.tostring(root)
+
+
+def test_escaping_as_tostring():
+    text = 'a & b < c > "d"\r\n\te'
+    elem = _create_element("Host", text=text)
+    elem.set("note", text)
+
+    assert element_xml("Host", {"note": text}, escape_cdata(text)) == (
+        ET.tostring(elem, encoding="unicode")
+    )